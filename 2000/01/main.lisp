@@ -1,4 +1,4 @@
-(load "../aoc_executor.lisp/src/executor.lisp")
+(unless (fboundp 'executor) (load "../aoc_executor.lisp/src/executor.lisp"))
 
 (set 'input (list "Hello" "World!"))
 
@@ -1,6 +1,9 @@
 import sys
 
-from aoc_executor import AocExecutor
+try:
+    from aoc_solver.executor import AocExecutor
+except ImportError:
+    from aoc_executor import AocExecutor
 
 
 def part1_solution(input):
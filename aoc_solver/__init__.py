@@ -1,8 +1,14 @@
 import functools
 import os
 
+__version__ = "0.0.13"
+
 AOC_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 SOLUTIONS_ROOT = os.path.abspath(os.environ.get("PWD"))
+# Results that are expensive to compute and rarely change, e.g. benchmarks
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "aoc_solver"
+)
 
 
 def debug(func):
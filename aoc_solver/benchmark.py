@@ -0,0 +1,276 @@
+import json
+import os
+import platform
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from multiprocessing import Pipe, Process
+from typing import Callable, Dict, List, Optional
+
+from aoc_solver import CACHE_DIR, __version__
+from aoc_solver.display_event_loop import DisplayEventLoop
+from aoc_solver.lang.registry import LanguageSettings, register_language
+from aoc_solver.solver_engine import SolverEngine
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.terminal.display import Display
+from aoc_solver.timing import parse_timing_info
+from aoc_solver.types import PipeConnection, PipeMessage
+
+RESULTS_DIR = os.path.join(CACHE_DIR, "benchmarks")
+# Solutions of the stand-in language are generated for days of this year
+BENCHMARK_YEAR = 1000
+NOOP_LANGUAGE = "noop"
+NOOP_OUTPUT = "1\n2\n"
+NOOP_TIMING = {
+    "part1": {"iterations": 1, "duration": 1.0},
+    "part2": {"iterations": 1, "duration": 1.0},
+}
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+@register_language(name=NOOP_LANGUAGE, extension=NOOP_LANGUAGE)
+class NoopSettings(LanguageSettings):
+    """
+    Stand-in language for benchmarking the harness. The "solution" prints a fixed
+    answer and timing report, so nearly all time is spent in the harness itself.
+    """
+
+    def solve(self):
+        return f"cat {self.file}"
+
+    def time(self):
+        return f"cat {self._timing_file}"
+
+    @property
+    def _timing_file(self):
+        return os.path.join(self._base_dir, "timing.json")
+
+
+@dataclass
+class JobsResult:
+    jobs: int
+    # Median wall time (in seconds) of running all solutions end to end
+    wall: float
+    # Median time (in seconds) the harness adds to each solution, on top of the
+    # time spent in the solution's own commands
+    overhead: float
+
+
+@dataclass
+class BenchmarkResult:
+    version: str
+    python: str
+    created: str
+    solutions: int
+    # Time (in seconds) to run the commands of a single solution without the harness
+    command_time: float
+    # Events per second rendered by the display event loop
+    events_per_second: float
+    runs: List[JobsResult] = field(default_factory=list)
+
+    def run(self, jobs: int) -> Optional[JobsResult]:
+        for run in self.runs:
+            if run.jobs == jobs:
+                return run
+
+    def save(self, path: str = None) -> str:
+        """
+        :return: path the results were written to, defaults to a file named
+        after the version in the results directory
+        """
+        path = path or os.path.join(RESULTS_DIR, f"{self.version}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, name: str) -> "BenchmarkResult":
+        """
+        :param name: path to a results file or a version benchmarked earlier
+        """
+        path = name
+        if not os.path.isfile(path):
+            path = os.path.join(RESULTS_DIR, f"{name}.json")
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            data["runs"] = [JobsResult(**run) for run in data["runs"]]
+            return cls(**data)
+        except FileNotFoundError:
+            raise BenchmarkError(f"No benchmark results found for {name}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise BenchmarkError(f"Invalid benchmark results in {path}: {e}")
+
+
+@contextmanager
+def _silenced():
+    """
+    Send everything written to stdout (including by child processes) to /dev/null
+    so rendering still happens but doesn't clutter the benchmark report
+    """
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+        os.close(devnull)
+
+
+def _send_events(conn: PipeConnection, messages: List[PipeMessage]):
+    for message in messages:
+        conn.send(message)
+    conn.send({"event": SolverEvent.TERMINATE})
+
+
+class HarnessBenchmark:
+    """
+    Measures the latency the harness adds around solutions: process spawns, pipe
+    messages, display rendering and shutdown. Solutions of a stand-in language are
+    run through the same engine, pipeline and display path as real solutions.
+    """
+
+    def __init__(
+        self,
+        days: int = 25,
+        repeat: int = 3,
+        jobs: List[int] = None,
+        events: int = 5000,
+    ):
+        self.days = days
+        self.repeat = repeat
+        self.jobs = jobs or sorted({1, 2, 4, os.cpu_count() or 1})
+        self.events = events
+
+    def __call__(self, progress: Callable[[str], None]) -> BenchmarkResult:
+        """
+        :param progress: called with a description of each measurement as it starts
+        """
+        with tempfile.TemporaryDirectory(prefix="aoc-benchmark-") as solutions_path:
+            self._generate_solutions(solutions_path)
+            progress("running solution commands without the harness")
+            command_time = self._command_time(solutions_path) / self.days
+            progress(f"sending {self.events} events through the display event loop")
+            events_per_second = self._events_per_second()
+            result = BenchmarkResult(
+                version=__version__,
+                python=platform.python_version(),
+                created=datetime.now().isoformat(timespec="seconds"),
+                solutions=self.days,
+                command_time=command_time,
+                events_per_second=events_per_second,
+            )
+            for jobs in self.jobs:
+                progress(f"solving {self.days} solutions end to end with {jobs} jobs")
+                wall = self._end_to_end(solutions_path, jobs)
+                overhead = wall / self.days - command_time
+                result.runs.append(JobsResult(jobs, wall, overhead))
+        return result
+
+    def _day_dirs(self, solutions_path: str) -> List[str]:
+        return [
+            os.path.join(solutions_path, str(BENCHMARK_YEAR), str(day).zfill(2))
+            for day in range(1, self.days + 1)
+        ]
+
+    def _generate_solutions(self, solutions_path: str):
+        for day_dir in self._day_dirs(solutions_path):
+            os.makedirs(day_dir)
+            for filename in [f"main.{NOOP_LANGUAGE}", "output.txt"]:
+                with open(os.path.join(day_dir, filename), "w") as f:
+                    f.write(NOOP_OUTPUT)
+            with open(os.path.join(day_dir, "timing.json"), "w") as f:
+                json.dump(NOOP_TIMING, f)
+
+    def _median(self, measure: Callable[[], float]) -> float:
+        # Warm up file system and interpreter caches before measuring
+        measure()
+        return statistics.median(measure() for _ in range(self.repeat))
+
+    def _command_time(self, solutions_path: str) -> float:
+        commands = []
+        for day_dir in self._day_dirs(solutions_path):
+            settings = NoopSettings(os.path.join(day_dir, f"main.{NOOP_LANGUAGE}"))
+            commands.extend([settings.solve(), settings.time()])
+
+        def measure():
+            start = time.perf_counter()
+            for cmd in commands:
+                subprocess.run(shlex.split(cmd), capture_output=True, check=True)
+            return time.perf_counter() - start
+
+        return self._median(measure)
+
+    def _end_to_end(self, solutions_path: str, jobs: int) -> float:
+        # Imported here since the executable sets up paths when it is imported
+        from aoc_solver.exe import run_solver
+
+        def find_engines():
+            return [
+                SolverEngine(solutions_path, BENCHMARK_YEAR, day)
+                for day in range(1, self.days + 1)
+            ]
+
+        def measure():
+            with _silenced():
+                start = time.perf_counter()
+                run_solver(find_engines, [NOOP_LANGUAGE], jobs)
+                return time.perf_counter() - start
+
+        return self._median(measure)
+
+    def _solution_events(self) -> List[PipeMessage]:
+        """
+        :return: the events a passing solution dispatches
+        """
+        args = {"year": BENCHMARK_YEAR, "day": 1, "language": NOOP_LANGUAGE}
+        info = parse_timing_info(json.dumps(NOOP_TIMING))
+        events: List[Dict] = [
+            {"event": SolverEvent.SOLVE_STARTED},
+            {"event": SolverEvent.SOLVE_FINISHED},
+            {"event": SolverEvent.SOLVE_SUCCEEDED},
+            {"event": SolverEvent.TIMING_STARTED},
+            {
+                "event": SolverEvent.TIMING_FINISHED,
+                "info": info,
+                "duration": timedelta(milliseconds=1),
+            },
+        ]
+        return [{**event, **args} for event in events]
+
+    def _events_per_second(self) -> float:
+        solution_events = self._solution_events()
+        messages = [
+            solution_events[i % len(solution_events)] for i in range(self.events)
+        ]
+
+        def measure():
+            display_conn, sender_conn = Pipe(True)
+            sender = Process(target=_send_events, args=(sender_conn, messages))
+            event_loop = DisplayEventLoop(Display(), display_conn)
+            with _silenced():
+                start = time.perf_counter()
+                sender.start()
+                event_loop(os.getpid())
+                elapsed = time.perf_counter() - start
+            sender.join()
+            display_conn.close()
+            sender_conn.close()
+            return (len(messages) + 1) / elapsed
+
+        return self._median(measure)
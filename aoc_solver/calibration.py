@@ -0,0 +1,208 @@
+import json
+import os
+import shutil
+import statistics
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from aoc_solver import AOC_ROOT, CACHE_DIR
+from aoc_solver.lang.registry import LanguageRegistry, LanguageSettings
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.timing import PARTS, TimingBudget
+
+CALIBRATION_FILE = os.path.join(CACHE_DIR, "calibration.json")
+# Day containing a "Hello, World" solution for every supported language
+REFERENCE_YEAR = 2000
+REFERENCE_DAY = 1
+# One iteration per part and no warmup, so the overhead of a reference run is the
+# startup of the runtime and executor rather than the executor's timing loop
+REFERENCE_BUDGET = TimingBudget(budget_ms=0, min_iterations=1, warmup=0)
+
+
+class CalibrationError(Exception):
+    pass
+
+
+def toolchain_fingerprint(settings: LanguageSettings) -> str:
+    """
+    Identify the installed toolchain of a language by the resolved path and
+    modification time of its executables, so a baseline is invalidated when the
+    toolchain is upgraded without having to run it
+    """
+    parts = []
+    for executable in settings.TOOLCHAIN:
+        path = shutil.which(executable)
+        if path:
+            path = os.path.realpath(path)
+            parts.append(f"{path}@{os.stat(path).st_mtime_ns}")
+        else:
+            parts.append(f"{executable}@missing")
+    return ";".join(parts)
+
+
+def reference_solutions(solutions_path: str) -> str:
+    """
+    :return: the solutions path to find the reference day in, the solutions'
+    own or else the checkout of the solver, which ships one
+    :raises CalibrationError: if neither has the reference day
+    """
+    day = os.path.join(str(REFERENCE_YEAR), str(REFERENCE_DAY).zfill(2))
+    for path in (solutions_path, AOC_ROOT):
+        if os.path.isdir(os.path.join(path, day)):
+            return path
+    raise CalibrationError(
+        f"The reference solutions in {day} were found neither in {solutions_path} "
+        f"nor in {AOC_ROOT}, copy the {day} directory of the aoc_solver repository "
+        "into the solutions to calibrate"
+    )
+
+
+@dataclass
+class StartupBaseline:
+    language: str
+    toolchain: str
+    # Median overhead (in microseconds) of timing a "Hello, World" solution, i.e.
+    # the time spent booting the runtime and the executor
+    startup: float
+    runs: int
+    created: str
+
+
+class CalibrationCache:
+    """
+    Startup baselines of each language, stored in a JSON file so they only need to
+    be calibrated once per toolchain
+    """
+
+    def __init__(self, path: str = CALIBRATION_FILE):
+        self.path = path
+        self._baselines: Dict[str, StartupBaseline] = {}
+        # Toolchain fingerprint of each language, checked once per cache
+        self._toolchains: Dict[str, str] = {}
+        try:
+            with open(path, "r") as f:
+                for language, baseline in json.load(f).items():
+                    self._baselines[language] = StartupBaseline(**baseline)
+        except FileNotFoundError:
+            pass
+        except (TypeError, ValueError):
+            # Start over rather than fail every run because of a corrupt cache
+            self._baselines = {}
+
+    def get(self, language: str) -> Optional[StartupBaseline]:
+        """
+        :return: the baseline of the language, `None` if it was never calibrated or
+        the toolchain has changed since
+        """
+        baseline = self._baselines.get(language)
+        if not baseline:
+            return None
+        if language not in self._toolchains:
+            _, settings, _ = LanguageRegistry.get(language)
+            self._toolchains[language] = toolchain_fingerprint(settings)
+        if baseline.toolchain != self._toolchains[language]:
+            return None
+        return baseline
+
+    def set(self, baseline: StartupBaseline):
+        self._baselines[baseline.language] = baseline
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {language: asdict(b) for language, b in self._baselines.items()},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class Calibrator:
+    """
+    Measure the startup baseline of a language by building its "Hello, World"
+    solution and timing it repeatedly with a single iteration per part. Since the
+    parts do no work, nearly all of the overhead reported for it is spent booting
+    the runtime and the executor.
+    """
+
+    def __init__(
+        self,
+        solutions_path: str,
+        language: str,
+        runs: int = 20,
+        year: int = REFERENCE_YEAR,
+        day: int = REFERENCE_DAY,
+    ):
+        self.solutions_path = solutions_path
+        self.language = language
+        self.runs = runs
+        self.year = year
+        self.day = day
+
+    def __call__(self) -> StartupBaseline:
+        """
+        :raises CalibrationError: if the reference solution cannot be timed
+        """
+        # Imported here since the solver engine reads baselines from this module
+        from aoc_solver.solver_engine import (
+            EventRecorder,
+            SolverEngine,
+            SolverOptions,
+        )
+
+        _, settings, timing = LanguageRegistry.get(self.language)
+        if not timing:
+            raise CalibrationError("timing is not supported")
+        options = SolverOptions(timing_budget=REFERENCE_BUDGET)
+        try:
+            engine = SolverEngine(self.solutions_path, self.year, self.day, options)
+        except ValueError as e:
+            raise CalibrationError(str(e))
+        recorder = EventRecorder()
+        solvers = engine.solvers(os.getpid(), [self.language], lambda: recorder)
+        solver = next(solvers, None)
+        if not solver:
+            raise CalibrationError(
+                f"no reference solution in {self.year}/{str(self.day).zfill(2)}"
+            )
+        try:
+            ready = engine.prepare(solver)
+        except Exception:
+            ready = False
+        if not ready:
+            raise CalibrationError(self._failure(recorder))
+
+        overheads = []
+        for _ in range(self.runs):
+            recorder.messages = []
+            try:
+                solver.measure()
+            except Exception:
+                pass
+            finished = recorder.find(SolverEvent.TIMING_FINISHED)
+            if not finished:
+                raise CalibrationError(self._failure(recorder))
+            duration = finished["duration"]
+            duration_us = duration.seconds * 1000000 + duration.microseconds
+            reported = sum(finished["info"][part].duration for part in PARTS)
+            overheads.append(duration_us - reported)
+        return StartupBaseline(
+            language=self.language,
+            toolchain=toolchain_fingerprint(settings),
+            startup=statistics.median(overheads),
+            runs=self.runs,
+            created=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    @staticmethod
+    def _failure(recorder) -> str:
+        if not recorder.messages:
+            return "reference solution did not run"
+        message = recorder.messages[-1]
+        details = str(message.get("stderr") or message.get("error") or "").strip()
+        reason = message["event"].replace("-", " ")
+        return f"{reason}: {details.splitlines()[0]}" if details else reason
@@ -0,0 +1,126 @@
+"""
+usage: aoc-client [-h] [--socket SOCKET] [--json] [--history] [--stop] ...
+
+Submit a job to a running `aoc-solver serve` daemon and stream back its output
+
+positional arguments:
+  args             arguments for the solver, the same as for `aoc-solver`
+
+optional arguments:
+  -h, --help       show this help message and exit
+  --socket SOCKET  path of the daemon's Unix domain socket
+  --json           print each event as a line of JSON instead of the display
+  --history        list the jobs the daemon has run
+  --stop           stop the daemon
+"""
+
+# The client is run for every job, so it only imports the standard library to
+# keep its own startup time to a minimum
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+SOCKET_ENV = "AOC_SOLVER_SOCKET"
+
+
+def default_socket_path() -> str:
+    return os.environ.get(SOCKET_ENV) or os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+        f"aoc_solver-{os.getuid()}.sock",
+    )
+
+
+def _print_history(jobs):
+    for job in jobs:
+        print(
+            f"{job['started']}  exit {job['exit']:<3}  {job['duration']:7.2f}s  "
+            f"aoc-solver {' '.join(job['argv'])}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="aoc-client",
+        description=(
+            "Submit a job to a running `aoc-solver serve` daemon and stream back "
+            "its output"
+        ),
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="path of the daemon's Unix domain socket",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print each event as a line of JSON instead of the display",
+    )
+    parser.add_argument(
+        "--history", action="store_true", help="list the jobs the daemon has run"
+    )
+    parser.add_argument("--stop", action="store_true", help="stop the daemon")
+    parser.add_argument(
+        "args",
+        nargs=argparse.REMAINDER,
+        help="arguments for the solver, the same as for `aoc-solver`",
+    )
+    args = parser.parse_args()
+
+    if args.stop:
+        request = {"command": "stop"}
+    elif args.history:
+        request = {"command": "history"}
+    else:
+        request = {
+            "command": "solve",
+            "argv": args.args,
+            "solutions_path": os.path.abspath(
+                os.environ.get("AOC_SOLUTIONS_PATH", ".")
+            ),
+            "cwd": os.getcwd(),
+            "format": "json" if args.json else "text",
+        }
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(args.socket)
+    except OSError:
+        print(
+            f"No daemon is listening on {args.socket}, start one with "
+            "`aoc-solver serve`",
+            file=sys.stderr,
+        )
+        sys.exit(os.EX_UNAVAILABLE)
+
+    exit_code = 0
+    try:
+        with client, client.makefile("rw", encoding="utf-8") as stream:
+            stream.write(json.dumps(request) + "\n")
+            stream.flush()
+            for line in stream:
+                response = json.loads(line)
+                if "stdout" in response:
+                    sys.stdout.write(response["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in response:
+                    sys.stderr.write(response["stderr"])
+                    sys.stderr.flush()
+                elif "event" in response:
+                    print(json.dumps(response["event"]), flush=True)
+                elif "history" in response:
+                    _print_history(response["history"])
+                elif "exit" in response:
+                    exit_code = response["exit"]
+    except (BrokenPipeError, KeyboardInterrupt):
+        # Closing the connection cancels the job
+        exit_code = 130
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -32,7 +32,11 @@ class Context:
                 message["signal"] = signal
             if error:
                 message["error"] = error
-            conn.send(message)
+            try:
+                conn.send(message)
+            except OSError:
+                # The process on the other end has already exited
+                pass
             conn.close()
         while self.procs:
             proc = self.procs.pop()
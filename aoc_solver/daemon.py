@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+
+from collections import deque
+from datetime import datetime
+from multiprocessing import Pipe
+from typing import Callable, Dict, List, Optional
+
+from aoc_solver import SOLUTIONS_ROOT
+from aoc_solver.display_event_loop import DisplayEventLoop
+from aoc_solver.event_codec import encode_event
+from aoc_solver.exe import (
+    ExitCode,
+    argument_error,
+    build_parser,
+    engines_to_solve,
+    languages_to_solve,
+    solver_options,
+)
+from aoc_solver.journal import Journal
+from aoc_solver.metrics import RunMetrics
+from aoc_solver.solver_engine import SharedBuilds
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.solver_pipeline import SolverPipeline
+from aoc_solver.terminal.dashboard import Dashboard
+from aoc_solver.terminal.display import Display
+from aoc_solver.types import PipeConnection
+
+# Responses are JSON objects sent to the client one per line
+Send = Callable[[Dict], None]
+
+
+class _ParserExit(Exception):
+    def __init__(self, status: int, messages: List[str]):
+        self.status = status
+        self.messages = messages
+
+
+class _RequestParser(argparse.ArgumentParser):
+    """
+    Argument parser that collects help and error messages for the client rather
+    than printing them and exiting the daemon
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, prog="aoc-solver", **kwargs)
+        self.messages = []
+
+    def _print_message(self, message, file=None):
+        if message:
+            self.messages.append(message)
+
+    def exit(self, status=0, message=None):
+        if message:
+            self.messages.append(message)
+        raise _ParserExit(status, self.messages)
+
+
+class _ClientStream:
+    """
+    File-like object that forwards display output to the client. Once the client
+    has disconnected, `cancel` is called so the job stops early.
+    """
+
+    def __init__(self, send: Send, kind: str, cancel: Callable[[], None]):
+        self._send = send
+        self._kind = kind
+        self._cancel = cancel
+
+    def write(self, text: str):
+        if text:
+            try:
+                self._send({self._kind: text})
+            except OSError:
+                self._cancel()
+
+    def flush(self):
+        pass
+
+
+class SolverDaemon:
+    """
+    Resident solver that keeps the language registry imported and builds cached
+    between jobs, so back-to-back runs only pay for the work that changed. Jobs are
+    submitted by `aoc-client` over a Unix domain socket and run one at a time so
+    timings of concurrent jobs never overlap.
+    """
+
+    def __init__(self, socket_path: str, history_size: int = 100):
+        self.socket_path = socket_path
+        self.builds = SharedBuilds()
+        self.history = deque(maxlen=history_size)
+        self._job_lock = threading.Lock()
+        self._server = None
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.remove(self.socket_path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                daemon.handle(self.rfile, self.wfile)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self):
+        if self._server:
+            # Must not be called from the thread running `serve_forever`
+            threading.Thread(target=self._server.shutdown).start()
+
+    def handle(self, rfile, wfile):
+        lock = threading.Lock()
+
+        def send(response: Dict):
+            with lock:
+                wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+                wfile.flush()
+
+        try:
+            request = json.loads(rfile.readline())
+            if not isinstance(request, dict):
+                raise ValueError("Request is not an object")
+            command = request.get("command", "solve")
+            if command == "stop":
+                send({"exit": 0})
+                self.shutdown()
+            elif command == "history":
+                send({"history": list(self.history)})
+                send({"exit": 0})
+            else:
+                send({"exit": self._solve(request, send)})
+        except OSError:
+            # The client disconnected
+            pass
+        except ValueError:
+            send({"stderr": "Invalid request\n"})
+            send({"exit": ExitCode.INVALID_ARGS})
+
+    def _solve(self, request: Dict, send: Send) -> int:
+        error_message = self._request_error(request)
+        if error_message:
+            send({"stderr": f"Invalid request: {error_message}\n"})
+            return ExitCode.INVALID_ARGS
+
+        parser = build_parser(_RequestParser)
+        try:
+            args = parser.parse_args(request.get("argv", []))
+        except _ParserExit as e:
+            stream = "stdout" if e.status == 0 else "stderr"
+            send({stream: "".join(e.messages)})
+            return e.status
+
+        solutions_path = request["solutions_path"]
+        error_message = self._root_error(request) or argument_error(
+            args, solutions_path
+        )
+        if not error_message and args.trace:
+            error_message = "`--trace` is not supported by the daemon"
+        if error_message:
+            send({"stdout": f"{error_message}\n"})
+            return ExitCode.INVALID_ARGS
+
+        started = datetime.now()
+        start_time = time.perf_counter()
+        with self._job_lock:
+            exit_code = self._run_job(args, solutions_path, request, send)
+        self.history.append(
+            {
+                "argv": request.get("argv", []),
+                "started": started.isoformat(timespec="seconds"),
+                "duration": time.perf_counter() - start_time,
+                "exit": exit_code,
+            }
+        )
+        return exit_code
+
+    @staticmethod
+    def _request_error(request: Dict) -> Optional[str]:
+        """
+        :return: what is wrong with the fields of a solve request, `None` if they
+        can be used as is
+        """
+        if not isinstance(request.get("solutions_path"), str):
+            return "`solutions_path` must be a string"
+        if not isinstance(request.get("cwd", ""), str):
+            return "`cwd` must be a string"
+        argv = request.get("argv", [])
+        if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+            return "`argv` must be a list of strings"
+        return None
+
+    @staticmethod
+    def _root_error(request: Dict) -> Optional[str]:
+        """
+        Languages find their executors relative to the directory the solver was
+        started from, which is fixed when the daemon starts, so clients must run
+        from the same directory
+        """
+        cwd = request.get("cwd", request["solutions_path"])
+        if os.path.realpath(cwd) == os.path.realpath(SOLUTIONS_ROOT):
+            return None
+        return (
+            f"The daemon serves solutions run from {SOLUTIONS_ROOT}, run the client "
+            f"from there or start another daemon in {cwd} with "
+            "`aoc-solver serve --socket`"
+        )
+
+    @staticmethod
+    def _metrics(args, request: Dict) -> Optional[RunMetrics]:
+        if not args.metrics_file:
+            return None
+        # Relative paths are relative to where the client was run
+        cwd = request.get("cwd", request["solutions_path"])
+        return RunMetrics(os.path.join(cwd, args.metrics_file))
+
+    def _run_job(self, args, solutions_path: str, request: Dict, send: Send) -> int:
+        display_conn, solver_conn = Pipe(True)
+        cancelled = threading.Event()
+
+        def cancel():
+            if not cancelled.is_set():
+                cancelled.set()
+                display_conn.send({"event": SolverEvent.TERMINATE})
+
+        if request.get("format") == "json":
+            target = self._forward_events
+            target_args = (display_conn, send, cancel)
+        else:
+            target = DisplayEventLoop(
+                Dashboard() if args.dashboard else Display(),
+                display_conn,
+                stdout=_ClientStream(send, "stdout", cancel),
+                stderr=_ClientStream(send, "stderr", cancel),
+            )
+            target_args = (os.getpid(),)
+        display_thread = threading.Thread(
+            target=target, args=target_args, name="AoC-display"
+        )
+        display_thread.start()
+
+        exit_code = 0
+        terminate = {"event": SolverEvent.TERMINATE}
+        try:
+            engines = engines_to_solve(
+                args, solver_options(args), solutions_path, self.builds
+            )
+            pipeline = SolverPipeline(
+                solver_conn,
+                engines,
+                languages_to_solve(args),
+                args.jobs,
+                args.dashboard,
+                Journal(solutions_path, args.resume),
+                self._metrics(args, request),
+            )
+            pipeline(os.getpid())
+        except ValueError as e:
+            terminate["error"] = e
+            exit_code = ExitCode.INVALID_ARGS
+        except Exception as e:
+            terminate["error"] = e
+            exit_code = ExitCode.UNKNOWN_ERROR
+        try:
+            solver_conn.send(terminate)
+        except OSError:
+            pass
+        display_thread.join()
+        display_conn.close()
+        solver_conn.close()
+        if cancelled.is_set():
+            return ExitCode.SIGINT
+        return exit_code
+
+    @staticmethod
+    def _forward_events(conn: PipeConnection, send: Send, cancel: Callable[[], None]):
+        while True:
+            message = conn.recv()
+            try:
+                send({"event": encode_event(message)})
+            except OSError:
+                cancel()
+            if message["event"] == SolverEvent.TERMINATE:
+                break
@@ -4,20 +4,30 @@ import sys
 
 from dataclasses import dataclass, field
 from queue import PriorityQueue
-from typing import Any, Callable, Dict, Generator
+from typing import Any, Callable, Dict, Generator, TextIO
 
 from aoc_solver.shell import is_process_running
 from aoc_solver.solver_event import SolverEvent
+from aoc_solver.trace import Tracer
 from aoc_solver.types import PipeConnection, Stringable
 
 
 class DisplayEventLoop:
-    def __init__(self, display: Any, conn: PipeConnection, refresh_rate: int = 30):
+    def __init__(
+        self,
+        display: Any,
+        conn: PipeConnection,
+        refresh_rate: int = 30,
+        stdout: TextIO = None,
+        stderr: TextIO = None,
+    ):
         """
         :param refresh_rate: rate (in frames per second) at which events are process
         and thus the maximum rate the display will be updated.
+        :param stdout: stream the display is printed to instead of `sys.stdout`
+        :param stderr: stream errors are printed to instead of `sys.stderr`
         """
-        self._handler = TextHandler(display)
+        self._handler = TextHandler(display, stdout, stderr)
         self._conn = conn
         self._refresh_rate = refresh_rate
 
@@ -29,9 +39,11 @@ class DisplayEventLoop:
         running = True
         while running:
             if self._conn.poll(1 / self._refresh_rate):
-                message = self._conn.recv()
-                event = message["event"]
-                self._handler.handle(message)
+                with Tracer.span("recv", "pipe") as span:
+                    message = self._conn.recv()
+                    event = span["event"] = message["event"]
+                with Tracer.span("handle", "render", event=event):
+                    self._handler.handle(message)
                 if event == SolverEvent.TERMINATE:
                     running = False
             if not is_process_running(parent_pid):
@@ -42,7 +54,9 @@ class DisplayEventLoop:
                     }
                 )
                 running = False
-            self._handler.tick()
+            with Tracer.span("tick", "render"):
+                self._handler.tick()
+        Tracer.flush()
 
 
 @dataclass(order=True)
@@ -59,9 +73,11 @@ class TextHandler:
 
     _msg_num = 0
 
-    def __init__(self, display: Any):
+    def __init__(self, display: Any, stdout: TextIO = None, stderr: TextIO = None):
         self._display = display
         self._queue = PriorityQueue()
+        self._stdout = stdout
+        self._stderr = stderr
 
     def handle(self, message: Dict[str, str]):
         def output_gen():
@@ -76,7 +92,12 @@ class TextHandler:
         self._enqueue(output_gen)
         while not self._queue.empty():
             item = self._queue.get(False)
-            stream = sys.stderr if item.output.is_error else sys.stdout
+            if item.output.is_error:
+                stream = self._stderr or sys.stderr
+                # Keep errors in order with display output that is not flushed yet
+                (self._stdout or sys.stdout).flush()
+            else:
+                stream = self._stdout or sys.stdout
             print(item.output, end="", flush=self._queue.empty(), file=stream)
 
     def _enqueue(self, output_gen: Callable[[], Generator]):
@@ -0,0 +1,67 @@
+from dataclasses import fields, is_dataclass
+from datetime import timedelta
+from typing import Any
+
+from aoc_solver.output import OutputDiff
+from aoc_solver.timing import PartTiming
+from aoc_solver.types import PipeMessage
+
+# Key that marks an encoded object that is not natively supported by JSON
+TYPE_KEY = "__type__"
+# Dataclasses that may be part of an event, by name
+DATACLASSES = {cls.__name__: cls for cls in [OutputDiff, PartTiming]}
+
+
+class EventError(Exception):
+    """
+    Stand-in for an exception sent with an event, only its message survives
+    encoding
+    """
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, timedelta):
+        return {TYPE_KEY: "timedelta", "seconds": value.total_seconds()}
+    if isinstance(value, BaseException):
+        return {TYPE_KEY: "error", "message": str(value)}
+    if is_dataclass(value) and type(value).__name__ in DATACLASSES:
+        encoded = {f.name: _encode(getattr(value, f.name)) for f in fields(value)}
+        encoded[TYPE_KEY] = type(value).__name__
+        return encoded
+    return str(value)
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    decoded = {k: _decode(v) for k, v in value.items()}
+    kind = decoded.pop(TYPE_KEY, None)
+    if kind == "timedelta":
+        return timedelta(seconds=decoded["seconds"])
+    if kind == "error":
+        return EventError(decoded["message"])
+    if kind in DATACLASSES:
+        return DATACLASSES[kind](**decoded)
+    return decoded
+
+
+def encode_event(message: PipeMessage) -> Any:
+    """
+    :return: the event with all values converted to types supported by JSON
+    """
+    return _encode(message)
+
+
+def decode_event(data: Any) -> PipeMessage:
+    """
+    :param data: an event encoded by `encode_event` and parsed from JSON
+    """
+    return _decode(data)
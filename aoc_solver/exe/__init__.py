@@ -1,11 +1,16 @@
 """
-usage: solver [-h] [-l LANGUAGE [LANGUAGE ...]] [--save] year [day]
+usage: solver [-h] [-l LANGUAGE [LANGUAGE ...]] [--save] [-j JOBS] [--mem-profile]
+              [--profiles] [--runtime-profiles] [--pgo] [--solve-and-time]
+              [--time-budget-ms MS] [--min-iterations N] [--warmup N] [--snapshots]
+              [--dashboard] [--resume] [--metrics-file FILE] [--trace FILE]
+              year [day]
 
 Run Advent of Code solution for a given year/day in the chosen language
 
 positional arguments:
-  year                  competition year
-  day                   competition day
+  year                  competition year, a range of years (e.g. 2015-2020) or
+                        all
+  day                   competition day or a range of days (e.g. 1-10)
 
 optional arguments:
   -h, --help            show this help message and exit
@@ -14,6 +19,51 @@ optional arguments:
                         languages: c, golang, haskell, java, kotlin, lisp,
                         python, ruby, rust, scala, typescript)
   --save                save the programs output to output.txt
+  -j JOBS, --jobs JOBS  number of builds and correctness checks to run
+                        concurrently, timing always runs one solution at a time
+                        (default: number of CPUs)
+  --mem-profile         report peak memory and top allocation sites of each
+                        part (python only)
+  --profiles            build and time each solution with every build profile
+                        of its language and rank the profiles
+  --runtime-profiles    time each solution with every runtime profile (e.g. GC
+                        or JIT flags) of its language and rank the profiles
+  --pgo                 also build compiled solutions with profile-guided
+                        optimization trained on input.txt and report the
+                        speedup (c, golang and rust only)
+  --solve-and-time      check and time each solution in a single run, for
+                        executors that support it, others are run twice
+  --time-budget-ms MS   time each part for at least MS milliseconds once the
+                        minimum number of iterations ran (default: up to the
+                        executor)
+  --min-iterations N    time each part for at least N iterations, unless it is
+                        too slow (default: up to the executor)
+  --warmup N            run each part N times before timing it (default: up
+                        to the executor)
+  --snapshots           start solutions from a snapshot of their runtime that
+                        is built along with them to cut startup time (java,
+                        kotlin, lisp and typescript only)
+  --dashboard           show a live status row for every job in flight, results
+                        are shown as they complete rather than in order
+  --resume              skip the jobs completed by the previous run, unless
+                        their solution or input changed, and replay their
+                        results
+  --metrics-file FILE   write the results of the run to FILE in OpenMetrics
+                        format once it completes, e.g. for a node exporter
+                        textfile collector
+  --trace FILE          record where the solver itself spends time to FILE in
+                        Chrome Trace Event format
+
+commands:
+  benchmark             measure the latency the solver itself adds around
+                        solutions (see `aoc-solver benchmark --help`)
+  bisect                find the commit that made a solution slower (see
+                        `aoc-solver bisect --help`)
+  calibrate             measure the startup time of each language's toolchain
+                        to split overhead into startup and setup (see
+                        `aoc-solver calibrate --help`)
+  serve                 run a resident daemon that jobs are submitted to with
+                        `aoc-client` (see `aoc-solver serve --help`)
 """
 
 import os
@@ -32,36 +82,59 @@ class ExitCode:
 
 
 import argparse
-import glob
+import importlib
 import signal
 import time
 
 from datetime import datetime
 from multiprocessing import Pipe, Process
+from typing import Any, Callable, List, Optional
 
 AOC_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 SOLUTIONS_PATH = os.environ.get("AOC_SOLUTIONS_PATH", ".")
 sys.path.append(AOC_ROOT)
 
+from aoc_solver.calibration import CalibrationCache
 from aoc_solver.context_manager import ContextManager
 from aoc_solver.display_event_loop import DisplayEventLoop
+from aoc_solver.journal import Journal
+from aoc_solver.lang import IMPORT_TIMES
 from aoc_solver.lang.registry import LanguageRegistry
-from aoc_solver.solver_engine import SolverEngine
+from aoc_solver.manifest import SolutionManifest, is_single, parse_selector
+from aoc_solver.metrics import RunMetrics
+from aoc_solver.solver_engine import SharedBuilds, SolverEngine, SolverOptions
+from aoc_solver.solver_pipeline import SolverPipeline
+from aoc_solver.terminal.dashboard import Dashboard
 from aoc_solver.terminal.display import Display
+from aoc_solver.timing import TimingBudget
+from aoc_solver.trace import Tracer
 
 
-def main():
-    parser = argparse.ArgumentParser(
+# Sub-commands are dispatched on the first argument, all other invocations run the
+# solver itself
+COMMANDS = {
+    "benchmark": "aoc_solver.exe.benchmark",
+    "bisect": "aoc_solver.exe.bisect",
+    "calibrate": "aoc_solver.exe.calibrate",
+    "serve": "aoc_solver.exe.serve",
+}
+
+
+def build_parser(parser_cls=argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser = parser_cls(
         description=(
             "Run Advent of Code solution for a given year/day in the chosen language"
         )
     )
 
-    parser.add_argument("year", help=f"competition year")
-    parser.add_argument("day", help=f"competition day", nargs="?")
+    parser.add_argument(
+        "year", help="competition year, a range of years (e.g. 2015-2020) or all"
+    )
+    parser.add_argument(
+        "day", help="competition day or a range of days (e.g. 1-10)", nargs="?"
+    )
 
-    supported_languages = [l for l in LanguageRegistry.all()]
-    language_helper = f"available languages: {', '.join(supported_languages)}"
+    language_helper = f"available languages: {', '.join(LanguageRegistry.all())}"
     parser.add_argument(
         "-l",
         "--language",
@@ -71,29 +144,303 @@ def main():
     parser.add_argument(
         "--save", help=f"save the programs output to output.txt", action="store_true"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help=(
+            "number of builds and correctness checks to run concurrently, timing "
+            "always runs one solution at a time (default: number of CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "--mem-profile",
+        help="report peak memory and top allocation sites of each part (python only)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profiles",
+        help=(
+            "build and time each solution with every build profile of its language "
+            "and rank the profiles"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--runtime-profiles",
+        help=(
+            "time each solution with every runtime profile (e.g. GC or JIT flags) "
+            "of its language and rank the profiles"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--pgo",
+        help=(
+            "also build compiled solutions with profile-guided optimization trained "
+            "on input.txt and report the speedup (c, golang and rust only)"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--solve-and-time",
+        help=(
+            "check and time each solution in a single run, for executors that "
+            "support it, others are run twice"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--time-budget-ms",
+        metavar="MS",
+        type=float,
+        help=(
+            "time each part for at least MS milliseconds once the minimum number "
+            "of iterations ran (default: up to the executor)"
+        ),
+    )
+    parser.add_argument(
+        "--min-iterations",
+        metavar="N",
+        type=int,
+        help=(
+            "time each part for at least N iterations, unless it is too slow "
+            "(default: up to the executor)"
+        ),
+    )
+    parser.add_argument(
+        "--warmup",
+        metavar="N",
+        type=int,
+        help="run each part N times before timing it (default: up to the executor)",
+    )
+    parser.add_argument(
+        "--snapshots",
+        help=(
+            "start solutions from a snapshot of their runtime that is built along "
+            "with them to cut startup time (java, kotlin, lisp and typescript only)"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--dashboard",
+        help=(
+            "show a live status row for every job in flight, results are shown as "
+            "they complete rather than in order"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--resume",
+        help=(
+            "skip the jobs completed by the previous run, unless their solution or "
+            "input changed, and replay their results"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        help=(
+            "write the results of the run to FILE in OpenMetrics format once it "
+            "completes, e.g. for a node exporter textfile collector"
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help=(
+            "record where the solver itself spends time to FILE in Chrome Trace "
+            "Event format"
+        ),
+    )
+    return parser
+
+
+def argument_error(args, solutions_path: str = SOLUTIONS_PATH) -> Optional[str]:
+    """
+    There are certain combinations of arguments we want to disallow, but argparse
+    doesn't provide easy ways to do this. So this function adds additional
+    argument validations.
+
+    :param args: parsed arguments from argparse
+    """
+    if args.language:
+        unknown = [l for l in args.language if not LanguageRegistry.has(l)]
+        if unknown:
+            unknown_str = ", ".join(unknown)
+            all_str = ", ".join(LanguageRegistry.all())
+            return f"Unrecognized language(s): {unknown_str} (available: {all_str})"
+    try:
+        parse_selector(args.year)
+        parse_selector(args.day)
+    except ValueError as e:
+        return str(e)
+    if args.save:
+        if not is_single(args.year) or not is_single(args.day):
+            return "Must use `--save` with a specific day"
+        elif SolverEngine.has_solution(args.year, args.day, solutions_path):
+            return (
+                "Cannot save results when output already saved, "
+                "please delete existing file"
+            )
+    if args.jobs is not None and args.jobs < 1:
+        return "Must use at least 1 job"
+    if args.profiles and args.save:
+        return "Cannot use `--save` with `--profiles`"
+    if args.runtime_profiles and args.save:
+        return "Cannot use `--save` with `--runtime-profiles`"
+    if args.pgo and args.save:
+        return "Cannot use `--save` with `--pgo`"
+    if args.time_budget_ms is not None and args.time_budget_ms < 0:
+        return "The timing budget cannot be negative"
+    if args.min_iterations is not None and args.min_iterations < 1:
+        return "Must time at least 1 iteration"
+    if args.warmup is not None and args.warmup < 0:
+        return "The number of warmup iterations cannot be negative"
+
+
+def languages_to_solve(args) -> List[str]:
+    if args.language:
+        return [LanguageRegistry.canonical(l) for l in args.language]
+    else:
+        return list(LanguageRegistry.all())
+
+
+def solver_options(args) -> SolverOptions:
+    timing_budget = None
+    limits = [args.time_budget_ms, args.min_iterations, args.warmup]
+    if any(limit is not None for limit in limits):
+        timing_budget = TimingBudget(*limits)
+    return SolverOptions(
+        save=args.save,
+        mem_profile=args.mem_profile,
+        profiles=args.profiles,
+        runtime_profiles=args.runtime_profiles,
+        pgo=args.pgo,
+        solve_and_time=args.solve_and_time,
+        timing_budget=timing_budget,
+        snapshots=args.snapshots,
+    )
+
+
+def days_to_solve(args, manifest: SolutionManifest):
+    """
+    :yield year, day: Yields each year/day combination that the arguments
+    dictate need to be solved.
+    """
+    if is_single(args.year) and is_single(args.day):
+        # The engine reports a missing day
+        yield int(args.year), int(args.day)
+        return
+    years = parse_selector(args.year)
+    days = parse_selector(args.day)
+    found = False
+    for year in manifest.years():
+        if years is not None and year not in years:
+            continue
+        for day in manifest.days(year):
+            if days is None or day in days:
+                found = True
+                yield year, day
+    if not found:
+        selection = " ".join(s for s in [args.year, args.day] if s)
+        raise ValueError(f"No solutions found for {selection}")
+
+
+def engines_to_solve(
+    args,
+    options: SolverOptions,
+    solutions_path: str = SOLUTIONS_PATH,
+    builds: SharedBuilds = None,
+) -> List[SolverEngine]:
+    manifest = SolutionManifest(solutions_path)
+    # Loaded once for the whole run rather than for every job
+    calibration = CalibrationCache()
+    engines = [
+        SolverEngine(
+            solutions_path,
+            year,
+            day,
+            options,
+            builds,
+            manifest.files(year, day),
+            calibration,
+        )
+        for year, day in days_to_solve(args, manifest)
+    ]
+    manifest.save()
+    return engines
+
+
+def run_solver(
+    find_engines: Callable[[], List[SolverEngine]],
+    languages: List[str],
+    jobs: int = None,
+    display: Any = None,
+    live: bool = False,
+    journal: Journal = None,
+    metrics: RunMetrics = None,
+):
+    """
+    Run the solutions for all engines in a solver process while the display
+    process renders the events they emit, returning once both have shut down.
+
+    :param find_engines: called once the display is running, so errors raised
+    while finding the days to solve are displayed
+    :param jobs: number of builds and correctness checks to run concurrently
+    :param live: send events as they happen, see `SolverPipeline`
+    :param journal: journal to record completed jobs in, see `SolverPipeline`
+    :param metrics: metrics to write once all jobs ran, see `SolverPipeline`
+    """
+
+    ###
+    # The solver engine and display logic run in two separate process and
+    # communicate with each other through a pipe. The engine emits events
+    # through the pipe (e.g. timing failed) and the display process receives
+    # the events and updates accordingly. This function manages the pipe
+    # connections and processes.
+    ###
+
+    # Create the pipe connections used by the two process to communicate
+    # with each other and add them to the context manager for easy clean
+    # up when shutting down.
+    display_conn, solver_conn = Pipe(True)
+    ContextManager.add_conn(display_conn)
+    ContextManager.add_conn(solver_conn)
+
+    # Spin up the display process.
+    display_loop = DisplayEventLoop(display or Display(), display_conn)
+    display_proc = Process(target=display_loop, name="AoC-display", args=(os.getpid(),))
+    with Tracer.span("spawn", "process", process=display_proc.name):
+        ContextManager.add_proc(display_proc)
+
+    with Tracer.span("find days", "engine"):
+        engines = find_engines()
+
+    # Spin up the solver for all year/day combinations
+    pipeline = SolverPipeline(
+        solver_conn, engines, languages, jobs, live, journal, metrics
+    )
+    solver_proc = Process(target=pipeline, args=(os.getpid(),), name="AoC-solver")
+    with Tracer.span("spawn", "process", process=solver_proc.name):
+        ContextManager.add_proc(solver_proc)
+    while solver_proc.is_alive():
+        # If the display process dies for whatever reason (SIGKILL?), then
+        # we should just shutdown.
+        if not display_proc.is_alive():
+            ContextManager.shutdown()
+        time.sleep(0.01)
+    ContextManager.shutdown()
 
-    def argument_error(args):
-        """
-        There are certain combinations of arguments we want to disallow, but argparse
-        doesn't provide easy ways to do this. So this function adds additional
-        argument validations.
-
-        :param args: parsed arguments from argparse
-        """
-        if args.language:
-            unknown = [l for l in args.language if not LanguageRegistry.has(l)]
-            if unknown:
-                unknown_str = ", ".join(unknown)
-                all_str = ", ".join(supported_languages)
-                return f"Unrecognized language(s): {unknown_str} (available: {all_str})"
-        if args.save:
-            if not args.day:
-                return "Must use `--save` with a specific day"
-            elif SolverEngine.has_solution(args.year, args.day):
-                return (
-                    "Cannot save results when output already saved, "
-                    "please delete existing file"
-                )
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        command = importlib.import_module(COMMANDS[sys.argv[1]])
+        command.main(sys.argv[2:])
+        return
+
+    parser = build_parser()
 
     def sig_handler(signal: int, _frame):
         ContextManager.shutdown(signal=signal)
@@ -107,63 +454,30 @@ def main():
         print(error_message)
         sys.exit(ExitCode.INVALID_ARGS)
 
-    def days_to_solve(args):
-        """
-        :yield year, day: Yields each year/day combination that the arguments
-        dictate need to be solved.
-        """
-        if args.day:
-            yield int(args.year), int(args.day)
-        else:
-            days = glob.glob(
-                f"{os.path.join(SOLUTIONS_PATH, str(args.year))}/[0-9][0-9]"
-            )
-            if len(days) > 0:
-                days.sort()
-                for day in days:
-                    yield int(args.year), int(day.split("/")[-1])
-            else:
-                raise ValueError(f"No solutions found for {args.year}")
-
-    ###
-    # The solver engine and display logic run in two separate process and
-    # communicate with each other through a pipe. The engine emits events
-    # through the pipe (e.g. timing failed) and the display process receives
-    # the events and updates accordingly. This file manages the pipe
-    # connections and processes.
-    ###
+    if args.trace:
+        Tracer.enable(args.trace)
+        for module, start, duration in IMPORT_TIMES:
+            Tracer.complete(f"import {module}", start, duration, "import")
 
     try:
-        # Create the pipe connections used by the two process to communicate
-        # with each other and add them to the context manager for easy clean
-        # up when shutting down.
-        display_conn, solver_conn = Pipe(True)
-        ContextManager.add_conn(display_conn)
-        ContextManager.add_conn(solver_conn)
-
-        # Spin up the display process.
-        display = DisplayEventLoop(Display(), display_conn)
-        display_proc = Process(target=display, name="AoC-display", args=(os.getpid(),))
-        ContextManager.add_proc(display_proc)
+        languages = languages_to_solve(args)
+        options = solver_options(args)
 
-        if args.language:
-            languages = [LanguageRegistry.canonical(l) for l in args.language]
-        else:
-            languages = LanguageRegistry.all()
-        for year, day in days_to_solve(args):
-            # Spin up the solver for the given year/day
-            solver = SolverEngine(solver_conn, SOLUTIONS_PATH, year, day, args.save)
-            solver_proc = Process(
-                target=solver, args=(os.getpid(), languages), name="AoC-solver",
-            )
-            ContextManager.add_proc(solver_proc)
-            while solver_proc.is_alive():
-                # If the display process dies for whatever reason (SIGKILL?), then
-                # we should just shutdown.
-                if not display_proc.is_alive():
-                    ContextManager.shutdown()
-                time.sleep(0.01)
-        ContextManager.shutdown()
+        def find_engines():
+            return engines_to_solve(args, options)
+
+        display = Dashboard() if args.dashboard else Display()
+        journal = Journal(SOLUTIONS_PATH, args.resume)
+        metrics = RunMetrics(args.metrics_file) if args.metrics_file else None
+        run_solver(
+            find_engines,
+            languages,
+            args.jobs,
+            display,
+            args.dashboard,
+            journal,
+            metrics,
+        )
     except ValueError as e:
         ContextManager.shutdown(error=e)
         sys.exit(ExitCode.INVALID_ARGS)
@@ -176,6 +490,10 @@ def main():
         traceback.print_exc()
         ContextManager.shutdown(error=e)
         sys.exit(ExitCode.UNKNOWN_ERROR)
+    finally:
+        # Processes have been joined by the shutdown, so all their spans are
+        # recorded by now
+        Tracer.merge()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+"""
+usage: aoc-solver benchmark [-h] [--days DAYS] [--repeat REPEAT]
+                            [--jobs JOBS [JOBS ...]] [--events EVENTS]
+                            [--output FILE] [--compare VERSION]
+
+Measure the latency the solver harness itself adds around solutions
+
+optional arguments:
+  -h, --help            show this help message and exit
+  --days DAYS           number of stand-in solutions to run (default: 25)
+  --repeat REPEAT       number of times each measurement is repeated, the
+                        median is reported (default: 3)
+  --jobs JOBS [JOBS ...]
+                        job counts to run the solutions with (default: 1, 2, 4
+                        and the number of CPUs)
+  --events EVENTS       number of events to send through the display event
+                        loop (default: 5000)
+  --output FILE         file to store the results in (default: a file named
+                        after the version in ~/.cache/aoc_solver/benchmarks)
+  --compare VERSION     compare against the results of an earlier version or
+                        results file
+"""
+
+import argparse
+import sys
+
+from typing import Dict, List, Optional
+
+from aoc_solver.benchmark import BenchmarkError, BenchmarkResult, HarnessBenchmark
+from aoc_solver.terminal.elements import Table, Text, TextColor
+from aoc_solver.terminal.handlers import TimingDuration
+
+
+EVENTS_PER_SECOND = "events/s"
+
+
+def _metrics(result: BenchmarkResult) -> Dict[str, float]:
+    metrics = {
+        EVENTS_PER_SECOND: result.events_per_second,
+        "solution commands": result.command_time,
+    }
+    for run in result.runs:
+        metrics[f"{run.jobs} jobs: end to end"] = run.wall
+        metrics[f"{run.jobs} jobs: overhead/solution"] = run.overhead
+    return metrics
+
+
+def _format(metric: str, value: float) -> Text:
+    if metric == EVENTS_PER_SECOND:
+        return Text(f"{value:.0f}")
+    if value < 0:
+        # Noise can make the harness overhead of very fast runs negative
+        formatted, unit, _ = TimingDuration(-value * 1000000)._formatted()
+        return Text(f"-{formatted} {unit}")
+    return TimingDuration(value * 1000000).text
+
+
+def _change(metric: str, value: float, baseline: float) -> Text:
+    if not baseline:
+        return Text("-")
+    change = (value - baseline) / abs(baseline) * 100
+    improved = change > 0 if metric == EVENTS_PER_SECOND else change < 0
+    return Text(f"{change:+.1f}%", TextColor.GREEN if improved else TextColor.RED)
+
+
+def _report(result: BenchmarkResult, baseline: Optional[BenchmarkResult]) -> str:
+    headers = ["", result.version]
+    if baseline:
+        headers += [baseline.version, "change"]
+    table = [[Text(header) for header in headers]]
+    previous = _metrics(baseline) if baseline else {}
+    for metric, value in _metrics(result).items():
+        row = [Text(metric), _format(metric, value)]
+        if baseline and metric in previous:
+            row.append(_format(metric, previous[metric]))
+            row.append(_change(metric, value, previous[metric]))
+        elif baseline:
+            row += [Text("-"), Text("-")]
+        table.append(row)
+    return str(Table(table))
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="aoc-solver benchmark",
+        description=(
+            "Measure the latency the solver harness itself adds around solutions"
+        ),
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=25,
+        help="number of stand-in solutions to run (default: 25)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help=(
+            "number of times each measurement is repeated, the median is reported "
+            "(default: 3)"
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        nargs="+",
+        help=(
+            "job counts to run the solutions with (default: 1, 2, 4 and the number "
+            "of CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "--events",
+        type=int,
+        default=5000,
+        help="number of events to send through the display event loop (default: 5000)",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help=(
+            "file to store the results in (default: a file named after the version "
+            "in ~/.cache/aoc_solver/benchmarks)"
+        ),
+    )
+    parser.add_argument(
+        "--compare",
+        metavar="VERSION",
+        help="compare against the results of an earlier version or results file",
+    )
+    args = parser.parse_args(argv)
+
+    from aoc_solver.exe import ExitCode
+
+    if min(args.days, args.repeat, args.events, *(args.jobs or [1])) < 1:
+        print("Days, repeats, events and jobs must all be at least 1")
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    try:
+        baseline = BenchmarkResult.load(args.compare) if args.compare else None
+    except BenchmarkError as e:
+        print(Text(str(e), TextColor.RED), file=sys.stderr)
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    benchmark = HarnessBenchmark(args.days, args.repeat, args.jobs, args.events)
+    result = benchmark(lambda step: print(Text(step, TextColor.GREY), flush=True))
+    path = result.save(args.output)
+    print()
+    print(_report(result, baseline), end="")
+    print(f"Results saved to {path}")
@@ -0,0 +1,130 @@
+"""
+usage: aoc-solver bisect [-h] -l LANGUAGE --good GOOD [--bad BAD]
+                         [--threshold THRESHOLD] year day
+
+Find the first commit where a solution got slower than a known-good revision
+
+positional arguments:
+  year                  competition year
+  day                   competition day
+
+optional arguments:
+  -h, --help            show this help message and exit
+  -l LANGUAGE, --language LANGUAGE
+                        programming language of the solution to time
+  --good GOOD           known-good revision to compare timings against
+  --bad BAD             revision where the solution is slow (default: HEAD)
+  --threshold THRESHOLD
+                        slowdown relative to the good revision that counts as
+                        a regression, e.g. 1.2x or 20% (default: 1.2x)
+"""
+
+import argparse
+import sys
+
+from typing import List
+
+from aoc_solver.perf_bisect import (
+    BisectError,
+    Measurement,
+    PerformanceBisector,
+    parse_threshold,
+)
+from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.terminal.elements import Text, TextColor
+from aoc_solver.terminal.handlers import TimingDuration
+
+
+def _format_measurement(measurement: Measurement, baseline: Measurement = None):
+    revision = Text(measurement.revision[:10], TextColor.YELLOW)
+    if not measurement.usable:
+        reason = Text(f"skipped ({measurement.reason})", TextColor.GREY)
+        return f"{revision} {reason}"
+    timings = ", ".join(
+        f"{part}: {TimingDuration(duration)}"
+        for part, duration in measurement.timings.items()
+    )
+    if baseline:
+        timings += f", ratio: {measurement.ratio(baseline):.2f}x"
+    return f"{revision} ({timings})"
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="aoc-solver bisect",
+        description=(
+            "Find the first commit where a solution got slower than a known-good "
+            "revision"
+        ),
+    )
+    parser.add_argument("year", help="competition year", type=int)
+    parser.add_argument("day", help="competition day", type=int)
+    parser.add_argument(
+        "-l",
+        "--language",
+        required=True,
+        help="programming language of the solution to time",
+    )
+    parser.add_argument(
+        "--good", required=True, help="known-good revision to compare timings against"
+    )
+    parser.add_argument(
+        "--bad",
+        default="HEAD",
+        help="revision where the solution is slow (default: HEAD)",
+    )
+    parser.add_argument(
+        "--threshold",
+        default="1.2x",
+        help=(
+            "slowdown relative to the good revision that counts as a regression, "
+            "e.g. 1.2x or 20%% (default: 1.2x)"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    from aoc_solver.exe import SOLUTIONS_PATH, ExitCode
+
+    if not LanguageRegistry.has(args.language):
+        print(f"Unrecognized language: {args.language}")
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    try:
+        bisector = PerformanceBisector(
+            SOLUTIONS_PATH,
+            args.year,
+            args.day,
+            LanguageRegistry.canonical(args.language),
+            parse_threshold(args.threshold),
+            args.good,
+            args.bad,
+        )
+        baseline = None
+
+        def progress(measurement: Measurement):
+            nonlocal baseline
+            print(_format_measurement(measurement, baseline), flush=True)
+            if baseline is None:
+                baseline = measurement
+
+        result = bisector(progress)
+    except BisectError as e:
+        print(Text(str(e), TextColor.RED), file=sys.stderr)
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    print()
+    if not result.first_slow:
+        print(
+            Text(
+                f"No regression: {args.bad} is within {args.threshold} of {args.good}",
+                TextColor.GREEN,
+            )
+        )
+        return
+    commit = Text(result.first_slow.revision, TextColor.RED)
+    print(f"First commit slower than {args.threshold}: {commit}")
+    print(_format_measurement(result.first_slow, result.baseline))
+    if result.untestable:
+        print("The regression may also have been introduced by untestable commits:")
+        for measurement in result.untestable:
+            print(_format_measurement(measurement))
@@ -0,0 +1,99 @@
+"""
+usage: aoc-solver calibrate [-h] [-l LANGUAGE [LANGUAGE ...]] [--runs RUNS]
+
+Measure the startup time of each language's toolchain by timing its "Hello,
+World" solution in 2000/01, so the overhead of solutions can be split into
+runtime startup and solution setup
+
+optional arguments:
+  -h, --help            show this help message and exit
+  -l LANGUAGE [LANGUAGE ...], --language LANGUAGE [LANGUAGE ...]
+                        languages to calibrate (default: all languages)
+  --runs RUNS           number of times the solution is timed, the median
+                        overhead is used (default: 20)
+"""
+
+import argparse
+import sys
+
+from typing import List
+
+from aoc_solver.calibration import (
+    REFERENCE_DAY,
+    REFERENCE_YEAR,
+    CalibrationCache,
+    CalibrationError,
+    Calibrator,
+    reference_solutions,
+)
+from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.terminal.elements import Table, Text, TextColor
+from aoc_solver.terminal.handlers import TimingDuration
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="aoc-solver calibrate",
+        description=(
+            "Measure the startup time of each language's toolchain by timing its "
+            f'"Hello, World" solution in {REFERENCE_YEAR}/{str(REFERENCE_DAY).zfill(2)}'
+            ", so the overhead of solutions can be split into runtime startup and "
+            "solution setup"
+        ),
+    )
+    parser.add_argument(
+        "-l",
+        "--language",
+        nargs="+",
+        help="languages to calibrate (default: all languages)",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=20,
+        help=(
+            "number of times the solution is timed, the median overhead is used "
+            "(default: 20)"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    from aoc_solver.exe import SOLUTIONS_PATH, ExitCode
+
+    if args.language:
+        unknown = [l for l in args.language if not LanguageRegistry.has(l)]
+        if unknown:
+            print(f"Unrecognized language(s): {', '.join(unknown)}")
+            sys.exit(ExitCode.INVALID_ARGS)
+        languages = [LanguageRegistry.canonical(l) for l in args.language]
+    else:
+        languages = list(LanguageRegistry.all())
+    if args.runs < 1:
+        print("Must use at least 1 run")
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    try:
+        solutions_path = reference_solutions(SOLUTIONS_PATH)
+    except CalibrationError as e:
+        print(Text(str(e), TextColor.RED), file=sys.stderr)
+        sys.exit(ExitCode.INVALID_ARGS)
+
+    cache = CalibrationCache()
+    table = [[Text(""), Text("startup")]]
+    skipped = []
+    for language in languages:
+        print(Text(f"calibrating {language}", TextColor.GREY), flush=True)
+        try:
+            baseline = Calibrator(solutions_path, language, args.runs)()
+        except CalibrationError as e:
+            table.append([Text(language), Text("-")])
+            skipped.append(Text(f"Skipped {language}: {e}", TextColor.GREY))
+            continue
+        cache.set(baseline)
+        table.append([Text(language), TimingDuration(baseline.startup).text])
+    cache.save()
+    print()
+    print(Table(table), end="")
+    for reason in skipped:
+        print(reason)
+    print(f"Baselines saved to {cache.path}")
@@ -0,0 +1,51 @@
+"""
+usage: aoc-solver serve [-h] [--socket SOCKET]
+
+Run a resident solver daemon that keeps languages loaded and builds cached
+between jobs submitted with `aoc-client`
+
+optional arguments:
+  -h, --help       show this help message and exit
+  --socket SOCKET  path of the Unix domain socket to listen on
+"""
+
+import argparse
+import signal
+import sys
+
+from typing import List
+
+from aoc_solver.client import default_socket_path
+from aoc_solver.daemon import SolverDaemon
+from aoc_solver.terminal.elements import Text, TextColor
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(
+        prog="aoc-solver serve",
+        description=(
+            "Run a resident solver daemon that keeps languages loaded and builds "
+            "cached between jobs submitted with `aoc-client`"
+        ),
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="path of the Unix domain socket to listen on",
+    )
+    args = parser.parse_args(argv)
+
+    from aoc_solver.exe import ExitCode
+
+    daemon = SolverDaemon(args.socket)
+
+    def sig_handler(signal: int, _frame):
+        daemon.shutdown()
+
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    print(Text(f"Listening on {args.socket}", TextColor.GREY), flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        sys.exit(ExitCode.SIGINT)
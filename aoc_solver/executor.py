@@ -0,0 +1,181 @@
+"""
+Executor for Python solutions, implementing the solving and timing protocol
+described in lang/README.md, e.g.
+
+    import sys
+
+    from aoc_solver.executor import AocExecutor
+
+    executor = AocExecutor(input, part1_solution, part2_solution)
+    executor(sys.argv)
+
+This module is imported by the solution's own interpreter, so it must only depend
+on the standard library.
+"""
+
+import copy
+import gc
+import json
+import time
+
+from typing import Any, Callable, List, Optional, Tuple
+
+# Time (in milliseconds) spent timing each part once enough iterations have run
+DEFAULT_BUDGET_MS = 100
+# Iterations each part should run, unless they take longer than `MAX_DURATION_MS`
+DEFAULT_MIN_ITERATIONS = 100
+# Time (in milliseconds) after which timing a part stops, however few iterations
+MAX_DURATION_MS = 30000
+# Number of iterations whose individual times are reported
+MAX_SAMPLES = 10000
+
+
+def freeze(value: Any) -> Any:
+    """
+    :return: the value with all lists (recursively) converted to tuples, so it can
+    be shared between iterations without being copied
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def read_lines(filename: str) -> List[str]:
+    with open(filename, "r") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+class AocExecutor:
+    """
+    Runs the solution of each part and prints the results, or times them with
+    `--time`. With `--solve-and-time` the results of the first timed iteration
+    are printed, followed by the timing on the last line.
+
+    Since a part may not depend on what an earlier iteration did to its input, each
+    call gets its own shallow copy of the input, which is made before the clock
+    starts. Solutions that never modify their input may pass `frozen=True`, the
+    input is then frozen into tuples once and the same object is passed to every
+    call, which costs nothing per iteration.
+
+    :param input: the puzzle input, typically a list of lines or numbers
+    :param part1: solution of part 1, called with the input
+    :param part2: solution of part 2, called with the input
+    :param parse: turns the lines of the file given with `--input FILE` into the
+    input, by default the lines are used as they are
+    :param frozen: share the input, frozen into tuples, between all calls
+    :param budget_ms: time to spend timing each part once it ran `min_iterations`
+    :param min_iterations: number of iterations to run unless the part is too slow
+    :param warmup: number of untimed iterations to run before timing each part
+
+    The solver script may override the last three with `--time-budget-ms`,
+    `--min-iterations` and `--warmup`.
+    """
+
+    def __init__(
+        self,
+        input: Any,
+        part1: Callable[[Any], Any],
+        part2: Callable[[Any], Any],
+        parse: Callable[[List[str]], Any] = None,
+        frozen: bool = False,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        min_iterations: int = DEFAULT_MIN_ITERATIONS,
+        warmup: int = 0,
+    ):
+        self.input = input
+        self.parts = {"part1": part1, "part2": part2}
+        self.parse = parse
+        self.frozen = frozen
+        self.budget_ns = int(budget_ms * 1000000)
+        self.min_iterations = min_iterations
+        self.warmup = warmup
+        self._prepared = None
+
+    def __call__(self, argv: List[str]):
+        input_file = self._option(argv, "--input")
+        if input_file:
+            lines = read_lines(input_file)
+            self.input = self.parse(lines) if self.parse else lines
+        budget_ms = self._option(argv, "--time-budget-ms")
+        if budget_ms is not None:
+            self.budget_ns = int(float(budget_ms) * 1000000)
+        min_iterations = self._option(argv, "--min-iterations")
+        if min_iterations is not None:
+            self.min_iterations = int(min_iterations)
+        warmup = self._option(argv, "--warmup")
+        if warmup is not None:
+            self.warmup = int(warmup)
+        self._prepared = freeze(self.input) if self.frozen else self.input
+        if "--time" in argv or "--solve-and-time" in argv:
+            timing = {"version": 2}
+            results = []
+            for name, part in self.parts.items():
+                timing[name], result = self._time(part)
+                results.append(result)
+            if "--solve-and-time" in argv:
+                for result in results:
+                    print(result)
+            print(json.dumps(timing))
+        else:
+            for part in self.parts.values():
+                print(part(self._next_input()))
+
+    def _next_input(self) -> Any:
+        return self._prepared if self.frozen else copy.copy(self._prepared)
+
+    def _time(self, part: Callable[[Any], Any]) -> Tuple[dict, Any]:
+        """
+        Call the part until it ran for at least `min_iterations` and the time
+        budget, and at least once since the protocol requires an iteration. The
+        garbage collector only runs between calls so its pauses are never measured
+
+        :return: the timing of the part and the result of its first call
+        """
+        samples = []
+        first_result = None
+        iterations = 0
+        duration = 0
+        slowest = 0
+        max_duration = MAX_DURATION_MS * 1000000
+        for _ in range(self.warmup):
+            part(self._next_input())
+        gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.disable()
+        try:
+            while (
+                not iterations
+                or (iterations < self.min_iterations and duration < max_duration)
+                or duration < self.budget_ns
+            ):
+                input = self._next_input()
+                start = time.perf_counter_ns()
+                result = part(input)
+                elapsed = time.perf_counter_ns() - start
+                if not iterations:
+                    first_result = result
+                del input, result
+                iterations += 1
+                duration += elapsed
+                slowest = max(slowest, elapsed)
+                if len(samples) < MAX_SAMPLES:
+                    samples.append(elapsed / 1000)
+                if gc.get_count()[0] > gc.get_threshold()[0]:
+                    gc.collect(0)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        timing = {
+            "iterations": iterations,
+            "duration": duration / 1000,
+            "samples": samples,
+            "first": samples[0],
+            "max": slowest / 1000,
+        }
+        return timing, first_result
+
+    @staticmethod
+    def _option(argv: List[str], name: str) -> Optional[str]:
+        if name in argv and argv.index(name) + 1 < len(argv):
+            return argv[argv.index(name) + 1]
+        return None
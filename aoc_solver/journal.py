@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from aoc_solver import CACHE_DIR
+from aoc_solver.event_codec import decode_event, encode_event
+from aoc_solver.solver_engine import LanguageSolver, SharedBuilds
+from aoc_solver.types import PipeMessage
+
+JOURNAL_DIR = os.path.join(CACHE_DIR, "journals")
+
+
+class Journal:
+    """
+    Append-only log of the jobs a run has completed, with the events each one sent
+    and its outcome. Every job is flushed to disk before the next one starts, so
+    a run that is interrupted (or a machine that goes down) loses at most the job
+    in flight. A resumed run skips the jobs in the journal and replays them.
+
+    Jobs are keyed by their solution, inputs and options, including modification
+    times, so a job runs again once anything it depends on changes.
+    """
+
+    def __init__(self, solutions_path: str, resume: bool = False, path: str = None):
+        """
+        :param resume: keep the jobs completed by the previous run, otherwise the
+        journal starts out empty
+        :param path: defaults to a file named after the solutions directory
+        """
+        if not path:
+            digest = hashlib.sha1(os.path.abspath(solutions_path).encode("utf-8"))
+            path = os.path.join(JOURNAL_DIR, f"{digest.hexdigest()[:16]}.jsonl")
+        self.path = path
+        self.resume = resume
+        self._completed: Dict[str, dict] = {}
+        self._file = None
+        if resume:
+            self._load()
+
+    def completed(self, solver: LanguageSolver) -> Optional[dict]:
+        """
+        :return: the journaled job with "passed", "timing_info" and "events", if
+        the solver's job has been completed
+        """
+        record = self._completed.get(self._key(solver))
+        if not record:
+            return None
+        return {
+            "passed": record["passed"],
+            "timing_info": decode_event(record["timing_info"]),
+            "events": [decode_event(event) for event in record["events"]],
+        }
+
+    def record(self, solver: LanguageSolver, events: List[PipeMessage]):
+        if not self._file:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, "a" if self.resume else "w")
+        record = {
+            "key": self._key(solver),
+            "passed": solver.passed,
+            "timing_info": encode_event(solver.timing_info),
+            "events": [encode_event(event) for event in events],
+        }
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last job was cut off mid-write
+                        continue
+                    self._completed[record["key"]] = record
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _key(solver: LanguageSolver) -> str:
+        pair = solver.pair
+        return json.dumps(
+            [
+                solver.year,
+                solver.day,
+                solver.language,
+                solver.filename,
+                solver.profile,
+                solver.pgo,
+                solver.runtime_profile,
+                pair.label,
+                SharedBuilds.sources_stamp(solver.filename),
+                [_mtime(path) for path in [pair.input_file, pair.expected_file]],
+                asdict(solver.options),
+            ]
+        )
+
+
+def _mtime(path: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns if path else None
+    except FileNotFoundError:
+        return None
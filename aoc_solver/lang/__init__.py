@@ -1,4 +1,12 @@
 import os, pkgutil
 
+from aoc_solver.trace import now_us
+
+# Tuples of (module, start, duration) in microseconds for each language module,
+# so the time spent importing them can be traced
+IMPORT_TIMES = []
+
 for _, module, _ in pkgutil.iter_modules([os.path.dirname(__file__)]):
+    start = now_us()
     __import__(".".join(["aoc_solver", "lang", module]))
+    IMPORT_TIMES.append((module, start, now_us() - start))
@@ -1,5 +1,6 @@
 import glob
 import os
+import shutil
 
 from aoc_solver import SOLUTIONS_ROOT
 from aoc_solver.lang.registry import LanguageSettings, register_language
@@ -7,12 +8,43 @@ from aoc_solver.lang.registry import LanguageSettings, register_language
 
 @register_language(name="c", extension="c")
 class CSettings(LanguageSettings):
+    TOOLCHAIN = ("gcc",)
+    BUILD_PROFILES = {
+        "default": "gcc -O3",
+        "gcc-O2": "gcc -O2",
+        "gcc-native": "gcc -O3 -march=native",
+        "gcc-Ofast": "gcc -Ofast -march=native",
+        "gcc-lto": "gcc -O3 -march=native -flto",
+        "clang-O3": "clang -O3",
+        "clang-native": "clang -O3 -march=native",
+        "clang-lto": "clang -O3 -march=native -flto",
+    }
+    SUPPORTS_PGO = True
     LIB_FILES = glob.glob(
         os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.c", "src", "*.c")
     )
 
     def compile(self):
-        yield f"gcc -O3 -o {self._bin_file} {self.file} {' '.join(self.LIB_FILES)}"
+        if not self.pgo:
+            yield self._compile_cmd()
+            return
+        # GCC reads the .gcda files straight from the directory they were written
+        # to, Clang needs the raw profiles merged with llvm-profdata first
+        clang = self._profile_flags.startswith("clang")
+        raw_dir = self._pgo_file("profraw" if clang else "gcda")
+        profile = self._pgo_file("profdata") if clang else raw_dir
+        if self._pgo_outdated(profile):
+            shutil.rmtree(raw_dir, ignore_errors=True)
+            yield self._compile_cmd(f"-fprofile-generate={raw_dir}")
+            yield self.solve()
+            if clang:
+                yield f"llvm-profdata merge -o {profile} {raw_dir}"
+        yield self._compile_cmd(f"-fprofile-use={profile}")
+
+    def _compile_cmd(self, pgo_flags: str = ""):
+        lib_files = " ".join(self.LIB_FILES)
+        flags = f"{self._profile_flags} {pgo_flags}".rstrip()
+        return f"{flags} -o {self._bin_file} {self.file} {lib_files}"
 
     def solve(self):
         return os.path.join(".", self._bin_file)
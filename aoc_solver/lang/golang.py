@@ -1,4 +1,5 @@
 import os
+import threading
 
 from aoc_solver import SOLUTIONS_ROOT
 from aoc_solver.lang.registry import LanguageSettings, register_language
@@ -6,7 +7,19 @@ from aoc_solver.lang.registry import LanguageSettings, register_language
 
 @register_language(name="golang", extension="go")
 class GolangSettings(LanguageSettings):
+    TOOLCHAIN = ("go",)
+    BUILD_PROFILES = {"default": "", "no-bounds-checks": "-gcflags=-B"}
+    # Environment variables read by the Go runtime
+    RUNTIME_PROFILES = {
+        "default": "",
+        "gogc-off": "GOGC=off",
+        "gogc-400": "GOGC=400",
+        "single-proc": "GOMAXPROCS=1",
+    }
+    SUPPORTS_PGO = True
     LIB_PATH = os.path.abspath(os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.go"))
+    # Compiled packages are installed to the shared -pkgdir
+    BUILD_LOCK = threading.Lock()
 
     def compile(self):
         actual_path = os.environ.get("GOPATH") and os.path.abspath(
@@ -17,7 +30,27 @@ class GolangSettings(LanguageSettings):
                 f"Please set the following environment variable\nGOPATH={self.LIB_PATH}"
             )
             raise Exception(message)
-        yield f"go build -pkgdir {self.LIB_PATH} -o {self._bin_file} {self.file}"
+        if not self.pgo:
+            yield self._compile_cmd()
+            return
+        # Go has no instrumented builds, it is optimized with a CPU profile that
+        # the executor writes when given `--cpuprofile`. Timing runs the parts
+        # long enough to collect a useful number of samples.
+        profile = self._pgo_file("pprof")
+        if self._pgo_outdated(profile):
+            yield self._compile_cmd()
+            yield f"{self.time()} --cpuprofile {profile}"
+        yield self._compile_cmd(f"-pgo={profile}")
+
+    def _compile_cmd(self, pgo_flags: str = ""):
+        flags = f"{self._profile_flags} {pgo_flags}".strip()
+        flags = f"{flags} " if flags else ""
+        output = f"-o {self._bin_file} {self.file}"
+        return f"go build {flags}-pkgdir {self.LIB_PATH} {output}"
 
     def solve(self):
-        return os.path.join(".", self._bin_file)
+        bin_file = os.path.join(".", self._bin_file)
+        if self._runtime_args:
+            # Commands do not run in a shell, so the variables are set with env
+            return f"env{self._runtime_args} {bin_file}"
+        return bin_file
@@ -5,8 +5,14 @@ from aoc_solver.lang.registry import LanguageSettings, register_language
 
 @register_language(name="haskell", extension="hs", timing=False)
 class HaskellSettings(LanguageSettings):
+    TOOLCHAIN = ("ghc",)
+    BUILD_PROFILES = {"default": "", "O1": "-O1", "O2": "-O2"}
+
     def compile(self):
-        yield f"ghc -o {self._bin_file} {self.file}"
+        flags = f"{self._profile_flags} " if self._profile_flags else ""
+        # Object and interface files are written next to the sources by default
+        outputs = f"-outputdir {self._bin_file}_ghc -o {self._bin_file}"
+        yield f"ghc {flags}{outputs} {self.file}"
 
     def solve(self):
         return os.path.join(".", self._bin_file)
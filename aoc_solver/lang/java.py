@@ -1,43 +1,112 @@
 import glob
 import os
+import threading
 
 from aoc_solver import SOLUTIONS_ROOT
-from aoc_solver.lang.registry import LanguageSettings, register_language
+from aoc_solver.lang.registry import (
+    SNAPSHOT_DIR,
+    LanguageSettings,
+    artifact_dir,
+    register_language,
+)
+
+# Runtime profiles of the JVM languages
+JVM_RUNTIME_PROFILES = {
+    "default": "",
+    "parallel-gc": "-XX:+UseParallelGC",
+    "c1-only": "-XX:TieredStopAtLevel=1",
+    "large-heap": "-Xms2g -Xmx2g -XX:+AlwaysPreTouch",
+}
+
+
+def archive_classes(settings: LanguageSettings, jar_file: str):
+    """
+    Dump the classes that a run of the jar loads into a dynamic AppCDS archive
+    (JDK 13+), which later runs map into memory instead of loading and verifying
+    each class again. The JVM rejects the archive once the jar changes or moves,
+    so it is dumped again after every build, from the promoted jar.
+    """
+    archive = settings._snapshot_file("jsa")
+    if settings._snapshot_outdated(archive, jar_file):
+        yield f"mkdir -p {SNAPSHOT_DIR}"
+        yield f"java -XX:ArchiveClassesAtExit={archive} -jar {jar_file}"
+
+
+def archive_args(settings: LanguageSettings) -> str:
+    """
+    :return: the JVM flags to start from the AppCDS archive of the solution, if
+    it has one
+    """
+    if not settings.snapshot:
+        return ""
+    return f" -XX:SharedArchiveFile={settings._snapshot_file('jsa')}"
 
 
 @register_language(name="java", extension="java")
 class JavaSettings(LanguageSettings):
+    TOOLCHAIN = ("javac", "java")
+    RUNTIME_PROFILES = JVM_RUNTIME_PROFILES
+    SUPPORTS_BATCH = True
+    SUPPORTS_SNAPSHOT = True
     LIB_DIR = os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.java", "src")
     LIB_SRC = glob.glob(os.path.join(LIB_DIR, "**", "*.java"))
-    LIB_CLS = glob.glob(os.path.join(LIB_DIR, "**", "*.class"))
+    LIB_CLASSES_DIR = artifact_dir(LIB_DIR)
+    BUILD_LOCK = threading.Lock()
 
-    def __init__(self, file):
-        self._jar_file = file.replace(".java", ".jar")
-        super(JavaSettings, self).__init__(file)
+    @property
+    def _jar_file(self):
+        return os.path.join(self._out_dir, f"{self._main_class}.jar")
+
+    @property
+    def _classes_dir(self):
+        # Each solution compiles to a directory of its own, so the variants of a
+        # day can be built at the same time
+        return f"{self._bin_file}_classes"
+
+    @classmethod
+    def batch_compile(cls, _batch):
+        # Solutions of different days share class names in the default package, so
+        # they cannot share a javac invocation, but the executor library they link
+        # against is compiled only once
+        yield from cls._compile_lib()
 
     def compile(self):
         yield from self._purge_class_files()
-        yield f"javac -sourcepath {self.LIB_DIR} -d {self.LIB_DIR} {' '.join(self.LIB_SRC)}"
-        yield f"javac -sourcepath {self._base_dir} -classpath {self.LIB_DIR} -d {self._base_dir} {self.file}"
+        if not self.batched:
+            yield from self._compile_lib()
+        yield f"mkdir -p {self._classes_dir}"
+        yield f"javac -sourcepath {self._base_dir} -classpath {self.LIB_CLASSES_DIR} -d {self._classes_dir} {self.file}"
         yield from self._build_jar()
         yield from self._purge_class_files()
 
+    def post_build(self):
+        if self.snapshot:
+            yield from archive_classes(self, self._jar_file)
+
     def solve(self):
-        return f"java -jar {self._jar_file}"
+        jvm_args = f"{self._runtime_args}{archive_args(self)}"
+        return f"java{jvm_args} -jar {self._jar_file}"
+
+    @classmethod
+    def _compile_lib(cls):
+        yield f"mkdir -p {cls.LIB_CLASSES_DIR}"
+        yield f"javac -sourcepath {cls.LIB_DIR} -d {cls.LIB_CLASSES_DIR} {' '.join(cls.LIB_SRC)}"
 
     def _purge_class_files(self):
-        class_files = glob.glob(os.path.join(self._base_dir, "*.class"))
-        if class_files:
-            yield f"rm {' '.join(class_files)}"
+        if os.path.exists(self._classes_dir):
+            yield f"rm -r {self._classes_dir}"
 
     def _build_jar(self):
-        class_files = glob.glob(os.path.join(self._base_dir, "*.class"))
+        class_files = glob.glob(os.path.join(self._classes_dir, "*.class"))
         if not class_files:
             raise Exception("No class files generated by javac")
+        lib_classes = glob.glob(
+            os.path.join(self.LIB_CLASSES_DIR, "**", "*.class"), recursive=True
+        )
         jar_classes = self._jar_class_arguments(
-            self._base_dir, class_files
-        ) + self._jar_class_arguments(self.LIB_DIR, self.LIB_CLS)
-        yield f"jar cfe {self._jar_file} Main {' '.join(jar_classes)}"
+            self._classes_dir, class_files
+        ) + self._jar_class_arguments(self.LIB_CLASSES_DIR, lib_classes)
+        yield f"jar cfe {self._jar_file} {self._main_class} {' '.join(jar_classes)}"
 
     @staticmethod
     def _jar_class_arguments(base_dir, class_files):
@@ -2,20 +2,29 @@ import glob
 import os
 
 from aoc_solver import SOLUTIONS_ROOT
+from aoc_solver.lang.java import JVM_RUNTIME_PROFILES, archive_args, archive_classes
 from aoc_solver.lang.registry import LanguageSettings, register_language
 
 
 @register_language(name="kotlin", extension="kt")
 class KotlinSettings(LanguageSettings):
+    TOOLCHAIN = ("kotlinc", "java")
+    RUNTIME_PROFILES = JVM_RUNTIME_PROFILES
+    SUPPORTS_SNAPSHOT = True
     SRC_DIR = os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.kt", "src")
     SRC_FILES = glob.glob(os.path.join(SRC_DIR, "**", "*.kt"))
 
-    def __init__(self, file):
-        self._jar_file = file.replace(".kt", ".jar")
-        super(KotlinSettings, self).__init__(file)
+    @property
+    def _jar_file(self):
+        return os.path.join(self._out_dir, f"{self._bin_name}.jar")
 
     def compile(self):
         yield f"kotlinc {self.file} {' '.join(self.SRC_FILES)} -include-runtime -d {self._jar_file}"
 
+    def post_build(self):
+        if self.snapshot:
+            yield from archive_classes(self, self._jar_file)
+
     def solve(self):
-        return f"java -jar {self._jar_file}"
+        jvm_args = f"{self._runtime_args}{archive_args(self)}"
+        return f"java{jvm_args} -jar {self._jar_file}"
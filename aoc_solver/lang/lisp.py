@@ -1,7 +1,35 @@
-from aoc_solver.lang.registry import LanguageSettings, register_language
+import os
+
+from aoc_solver import SOLUTIONS_ROOT
+from aoc_solver.lang.registry import (
+    SNAPSHOT_DIR,
+    LanguageSettings,
+    register_language,
+)
 
 
 @register_language(name="lisp", extension="lisp")
 class ListSettings(LanguageSettings):
+    TOOLCHAIN = ("sbcl",)
+    # Runtime options must come before --script
+    RUNTIME_PROFILES = {"default": "", "large-heap": "--dynamic-space-size 4096"}
+    SUPPORTS_SNAPSHOT = True
+    LIB_FILE = os.path.join(
+        SOLUTIONS_ROOT, "..", "aoc_executor.lisp", "src", "executor.lisp"
+    )
+    # Core with the executor loaded, which all solutions share
+    CORE_FILE = os.path.join(SNAPSHOT_DIR, "sbcl-executor.core")
+
+    def compile(self):
+        if self.snapshot and self._snapshot_outdated(self.CORE_FILE, self.LIB_FILE):
+            # Save to a file of this solution's own first, since other solutions
+            # may be saving the core at the same time
+            core_file = self._snapshot_file("core")
+            save = f'(sb-ext:save-lisp-and-die "{core_file}")'
+            yield f"mkdir -p {SNAPSHOT_DIR}"
+            yield f"sbcl --non-interactive --no-userinit --load {self.LIB_FILE} --eval '{save}'"
+            yield f"mv {core_file} {self.CORE_FILE}"
+
     def solve(self):
-        return f"sbcl --script {self.file}"
+        core_args = f" --core {self.CORE_FILE}" if self.snapshot else ""
+        return f"sbcl{core_args}{self._runtime_args} --script {self.file}"
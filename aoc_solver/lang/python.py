@@ -1,7 +1,20 @@
+import os
+
 from aoc_solver.lang.registry import LanguageSettings, register_language
 
 
 @register_language(name="python", extension="py")
 class PythonSettings(LanguageSettings):
+    TOOLCHAIN = ("python",)
+    PROFILER = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "memory_profiler.py"
+    )
+
     def solve(self):
         return f"python {self.file}"
+
+    def mem_profile(self, report_file):
+        # Launched through runpy rather than as a script, which would put the
+        # package directory, where `types` shadows the standard library, on the path
+        launch = f"import runpy; runpy.run_path({self.PROFILER!r}, run_name='__main__')"
+        return f'python -c "{launch}" --report {report_file} {self.file}'
@@ -1,33 +1,257 @@
+import glob
+import hashlib
 import os
 
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from aoc_solver import CACHE_DIR
+from aoc_solver.timing import TimingBudget
+
+# Build profile used unless another one is pinned or requested
+DEFAULT_PROFILE = "default"
+# Startup snapshots of runtimes, which are specific to the installed toolchain
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+# Artifacts of builds, in directories that mirror the absolute paths of the
+# solutions so the solutions tree stays clean
+BUILD_DIR = os.path.join(CACHE_DIR, "builds")
+
+
+def artifact_dir(path: str) -> str:
+    """
+    :return: directory under `BUILD_DIR` for the artifacts built from the files in
+    the given directory
+    """
+    return os.path.join(BUILD_DIR, os.path.abspath(path).lstrip(os.sep))
 
 
 class UnsupportedLanguage(Exception):
     pass
 
 
+class UnsupportedProfile(Exception):
+    pass
+
+
 @dataclass
 class LanguageSettings:
+    # Executables used to build and run solutions, which identify the installed
+    # toolchain when calibrating its startup time
+    TOOLCHAIN = ()
+    # Named sets of compiler flags, see `_profile_flags`
+    BUILD_PROFILES = {}
+    # Named sets of flags for the runtime that runs the solution, e.g. GC or JIT
+    # settings, see `_runtime_args`
+    RUNTIME_PROFILES = {}
+    # Whether `compile` supports profile-guided optimization, see `pgo`
+    SUPPORTS_PGO = False
+    # Whether several solutions can share a build, see `batch_compile`
+    SUPPORTS_BATCH = False
+    # Whether the runtime can start from a snapshot, see `snapshot`
+    SUPPORTS_SNAPSHOT = False
+    # Lock held while `compile` runs, for languages whose builds write to files
+    # shared between solutions (e.g. a library compiled along with each solution
+    # that isn't `batched`), so they don't clobber each other's outputs
+    BUILD_LOCK = None
+
     file: str
+    # Puzzle input to run the solution against, `None` for the default input
+    input_file: Optional[str] = None
+    # Build profile to compile the solution with, `None` for the default profile
+    profile: Optional[str] = None
+    # Build with profile-guided optimization: an instrumented build is trained on
+    # the default input and the solution is rebuilt with the collected profile
+    pgo: bool = False
+    # Runtime profile to run the solution with, `None` for the default profile
+    runtime_profile: Optional[str] = None
+    # What `batch_compile` builds has already been built for this solution, so
+    # `compile` should skip it
+    batched: bool = False
+    # How long to time each part, `None` to leave it to the executor
+    timing_budget: Optional[TimingBudget] = None
+    # Build a snapshot of the runtime with the executor (and solution) loaded
+    # along with the solution, which `solve` starts from to skip loading them
+    snapshot: bool = False
+    # Directory the running build writes its artifacts to, see `_out_dir`
+    scratch_dir: Optional[str] = None
+
+    @classmethod
+    def batch_compile(cls, _batch: List["LanguageSettings"]) -> Iterator[str]:
+        """
+        :return: commands that build what the solutions in the batch have in common
+        at once, e.g. a library they all link against or all of the sources in a
+        single compiler invocation. They run before the `compile` of each solution
+        """
+        return iter(())
+
+    @classmethod
+    def batch_failures(
+        cls, _batch: List["LanguageSettings"], _output: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        :param _output: what the failed batch build wrote to stdout and stderr
+        :return: the errors of each file in the batch that made the build fail, all
+        other files are considered built. `None` if the errors cannot be attributed
+        to files, in which case each solution is built on its own
+        """
+        return None
 
     def compile(_self):
         pass
 
+    def post_build(self) -> Iterator[str]:
+        """
+        :return: commands to run once the artifacts of the build were promoted to
+        `_artifact_dir`, e.g. ones that record the final path of an artifact
+        """
+        return iter(())
+
     def solve(self):
         raise NotImplementedError(f"{type(self).__name__} must implement solve()")
 
     def time(self):
-        return f"{self.solve()} --time"
+        return f"{self.solve()} --time{self.timing_args}"
+
+    def solve_and_time(self):
+        return f"{self.solve()} --solve-and-time{self.timing_args}"
+
+    @property
+    def timing_args(self) -> str:
+        """
+        Arguments appended to the `time` command to tell the executor how long to
+        time each part
+        """
+        return self.timing_budget.args if self.timing_budget else ""
+
+    @property
+    def input_args(self) -> str:
+        """
+        Arguments appended to the `solve`, `time` and `mem_profile` commands to
+        tell the executor which input to read
+        """
+        return f" --input {self.input_file}" if self.input_file else ""
+
+    def mem_profile(self, _report_file: str):
+        """
+        :return: command that runs the solution with memory profiling and writes
+        a JSON report to `report_file`, `None` if the language doesn't support it
+        """
+        return None
 
     @property
     def _base_dir(self):
         return os.path.dirname(self.file)
 
+    @property
+    def _main_class(self) -> str:
+        """
+        :return: name of the class with the entry point on the JVM, which is named
+        after the file, e.g. `Main` for main.java and `MainDp` for MainDp.java
+        """
+        name = os.path.splitext(os.path.basename(self.file))[0]
+        return name[:1].upper() + name[1:]
+
+    @property
+    def _profile_flags(self) -> str:
+        """
+        :return: the compiler flags of the build profile
+        """
+        name = self.profile or DEFAULT_PROFILE
+        if name not in self.BUILD_PROFILES:
+            available = ", ".join(self.BUILD_PROFILES) or "none"
+            raise UnsupportedProfile(
+                f"Unknown build profile {name} (available: {available})"
+            )
+        return self.BUILD_PROFILES[name]
+
+    @property
+    def _runtime_args(self) -> str:
+        """
+        :return: the flags of the runtime profile for `solve` to pass to the
+        runtime, with a leading space unless there are none. They only change how
+        the solution runs, so all runtime profiles share a build
+        """
+        name = self.runtime_profile or DEFAULT_PROFILE
+        if name not in self.RUNTIME_PROFILES:
+            if name == DEFAULT_PROFILE:
+                return ""
+            available = ", ".join(self.RUNTIME_PROFILES) or "none"
+            raise UnsupportedProfile(
+                f"Unknown runtime profile {name} (available: {available})"
+            )
+        flags = self.RUNTIME_PROFILES[name]
+        return f" {flags}" if flags else ""
+
+    @property
+    def _artifact_dir(self) -> str:
+        """
+        :return: directory the artifacts of the solution are kept in
+        """
+        return artifact_dir(self._base_dir)
+
+    @property
+    def _out_dir(self) -> str:
+        """
+        :return: directory to write artifacts to, a scratch directory while the
+        solution is built whose files are promoted to `_artifact_dir` once the
+        build succeeded (see `ScratchBuild`)
+        """
+        return self.scratch_dir or self._artifact_dir
+
+    @property
+    def _bin_name(self) -> str:
+        bin_name = "_".join(os.path.basename(self.file).rsplit(".", 1))
+        if self.profile and self.profile != DEFAULT_PROFILE:
+            # Keep the artifacts of each profile apart so they can be compared
+            bin_name += f".{self.profile}"
+        if self.pgo:
+            bin_name += ".pgo"
+        return bin_name
+
     @property
     def _bin_file(self):
-        return "_".join(self.file.rsplit(".", 1))
+        return os.path.join(self._out_dir, self._bin_name)
+
+    def _pgo_file(self, ext: str) -> str:
+        """
+        :return: path to keep the profile of a PGO build in, next to the promoted
+        binary so later builds reuse it
+        """
+        return os.path.join(self._artifact_dir, f"{self._bin_name}.{ext}")
+
+    def _snapshot_file(self, ext: str) -> str:
+        """
+        :return: path to keep a startup snapshot of the solution in, in the cache
+        since it only works with the runtime that built it
+        """
+        bin_file = os.path.join(self._artifact_dir, self._bin_name)
+        digest = hashlib.sha1(bin_file.encode()).hexdigest()[:12]
+        return os.path.join(SNAPSHOT_DIR, f"{self._bin_name}.{digest}.{ext}")
+
+    @staticmethod
+    def _snapshot_outdated(snapshot_file: str, *sources: str) -> bool:
+        """
+        :return: True if the snapshot has not been built yet or any of the files
+        it was built from changed since it was
+        """
+        if not os.path.exists(snapshot_file):
+            return True
+        built = os.stat(snapshot_file).st_mtime_ns
+        return any(os.stat(source).st_mtime_ns > built for source in sources)
+
+    def _pgo_outdated(self, profile_file: str) -> bool:
+        """
+        :return: True if the profile has not been collected yet or any source file
+        changed since it was
+        """
+        if not os.path.exists(profile_file):
+            return True
+        collected = os.stat(profile_file).st_mtime_ns
+        ext = os.path.splitext(self.file)[1]
+        return any(
+            os.stat(source).st_mtime_ns > collected
+            for source in glob.glob(os.path.join(self._base_dir, f"*{ext}"))
+        )
 
 
 class LanguageRegistry:
@@ -3,5 +3,8 @@ from aoc_solver.lang.registry import LanguageSettings, register_language
 
 @register_language(name="ruby", extension="rb")
 class RubySettings(LanguageSettings):
+    TOOLCHAIN = ("ruby",)
+    RUNTIME_PROFILES = {"default": "", "yjit": "--yjit"}
+
     def solve(self):
-        return f"ruby {self.file}"
+        return f"ruby{self._runtime_args} {self.file}"
@@ -1,4 +1,5 @@
 import os
+import shutil
 
 from aoc_solver import AOC_ROOT
 from aoc_solver.lang.registry import LanguageSettings, register_language
@@ -6,10 +7,36 @@ from aoc_solver.lang.registry import LanguageSettings, register_language
 
 @register_language(name="rust", extension="rs")
 class RustSettings(LanguageSettings):
+    TOOLCHAIN = ("rustc",)
+    BUILD_PROFILES = {
+        "default": "-C opt-level=3",
+        "O2": "-C opt-level=2",
+        "native": "-C opt-level=3 -C target-cpu=native",
+        "lto": "-C opt-level=3 -C lto=fat -C codegen-units=1",
+        "native-lto": (
+            "-C opt-level=3 -C target-cpu=native -C lto=fat -C codegen-units=1"
+        ),
+    }
+    SUPPORTS_PGO = True
     LIB_DIR = os.path.join(AOC_ROOT, "ext", "rust")
 
     def compile(self):
-        yield f"rustc -C opt-level=3 -o {self._bin_file} {self.file} -L {self.LIB_DIR}"
+        if not self.pgo:
+            yield self._compile_cmd()
+            return
+        raw_dir = self._pgo_file("profraw")
+        profile = self._pgo_file("profdata")
+        if self._pgo_outdated(profile):
+            shutil.rmtree(raw_dir, ignore_errors=True)
+            yield self._compile_cmd(f"-C profile-generate={raw_dir}")
+            yield self.solve()
+            # Provided by the llvm-tools-preview rustup component
+            yield f"llvm-profdata merge -o {profile} {raw_dir}"
+        yield self._compile_cmd(f"-C profile-use={profile}")
+
+    def _compile_cmd(self, pgo_flags: str = ""):
+        flags = f"{self._profile_flags} {pgo_flags}".rstrip()
+        return f"rustc {flags} -o {self._bin_file} {self.file} -L {self.LIB_DIR}"
 
     def solve(self):
         return os.path.join(".", self._bin_file)
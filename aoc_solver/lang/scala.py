@@ -1,18 +1,47 @@
 import glob
 import os
+import threading
 
 from aoc_solver import SOLUTIONS_ROOT
-from aoc_solver.lang.registry import LanguageSettings, register_language
+from aoc_solver.lang.java import JVM_RUNTIME_PROFILES
+from aoc_solver.lang.registry import LanguageSettings, artifact_dir, register_language
 
 
 @register_language(name="scala", extension="scala")
 class ScalaSettings(LanguageSettings):
+    TOOLCHAIN = ("scalac", "scala")
+    # The scala runner passes flags prefixed with -J on to the JVM
+    RUNTIME_PROFILES = {
+        name: " ".join(f"-J{flag}" for flag in flags.split())
+        for name, flags in JVM_RUNTIME_PROFILES.items()
+    }
+    SUPPORTS_BATCH = True
     LIB_DIR = os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.scala", "src")
     LIB_SRC = glob.glob(os.path.join(LIB_DIR, "**", "*.scala"))
+    LIB_CLASSES_DIR = artifact_dir(LIB_DIR)
+    BUILD_LOCK = threading.Lock()
+
+    @property
+    def _jar_file(self):
+        return os.path.join(self._out_dir, f"{self._bin_name}.jar")
+
+    @classmethod
+    def batch_compile(cls, _batch):
+        # Solutions of different days share class names, only the executor library
+        # can be compiled once
+        yield from cls._compile_lib()
 
     def compile(self):
-        yield f"scalac -optimize -d {self.LIB_DIR} {' '.join(self.LIB_SRC)}"
-        yield f"scalac -d {self._base_dir} -classpath {self.LIB_DIR} {self.file}"
+        if not self.batched:
+            yield from self._compile_lib()
+        # Packaged into a jar, since the classes of the variants of a day would
+        # overwrite each other's helper classes
+        yield f"scalac -d {self._jar_file} -classpath {self.LIB_CLASSES_DIR} {self.file}"
 
     def solve(self):
-        return f"scala -classpath {self._base_dir}:{self.LIB_DIR} Main"
+        return f"scala{self._runtime_args} -classpath {self._jar_file}:{self.LIB_CLASSES_DIR} {self._main_class}"
+
+    @classmethod
+    def _compile_lib(cls):
+        yield f"mkdir -p {cls.LIB_CLASSES_DIR}"
+        yield f"scalac -optimize -d {cls.LIB_CLASSES_DIR} {' '.join(cls.LIB_SRC)}"
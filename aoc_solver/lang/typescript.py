@@ -1,19 +1,78 @@
 import os
+import re
 
 from aoc_solver import SOLUTIONS_ROOT
-from aoc_solver.lang.registry import LanguageSettings, register_language
+from aoc_solver.lang.registry import (
+    BUILD_DIR,
+    SNAPSHOT_DIR,
+    LanguageSettings,
+    register_language,
+)
+
+# Start of a diagnostic, e.g. "2020/01/main.ts(3,5): error TS2322: ..."
+DIAGNOSTIC_PATTERN = re.compile(r"^(.+?)\(\d+,\d+\): ")
 
 
 @register_language(name="typescript", extension="ts")
 class TypescriptSettings(LanguageSettings):
+    TOOLCHAIN = ("node",)
+    RUNTIME_PROFILES = {
+        "default": "",
+        # A larger young generation means fewer scavenges for allocation-heavy days
+        "semi-space-64": "--max-semi-space-size=64",
+        "large-heap": "--max-old-space-size=4096",
+    }
+    SUPPORTS_BATCH = True
+    SUPPORTS_SNAPSHOT = True
+    # Startup snapshots can only contain built-in modules, so rather than the
+    # executor, V8 caches the code it compiled for the executor and solution
+    # (Node.js 22.1+, older versions ignore it)
+    COMPILE_CACHE_DIR = os.path.join(SNAPSHOT_DIR, "node")
     ENTRY_FILE = os.path.join(SOLUTIONS_ROOT, "..", "aoc_executor.js", "index.js")
 
-    def __init__(self, file):
-        self._js_file = file.replace(".ts", "")
-        super(TypescriptSettings, self).__init__(file)
+    @property
+    def _js_file(self):
+        return os.path.join(self._out_dir, os.path.basename(self.file)[: -len(".ts")])
+
+    @classmethod
+    def batch_compile(cls, batch):
+        # tsc writes each JavaScript file to the directory under BUILD_DIR that
+        # mirrors its source's, i.e. straight to the solution's artifact directory,
+        # even when other files have errors
+        files = " ".join(settings.file for settings in batch)
+        yield f"yarn tsc --outDir {BUILD_DIR} --rootDir {os.sep} {files}"
+
+    @classmethod
+    def batch_failures(cls, batch, output):
+        dirs = {os.path.abspath(settings._base_dir): settings for settings in batch}
+        errors = {}
+        current = None
+        for line in output.splitlines():
+            match = DIAGNOSTIC_PATTERN.match(line)
+            if match:
+                # Errors in helper modules belong to the day that imports them
+                source_dir = os.path.dirname(os.path.abspath(match.group(1)))
+                current = dirs.get(source_dir)
+                if not current:
+                    return None
+            elif not line[:1].isspace():
+                # Not a continuation of the diagnostic, e.g. yarn's own messages
+                current = None
+            if current:
+                errors.setdefault(current.file, []).append(line)
+        if not errors:
+            return None
+        return {file: "\n".join(lines) + "\n" for file, lines in errors.items()}
 
     def compile(self):
-        yield f"yarn tsc {self.file}"
+        if not self.batched:
+            # Helper modules must be in the day's directory, so the JavaScript
+            # files are all written to the top of the output directory
+            yield f"yarn tsc --outDir {self._out_dir} --rootDir {self._base_dir} {self.file}"
 
     def solve(self):
-        return f"node {self.ENTRY_FILE} {self._js_file}"
+        cmd = f"node{self._runtime_args} {self.ENTRY_FILE} {self._js_file}"
+        if self.snapshot:
+            # Commands do not run in a shell, so the variable is set with env
+            return f"env NODE_COMPILE_CACHE={self.COMPILE_CACHE_DIR} {cmd}"
+        return cmd
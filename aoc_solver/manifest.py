@@ -0,0 +1,125 @@
+import json
+import os
+import re
+
+from typing import Dict, List, Optional, Set
+
+from aoc_solver import CACHE_DIR
+
+MANIFEST_FILE = os.path.join(CACHE_DIR, "manifest.json")
+# Selects every year or day
+ALL = "all"
+# A single number (e.g. "2020") or an inclusive range (e.g. "1-10")
+SELECTOR_PATTERN = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+def parse_selector(selector: Optional[str]) -> Optional[range]:
+    """
+    :param selector: a number, an inclusive range of numbers, "all" or `None`
+    :return: the selected numbers, `None` to select all of them
+    :raises ValueError: if the selector is malformed
+    """
+    if selector is None or selector == ALL:
+        return None
+    match = SELECTOR_PATTERN.match(selector)
+    if not match:
+        raise ValueError(
+            f"Invalid selector {selector}, expected a number, a range (e.g. 1-10) "
+            f"or {ALL}"
+        )
+    first = int(match.group(1))
+    last = int(match.group(2) or first)
+    if last < first:
+        raise ValueError(f"Invalid range {selector}, {last} is before {first}")
+    return range(first, last + 1)
+
+
+def is_single(selector: Optional[str]) -> bool:
+    """
+    :return: True if the selector is a single number
+    """
+    return bool(selector and selector.isdigit())
+
+
+class SolutionManifest:
+    """
+    Index of the year and day directories of the solutions and the names of the
+    files in each day, stored between runs. A directory is only listed again when
+    its modification time changes, i.e. when files were added, removed or renamed,
+    so finding the solutions of many years costs one `stat` per directory.
+    """
+
+    def __init__(self, solutions_path: str, path: str = MANIFEST_FILE):
+        self.solutions_path = os.path.abspath(solutions_path)
+        self.path = path
+        self._listings: Dict[str, dict] = {}
+        self._changed = False
+        try:
+            with open(path, "r") as f:
+                listings = json.load(f).get(self.solutions_path, {})
+            if isinstance(listings, dict):
+                self._listings = listings
+        except FileNotFoundError:
+            pass
+        except (AttributeError, ValueError):
+            # Start over rather than fail every run because of a corrupt manifest
+            pass
+
+    def years(self) -> List[int]:
+        return self._numbered(self._list(""), 4)
+
+    def days(self, year: int) -> List[int]:
+        return self._numbered(self._list(str(year)) or [], 2)
+
+    def files(self, year: int, day: int) -> Optional[Set[str]]:
+        """
+        :return: names of the files in the day's directory, `None` if it does not
+        exist
+        """
+        names = self._list(os.path.join(str(year), str(day).zfill(2)))
+        return None if names is None else set(names)
+
+    def save(self):
+        if not self._changed:
+            return
+        try:
+            with open(self.path, "r") as f:
+                manifest = json.load(f)
+            if not isinstance(manifest, dict):
+                manifest = {}
+        except (OSError, ValueError):
+            manifest = {}
+        manifest[self.solutions_path] = self._listings
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.path)
+        self._changed = False
+
+    def _list(self, relative_path: str) -> Optional[List[str]]:
+        """
+        :return: names in the directory, from the manifest unless it has changed
+        since it was last listed, `None` if the directory does not exist
+        """
+        path = os.path.join(self.solutions_path, relative_path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            if self._listings.pop(relative_path, None) is not None:
+                self._changed = True
+            return None
+        listing = self._listings.get(relative_path)
+        if not listing or listing.get("mtime") != mtime:
+            try:
+                names = sorted(os.listdir(path))
+            except NotADirectoryError:
+                return None
+            listing = {"mtime": mtime, "names": names}
+            self._listings[relative_path] = listing
+            self._changed = True
+        return listing["names"]
+
+    @staticmethod
+    def _numbered(names: List[str], digits: int) -> List[int]:
+        return [int(name) for name in names if len(name) == digits and name.isdigit()]
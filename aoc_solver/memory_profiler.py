@@ -0,0 +1,115 @@
+"""
+usage: memory_profiler.py [-h] --report REPORT [--top TOP] script ...
+
+Run a Python solution under tracemalloc and write a JSON report of the peak
+traced memory and top allocation sites of each part.
+
+This script is run in the solution's own interpreter, so it must only depend on
+the standard library.
+"""
+
+import argparse
+import functools
+import gc
+import json
+import os
+import runpy
+import sys
+import tracemalloc
+
+EXECUTOR_MODULES = ["aoc_solver.executor", "aoc_executor"]
+
+
+def _profile_part(func, part, report, top):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if part in report:
+            return func(*args, **kwargs)
+        gc.collect()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        else:
+            # Before Python 3.9 the peak can only be reset by restarting tracing
+            tracemalloc.stop()
+            tracemalloc.start()
+        start_size, _ = tracemalloc.get_traced_memory()
+        before = tracemalloc.take_snapshot()
+        result = func(*args, **kwargs)
+        end_size, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+        stats = after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), "lineno"
+        )
+        stats = [stat for stat in stats if stat.size_diff > 0][:top]
+        report[part] = {
+            "peak": peak - start_size,
+            "retained": end_size - start_size,
+            "sites": [
+                {
+                    "file": stat.traceback[0].filename,
+                    "line": stat.traceback[0].lineno,
+                    "size": stat.size_diff,
+                    "count": stat.count_diff,
+                }
+                for stat in stats
+            ],
+        }
+        return result
+
+    return wrapper
+
+
+def _patch_executor(module_name, report, top):
+    """
+    Wrap the part 1 and part 2 functions passed to the executor so allocations
+    are tracked for each part individually.
+    """
+    try:
+        module = __import__(module_name, fromlist=["AocExecutor"])
+    except ImportError:
+        return
+    executor_cls = module.AocExecutor
+    original_init = executor_cls.__init__
+
+    @functools.wraps(original_init)
+    def init(self, input, part1, part2, *args, **kwargs):
+        part1 = _profile_part(part1, "part1", report, top)
+        part2 = _profile_part(part2, "part2", report, top)
+        original_init(self, input, part1, part2, *args, **kwargs)
+
+    executor_cls.__init__ = init
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="memory_profiler.py",
+        description="Profile memory allocations of a Python solution"
+    )
+    parser.add_argument("--report", required=True, help="file to write the report to")
+    parser.add_argument(
+        "--top", type=int, default=5, help="number of allocation sites per part"
+    )
+    parser.add_argument("script", help="solution to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    report = {}
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    for module_name in EXECUTOR_MODULES:
+        _patch_executor(module_name, report, args.top)
+    sys.argv = [args.script, *args.args]
+    tracemalloc.start()
+    try:
+        runpy.run_path(args.script, run_name="__main__")
+    finally:
+        tracemalloc.stop()
+        with open(args.report, "w") as f:
+            json.dump(report, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Export of the results of a run in the OpenMetrics text format, e.g. for the
+textfile collector of the Prometheus node exporter
+"""
+
+import os
+
+from typing import Dict, List, Tuple
+
+from aoc_solver.solver_engine import LanguageSolver
+from aoc_solver.timing import PARTS, PartTiming
+
+PREFIX = "aoc_solver"
+# Upper bounds (in seconds) of the buckets of the iteration time histograms
+ITERATION_BUCKETS = [1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0]
+
+# Labels that the job counts are broken down by
+SOLUTION_LABELS = {"year", "day", "language", "variant"}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Family:
+    def __init__(self, name: str, metric_type: str, unit: str, description: str):
+        self.name = name
+        self.metric_type = metric_type
+        self.unit = unit
+        self.description = description
+        self.samples: List[Tuple[str, Labels, float]] = []
+
+    def add(self, labels: Labels, value: float, suffix: str = ""):
+        self.samples.append((suffix, labels, value))
+
+    def lines(self) -> List[str]:
+        if not self.samples:
+            return []
+        lines = [f"# TYPE {self.name} {self.metric_type}"]
+        if self.unit:
+            lines.append(f"# UNIT {self.name} {self.unit}")
+        lines.append(f"# HELP {self.name} {self.description}")
+        for suffix, labels, value in self.samples:
+            lines.append(f"{self.name}{suffix}{_labels(labels)} {_number(value)}")
+        return lines
+
+
+class RunMetrics:
+    """
+    Metrics of every job of a run, written to a file once the run is complete.
+    The file is replaced atomically, so a collector never reads a partial file.
+
+    Durations of parts, overhead and builds, the peak memory of the timing run and
+    the outcome are reported per job, labeled with its year, day and language
+    (and variant, build profile, PGO build, runtime profile and input when there
+    are several).
+    Builds shared between inputs and jobs replayed from the journal are reported
+    as cache hits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._families = [
+            _Family(
+                f"{PREFIX}_part_duration_seconds",
+                "gauge",
+                "seconds",
+                "Average time of an iteration of the part.",
+            ),
+            _Family(
+                f"{PREFIX}_iteration_duration_seconds",
+                "histogram",
+                "seconds",
+                "Time of the iterations of the part reported by the executor.",
+            ),
+            _Family(
+                f"{PREFIX}_overhead_seconds",
+                "gauge",
+                "seconds",
+                "Time of the timing run not spent in the parts.",
+            ),
+            _Family(
+                f"{PREFIX}_build_duration_seconds",
+                "gauge",
+                "seconds",
+                "Time spent building the solution.",
+            ),
+            _Family(
+                f"{PREFIX}_peak_rss_bytes",
+                "gauge",
+                "bytes",
+                "Peak resident set size of the timing run.",
+            ),
+            _Family(
+                f"{PREFIX}_jobs",
+                "gauge",
+                "",
+                "Number of jobs by result.",
+            ),
+            _Family(
+                f"{PREFIX}_cache_lookups",
+                "gauge",
+                "",
+                "Number of builds and jobs that could have been reused.",
+            ),
+            _Family(
+                f"{PREFIX}_cache_hit_ratio",
+                "gauge",
+                "",
+                "Share of the cache lookups that were reused.",
+            ),
+        ]
+        self._results: Dict[Labels, int] = {}
+        self._caches = {"build": [0, 0], "journal": [0, 0]}
+
+    def add(self, solver: LanguageSolver, replayed: bool = False):
+        """
+        :param replayed: the job was replayed from the journal, so only its outcome
+        and part durations are known
+        """
+        labels = self._job_labels(solver)
+        part_durations, iterations, overhead, build, rss = self._families[:5]
+        if solver.timing_info:
+            for part in PARTS:
+                part_labels = labels + (("part", part),)
+                timing = solver.timing_info[part]
+                part_durations.add(part_labels, timing.average / 1000000)
+                self._add_histogram(iterations, part_labels, timing)
+        if solver.timing_info and solver.timing_duration is not None:
+            parts = sum(solver.timing_info[part].duration for part in PARTS)
+            overhead.add(labels, solver.timing_duration - parts / 1000000)
+        if solver.build_duration is not None:
+            build.add(labels, solver.build_duration)
+        if solver.timing_usage:
+            rss.add(labels, solver.timing_usage.max_rss * 1024)
+
+        if solver.passed:
+            result = "passed"
+        elif solver.pair.expected_file:
+            result = "failed"
+        else:
+            # There is no known correct output to verify it against
+            result = "unverified"
+        solution = tuple(l for l in labels if l[0] in SOLUTION_LABELS)
+        key = solution + (("result", result),)
+        self._results[key] = self._results.get(key, 0) + 1
+
+        journal = self._caches["journal"]
+        journal[0] += 1
+        journal[1] += replayed
+        if not replayed and (solver.build_duration is not None or solver.build_shared):
+            builds = self._caches["build"]
+            builds[0] += 1
+            builds[1] += solver.build_shared
+
+    def write(self):
+        jobs, lookups, hit_ratio = self._families[5:]
+        for labels, count in self._results.items():
+            jobs.add(labels, count)
+        for cache, (total, hits) in self._caches.items():
+            if total:
+                lookups.add((("cache", cache),), total)
+                hit_ratio.add((("cache", cache),), hits / total)
+        lines = [line for family in self._families for line in family.lines()]
+        lines.append("# EOF")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _job_labels(solver: LanguageSolver) -> Labels:
+        labels = (
+            ("year", str(solver.year)),
+            ("day", str(solver.day)),
+            ("language", solver.language),
+        )
+        if solver.variant:
+            labels += (("variant", solver.variant),)
+        if solver.profile:
+            labels += (("profile", solver.profile),)
+        if solver.pgo:
+            labels += (("pgo", "true"),)
+        if solver.runtime_profile:
+            labels += (("runtime_profile", solver.runtime_profile),)
+        if solver.pair.label:
+            labels += (("input", solver.pair.label),)
+        return labels
+
+    @staticmethod
+    def _add_histogram(family: _Family, labels: Labels, timing: PartTiming):
+        """
+        Bucket the iteration times the executor reported, either individual
+        samples or its own histogram, whose buckets are counted in the first
+        bucket that contains their upper bound. Executors only report samples of
+        the first iterations, so bucket counts are scaled up to the number of
+        iterations that ran, and the sum is the duration of all of them.
+        """
+        if timing.samples:
+            times = [(sample / 1000000, 1) for sample in timing.samples]
+        elif timing.histogram:
+            times = [(bound / 1000000, count) for bound, count in timing.histogram]
+        else:
+            return
+        scale = timing.iterations / sum(n for _, n in times)
+        for bound in ITERATION_BUCKETS:
+            below = sum(n for value, n in times if value <= bound)
+            family.add(labels + (("le", repr(bound)),), round(below * scale), "_bucket")
+        family.add(labels + (("le", "+Inf"),), timing.iterations, "_bucket")
+        family.add(labels, timing.iterations, "_count")
+        family.add(labels, timing.duration / 1000000, "_sum")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = [
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    ]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
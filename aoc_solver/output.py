@@ -0,0 +1,249 @@
+import hashlib
+import shutil
+import tempfile
+
+from dataclasses import dataclass, field
+from typing import IO, Iterator, List, Optional, Tuple
+
+# Output is kept in memory up to this many characters, beyond that it is spilled
+# to a temporary file
+SPILL_THRESHOLD = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+# Limits on how much of the output is sent to the display process
+MAX_DISPLAY_LINES = 50
+MAX_DIFF_LINES = 5
+MAX_LINE_WIDTH = 80
+# Longest last line `split_last_line` holds in memory, e.g. the timing JSON of a
+# run with `--solve-and-time`
+MAX_LAST_LINE = 16 * 1024 * 1024
+
+
+class CapturedOutput:
+    """
+    Output of a shell command that is held in memory while small and spilled to
+    a temporary file once it grows beyond `spill_threshold` characters.
+    """
+
+    def __init__(self, spill_threshold: int = SPILL_THRESHOLD):
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=spill_threshold, mode="w+", prefix="aoc-output-"
+        )
+        self.size = 0
+
+    def write(self, data: str):
+        self._file.write(data)
+        self.size += len(data)
+
+    def read(self, limit: int = None) -> str:
+        """
+        :param limit: maximum number of characters to read, all output is read if
+        not specified (avoid for output that might be large)
+        """
+        self._file.seek(0)
+        return self._file.read() if limit is None else self._file.read(limit)
+
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[str]:
+        self._file.seek(0)
+        chunk = self._file.read(size)
+        while chunk:
+            yield chunk
+            chunk = self._file.read(size)
+
+    def lines(self, width: int = MAX_LINE_WIDTH) -> Iterator[str]:
+        self._file.seek(0)
+        yield from _bounded_lines(self._file, width)
+
+    def _rewound(self) -> IO[str]:
+        self._file.seek(0)
+        return self._file
+
+    def head(self, max_lines: int = MAX_DISPLAY_LINES) -> Tuple[str, int]:
+        """
+        :return: tuple of the first `max_lines` lines of output (each truncated to
+        a displayable width) and the number of lines that were left out
+        """
+        lines = []
+        omitted = 0
+        for line in self.lines():
+            if len(lines) < max_lines:
+                lines.append(line)
+            else:
+                omitted += 1
+        return "\n".join(lines), omitted
+
+    def save(self, filename: str):
+        with open(filename, "w") as f:
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, f, CHUNK_SIZE)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+
+def split_last_line(output: CapturedOutput) -> Tuple[CapturedOutput, str]:
+    """
+    :return: the output without its last line, and the last line (without the
+    trailing newline). A last line longer than `MAX_LAST_LINE` is returned empty,
+    and as much of it as was read is left in the output.
+    """
+    head = CapturedOutput()
+    pending = ""
+    overflowed = False
+    for chunk in output.chunks():
+        pending += chunk
+        # A newline at the very end may still belong to the last line
+        cut = pending.rfind("\n", 0, len(pending) - 1)
+        if cut >= 0:
+            head.write(pending[: cut + 1])
+            pending = pending[cut + 1 :]
+            overflowed = False
+        if len(pending) > MAX_LAST_LINE:
+            head.write(pending)
+            pending = ""
+            overflowed = True
+    if overflowed:
+        return head, ""
+    return head, pending.rstrip("\n")
+
+
+@dataclass
+class OutputDiff:
+    """
+    Line-level summary of how the actual output differs from the expected
+    output, small enough to be sent to the display process.
+    """
+
+    # Tuples of (line number, expected line, actual line) for the first lines
+    # that differ, each line is truncated to a displayable width
+    rows: List[Tuple[int, str, str]] = field(default_factory=list)
+    # Line numbers of the rows whose lines only differ past the displayed width
+    truncated: List[int] = field(default_factory=list)
+    # Total number of lines that differ
+    mismatched: int = 0
+    expected_lines: int = 0
+    actual_lines: int = 0
+
+    @property
+    def omitted(self) -> int:
+        return self.mismatched - len(self.rows)
+
+
+def compare_output(actual: CapturedOutput, expected_file: str) -> Optional[OutputDiff]:
+    """
+    Compare the output against the contents of `expected_file` a chunk at a time
+    so neither has to be held in memory in full.
+
+    :return: `None` if the output matches, otherwise a summary of the differences
+    """
+    with open(expected_file, "r") as expected:
+        matched = True
+        chunks = actual.chunks()
+        while matched:
+            expected_chunk = expected.read(CHUNK_SIZE)
+            actual_chunk = next(chunks, "")
+            if expected_chunk != actual_chunk:
+                matched = False
+            elif not expected_chunk:
+                return None
+        expected.seek(0)
+        return _diff_lines(
+            _compared_lines(expected), _compared_lines(actual._rewound())
+        )
+
+
+# Stand-in for a line missing from one of the outputs, which matches no line
+_NO_LINE = (None, None, False)
+# Shown after the last line of an output that ends with a newline, when that is
+# the only difference
+NEWLINE_MARK = "↵"
+
+
+def _diff_lines(
+    expected: Iterator[Tuple[str, bytes, bool]],
+    actual: Iterator[Tuple[str, bytes, bool]],
+) -> OutputDiff:
+    diff = OutputDiff()
+    endings = [None, None]
+    while True:
+        expected_line, expected_digest, expected_newline = next(expected, _NO_LINE)
+        actual_line, actual_digest, actual_newline = next(actual, _NO_LINE)
+        if expected_line is None and actual_line is None:
+            break
+        if expected_line is not None:
+            diff.expected_lines += 1
+            endings[0] = (expected_line, expected_newline)
+        if actual_line is not None:
+            diff.actual_lines += 1
+            endings[1] = (actual_line, actual_newline)
+        line_number = max(diff.expected_lines, diff.actual_lines)
+        if expected_digest != actual_digest:
+            diff.mismatched += 1
+            if len(diff.rows) < MAX_DIFF_LINES:
+                diff.rows.append((line_number, expected_line, actual_line))
+                if expected_line == actual_line:
+                    diff.truncated.append(line_number)
+    if not diff.mismatched and endings[0] != endings[1]:
+        # Every line matches, so one of the outputs is missing the newline at the
+        # end of the other's last line
+        expected_line, actual_line = (
+            line + NEWLINE_MARK if newline else line for line, newline in endings
+        )
+        diff.mismatched = 1
+        diff.rows.append((diff.expected_lines, expected_line, actual_line))
+    return diff
+
+
+def _compared_lines(
+    stream: IO[str], width: int = MAX_LINE_WIDTH
+) -> Iterator[Tuple[str, bytes, bool]]:
+    """
+    Yield a tuple of each line of the stream truncated to `width` characters (as
+    `_bounded_lines` does), a digest of the whole line and whether it ended with a
+    newline, so lines are compared in full without arbitrarily long lines being
+    read into memory.
+    """
+    while True:
+        piece = stream.readline(CHUNK_SIZE)
+        if not piece:
+            return
+        digest = hashlib.sha1()
+        line = ""
+        while piece:
+            content = piece.rstrip("\n")
+            digest.update(content.encode())
+            if len(line) <= width:
+                line += content[: width + 1 - len(line)]
+            if piece.endswith("\n"):
+                break
+            piece = stream.readline(CHUNK_SIZE)
+        if len(line) > width:
+            line = f"{line[: width - 1]}…"
+        yield line, digest.digest(), piece.endswith("\n")
+
+
+def _bounded_lines(stream: IO[str], width: int = MAX_LINE_WIDTH) -> Iterator[str]:
+    """
+    Yield each line of the stream (without the trailing newline) truncated to
+    `width` characters so arbitrarily long lines are never read into memory.
+    """
+    while True:
+        line = stream.readline(width)
+        if not line:
+            return
+        if not line.endswith("\n"):
+            truncated = False
+            remainder = stream.readline(CHUNK_SIZE)
+            while remainder:
+                truncated = truncated or remainder != "\n"
+                if remainder.endswith("\n"):
+                    break
+                remainder = stream.readline(CHUNK_SIZE)
+            if truncated:
+                line = f"{line[:-1]}…"
+        yield line.rstrip("\n")
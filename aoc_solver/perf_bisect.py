@@ -0,0 +1,227 @@
+import glob
+import os
+import shutil
+import subprocess
+import tempfile
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.solver_engine import EventRecorder, LanguageSolver
+from aoc_solver.solver_event import SolverEvent
+
+
+class BisectError(Exception):
+    pass
+
+
+def parse_threshold(threshold: str) -> float:
+    """
+    Convert a threshold such as "1.2x", "1.2" or "20%" into a slowdown ratio
+    """
+    try:
+        if threshold.endswith("%"):
+            ratio = 1 + float(threshold[:-1]) / 100
+        else:
+            ratio = float(threshold.rstrip("xX"))
+    except ValueError:
+        raise BisectError(f"Invalid threshold {threshold!r}, e.g. use 1.2x or 20%")
+    if ratio <= 1:
+        raise BisectError(f"Threshold {threshold!r} must be greater than 1x")
+    return ratio
+
+
+@dataclass
+class Measurement:
+    revision: str
+    # Average time (in microseconds) per invocation of each part, `None` when the
+    # solution could not be built, solved or timed at this revision
+    timings: Optional[Dict[str, float]]
+    reason: str = None
+
+    @property
+    def usable(self) -> bool:
+        return self.timings is not None
+
+    def ratio(self, baseline: "Measurement") -> float:
+        # Parts too fast for the baseline to register cannot be compared
+        return max(
+            (
+                self.timings[part] / baseline.timings[part]
+                for part in self.timings
+                if baseline.timings.get(part, 0) > 0
+            ),
+            default=1.0,
+        )
+
+
+@dataclass
+class BisectResult:
+    baseline: Measurement
+    # First revision slower than the threshold, `None` if there was no regression
+    first_slow: Optional[Measurement]
+    # Revisions right before `first_slow` that could not be timed, any of which
+    # could be the actual culprit
+    untestable: List[Measurement]
+
+
+class PerformanceBisector:
+    """
+    Binary search the commits between a known-good and a bad revision for the
+    first one where a solution got slower than the good revision by more than
+    the given ratio. Each revision is checked out into a dedicated git worktree
+    so the working copy is never touched.
+    """
+
+    def __init__(
+        self,
+        solutions_path: str,
+        year: int,
+        day: int,
+        language: str,
+        threshold: float,
+        good: str,
+        bad: str = "HEAD",
+    ):
+        self.year = year
+        self.day = day
+        self.language = language
+        self.threshold = threshold
+        if not LanguageRegistry.get(language)[2]:
+            raise BisectError(f"Timing is not supported for {language}")
+        self._day_dir = os.path.abspath(
+            os.path.join(solutions_path, str(year), str(day).zfill(2))
+        )
+        if not os.path.isdir(self._day_dir):
+            raise BisectError(f"No solutions found for day {day} in {year}")
+        self._repo_dir = self._git("rev-parse", "--show-toplevel", cwd=self._day_dir)
+        self._rel_day_dir = os.path.relpath(self._day_dir, self._repo_dir)
+        self.good = self._git("rev-parse", "--verify", f"{good}^{{commit}}")
+        self.bad = self._git("rev-parse", "--verify", f"{bad}^{{commit}}")
+        self._worktree = None
+
+    def __call__(self, progress=None):
+        """
+        :param progress: optional callback invoked with each `Measurement`
+        """
+        commits = self._git(
+            "rev-list", "--ancestry-path", "--reverse", f"{self.good}..{self.bad}"
+        ).split()
+        if not commits:
+            raise BisectError(f"{self.bad} is not a descendant of {self.good}")
+        self._worktree = tempfile.mkdtemp(prefix="aoc-bisect-")
+        try:
+            self._git("worktree", "add", "--detach", self._worktree, self.good)
+            baseline = self._measure(self.good, progress)
+            if not baseline.usable:
+                raise BisectError(
+                    f"Unable to time known-good revision {self.good[:10]}: "
+                    f"{baseline.reason}"
+                )
+            measurements = {}
+
+            def is_slow(index):
+                if index not in measurements:
+                    measurements[index] = self._measure(commits[index], progress)
+                measurement = measurements[index]
+                if not measurement.usable:
+                    return None
+                return measurement.ratio(baseline) >= self.threshold
+
+            low, high = -1, len(commits) - 1
+            slow = is_slow(high)
+            if slow is None:
+                raise BisectError(
+                    f"Unable to time bad revision {self.bad[:10]}: "
+                    f"{measurements[high].reason}"
+                )
+            if not slow:
+                return BisectResult(baseline, None, [])
+            while True:
+                mid = self._next_testable(low, high, measurements)
+                if mid is None:
+                    break
+                slow = is_slow(mid)
+                # Untimeable commits stay inside the range, the next pick skips
+                # them and they end up reported if the culprit is next to them
+                if slow is None:
+                    continue
+                if slow:
+                    high = mid
+                else:
+                    low = mid
+            # Every commit left between the bounds could not be timed
+            untestable = [measurements[i] for i in range(low + 1, high)]
+            return BisectResult(baseline, measurements[high], untestable)
+        finally:
+            self._git("worktree", "remove", "--force", self._worktree, check=False)
+            shutil.rmtree(self._worktree, ignore_errors=True)
+
+    @staticmethod
+    def _next_testable(low: int, high: int, measurements: Dict[int, Measurement]):
+        """
+        Pick the untested commit closest to the middle of the (low, high) range,
+        skipping commits that have already proven impossible to time.
+        """
+        mid = (low + high) // 2
+        for offset in range(high - low):
+            for index in (mid - offset, mid + offset):
+                if low < index < high and index not in measurements:
+                    return index
+
+    def _measure(self, revision: str, progress) -> Measurement:
+        self._git("checkout", "--quiet", "--detach", "--force", revision)
+        measurement = self._time_solution(revision)
+        if progress:
+            progress(measurement)
+        return measurement
+
+    def _time_solution(self, revision: str) -> Measurement:
+        day_dir = os.path.join(self._worktree, self._rel_day_dir)
+        if not os.path.isdir(day_dir):
+            return Measurement(revision, None, "day directory does not exist")
+        self._copy_untracked_files(day_dir)
+        ext, _, _ = LanguageRegistry.get(self.language)
+        filename = os.path.join(day_dir, f"main.{ext}")
+        if not os.path.isfile(filename):
+            return Measurement(revision, None, f"main.{ext} does not exist")
+        outfile = os.path.join(day_dir, "output.txt")
+        if not os.path.isfile(outfile):
+            return Measurement(revision, None, "output.txt does not exist")
+
+        recorder = EventRecorder()
+        solver = LanguageSolver(
+            os.getpid(), recorder, self.language, self.year, self.day, filename
+        )
+        try:
+            solver(outfile, None)
+        except Exception:
+            pass
+        finished = recorder.find(SolverEvent.TIMING_FINISHED)
+        if not finished:
+            return Measurement(revision, None, recorder.messages[-1]["event"])
+        timings = {part: info.average for part, info in finished["info"].items()}
+        return Measurement(revision, timings)
+
+    def _copy_untracked_files(self, day_dir: str):
+        """
+        Puzzle inputs and answers are often kept out of version control, so make
+        the ones from the working copy available to older revisions.
+        """
+        patterns = ["input*.txt", "output*.txt"]
+        for pattern in patterns:
+            for source in glob.glob(os.path.join(self._day_dir, pattern)):
+                target = os.path.join(day_dir, os.path.basename(source))
+                if not os.path.exists(target):
+                    shutil.copyfile(source, target)
+
+    def _git(self, *args: str, cwd: str = None, check: bool = True) -> str:
+        if cwd is None:
+            cwd = self._worktree if args[0] == "checkout" else self._repo_dir
+        result = subprocess.run(
+            ["git", *args], cwd=cwd, capture_output=True, universal_newlines=True
+        )
+        if check and result.returncode != 0:
+            raise BisectError(result.stderr.strip() or f"git {args[0]} failed")
+        return result.stdout.strip()
@@ -0,0 +1,75 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+
+from typing import Optional
+
+# Memory-backed file systems to build in, the first writable one is used
+TMPFS_DIRS = ["/dev/shm", os.environ.get("XDG_RUNTIME_DIR")]
+
+
+def scratch_root() -> str:
+    """
+    :return: directory to create scratch directories in, on a tmpfs when there is
+    one so builds do not wait on the disk
+    """
+    for path in TMPFS_DIRS:
+        if path and os.path.isdir(path) and os.access(path, os.W_OK | os.X_OK):
+            return os.path.join(path, "aoc_solver")
+    return os.path.join(tempfile.gettempdir(), "aoc_solver")
+
+
+class ScratchBuild:
+    """
+    Directory a build writes its artifacts to, which are only promoted to the
+    artifact directory once the build succeeded. Each artifact replaces the one
+    of the previous build atomically, so a solution never runs a partial binary
+    and a failed build leaves the last good artifacts in place.
+
+    The directory is named after the artifact rather than the job, since some
+    compilers record the path of their output (e.g. in the names of GCC's PGO
+    profiles), and is locked while the build runs so concurrent runs of the
+    solver never share it.
+    """
+
+    def __init__(self, artifact_dir: str, name: str):
+        """
+        :param name: name of the main artifact of the build, e.g. the binary
+        """
+        digest = hashlib.sha1(os.path.join(artifact_dir, name).encode()).hexdigest()
+        self.artifact_dir = artifact_dir
+        self.path = os.path.join(scratch_root(), f"{name}.{digest[:12]}")
+        self._lock: Optional[int] = None
+
+    def __enter__(self) -> str:
+        # Builds may keep files there that outlive them, e.g. PGO profiles
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(self._lock, fcntl.LOCK_EX)
+        # Left behind by a build that was killed
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+        return self.path
+
+    def __exit__(self, *_args):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.close(self._lock)
+        self._lock = None
+
+    def promote(self):
+        """
+        Move the files the build wrote to the artifact directory, directories are
+        intermediate output (e.g. class or object files) and are left behind
+        """
+        for name in os.listdir(self.path):
+            source = os.path.join(self.path, name)
+            if not os.path.isfile(source):
+                continue
+            # Copied next to its destination first, since the scratch directory is
+            # usually on another file system
+            tmp_file = os.path.join(self.artifact_dir, f".{name}.{os.getpid()}.tmp")
+            shutil.copy2(source, tmp_file)
+            os.replace(tmp_file, os.path.join(self.artifact_dir, name))
@@ -1,9 +1,17 @@
 import os
 import shlex
 import subprocess
+import threading
 import time
 
-from typing import IO
+from dataclasses import dataclass
+from typing import IO, Callable
+
+from aoc_solver.output import CHUNK_SIZE, CapturedOutput
+from aoc_solver.trace import Tracer
+
+# Maximum number of characters of output included in a `ShellException`
+MAX_ERROR_LENGTH = 64 * 1024
 
 
 class TerminationException(Exception):
@@ -20,16 +28,57 @@ class ShellException(Exception):
         return (ShellException, (self.exitcode, self.stdout, self.stderr))
 
 
-def _read_output(stream: IO[str]) -> str:
-    output = ""
-    line = stream.readline()
-    while line:
-        output += line
-        line = stream.readline()
-    return output
+@dataclass
+class ProcessUsage:
+    """
+    Resources used by a process, as reported when it was reaped
+    """
+
+    # Peak resident set size in kilobytes. Linux counts the memory of the process
+    # that spawned it too, so small values are the solver's own size
+    max_rss: int = 0
+    # CPU time (in seconds) spent in user and kernel mode
+    user_time: float = 0.0
+    system_time: float = 0.0
+
+
+def _drain(stream: IO[str], output: CapturedOutput):
+    chunk = stream.read(CHUNK_SIZE)
+    while chunk:
+        output.write(chunk)
+        chunk = stream.read(CHUNK_SIZE)
+
+
+def _error_output(output: CapturedOutput) -> str:
+    text = output.read(MAX_ERROR_LENGTH)
+    if output.size > MAX_ERROR_LENGTH:
+        text += f"\n... ({output.size - MAX_ERROR_LENGTH} more characters)"
+    return text
 
 
-def shell_out(cmd: str, should_terminate: bool):
+def capture_output(
+    cmd: str, should_terminate: Callable[[], bool], usage: ProcessUsage = None
+) -> CapturedOutput:
+    """
+    Run the command and capture its output. The output is read as the process
+    runs, so the process never blocks on a full pipe, and large output is
+    spilled to disk rather than accumulated in memory.
+
+    :param usage: filled in with the resources the process used once it exits
+    """
+    with Tracer.span("shell_out", "shell", cmd=cmd) as span:
+        return _capture_output(cmd, should_terminate, span, usage)
+
+
+def _capture_output(
+    cmd: str,
+    should_terminate: Callable[[], bool],
+    span: dict,
+    usage: ProcessUsage = None,
+) -> CapturedOutput:
+    stdout = CapturedOutput()
+    stderr = CapturedOutput()
+    span["polls"] = 0
     try:
         process = subprocess.Popen(
             shlex.split(cmd),
@@ -37,23 +86,66 @@ def shell_out(cmd: str, should_terminate: bool):
             stderr=subprocess.PIPE,
             universal_newlines=True,
         )
+        readers = [
+            threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+            threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
         while True:
-            exitcode = process.poll()
+            exitcode = _reap(process, usage)
+            span["polls"] += 1
             if exitcode is None:
                 if should_terminate():
+                    process.kill()
+                    process.wait()
+                    for reader in readers:
+                        reader.join()
                     raise TerminationException()
                 time.sleep(0.01)
-            elif exitcode > 0:
-                stdout = _read_output(process.stdout)
-                stderr = _read_output(process.stderr)
-                raise ShellException(exitcode, stdout, stderr)
             else:
                 break
-        return _read_output(process.stdout)
-    except ShellException as e:
+        for reader in readers:
+            reader.join()
+        if exitcode > 0:
+            raise ShellException(exitcode, _error_output(stdout), _error_output(stderr))
+        return stdout
+    except (ShellException, TerminationException) as e:
+        stdout.close()
         raise e
     except Exception as e:
+        stdout.close()
         raise ShellException(-1, None, str(e))
+    finally:
+        stderr.close()
+
+
+def _reap(process: subprocess.Popen, usage: ProcessUsage = None):
+    """
+    :return: the exit code of the process, `None` if it is still running
+    """
+    if usage is None:
+        return process.poll()
+    # Reap the process ourselves, since `Popen` discards its resource usage
+    pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+    if pid == 0:
+        return None
+    # Decoded like `Popen` does, i.e. negative for a process killed by a signal
+    if os.WIFSIGNALED(status):
+        process.returncode = -os.WTERMSIG(status)
+    else:
+        process.returncode = os.WEXITSTATUS(status)
+    usage.max_rss = rusage.ru_maxrss
+    usage.user_time = rusage.ru_utime
+    usage.system_time = rusage.ru_stime
+    return process.returncode
+
+
+def shell_out(
+    cmd: str, should_terminate: Callable[[], bool], usage: ProcessUsage = None
+) -> str:
+    with capture_output(cmd, should_terminate, usage) as output:
+        return output.read()
 
 
 def is_process_running(pid: int) -> bool:
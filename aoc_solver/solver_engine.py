@@ -1,30 +1,242 @@
 import json
 import os
+import re
+import tempfile
+import threading
+import time
 import traceback
 
-from datetime import datetime
-from json.decoder import JSONDecodeError
-from typing import List, Generator
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+from aoc_solver.calibration import CalibrationCache
 from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.output import (
+    CapturedOutput,
+    OutputDiff,
+    compare_output,
+    split_last_line,
+)
 from aoc_solver.shell import (
+    ProcessUsage,
     ShellException,
     TerminationException,
+    capture_output,
     is_process_running,
     shell_out,
 )
+from aoc_solver.scratch import ScratchBuild
 from aoc_solver.solver_event import SolverEvent
+from aoc_solver.timing import (
+    TimingBudget,
+    TimingInfo,
+    TimingProtocolError,
+    parse_timing_info,
+)
+from aoc_solver.trace import Tracer
 from aoc_solver.types import PipeConnection, PipeMessage
 
 
+# Matches input.txt, output.txt and labeled pairs such as input_example.txt
+INPUT_OUTPUT_PATTERN = re.compile(r"^(input|output)((?:[_\-.].+)?)\.txt$")
+# Alternative solutions next to main.<ext>, e.g. main_bitset.py or MainDp.java
+VARIANT_PATTERN = re.compile(r"^[mM]ain(?:[_\-][^.]+|[A-Z][^.]*)$")
+# Per-day settings, e.g. {"profiles": {"c": "clang-native"}} to pin build profiles
+# and {"runtime_profiles": {"java": "parallel-gc"}} to pin runtime profiles
+CONFIG_FILE = "solver.json"
+
+
 def _dispatch(conn, event: str, args: PipeMessage = {}):
     args["event"] = event
     try:
-        conn.send(args)
+        with Tracer.span("send", "pipe", event=event):
+            conn.send(args)
     except OSError:
         raise TerminationException("Terminating because pipe was unexpectedly closed")
 
 
+class EventRecorder:
+    """
+    Stand-in for a pipe connection that keeps every event sent by a
+    `LanguageSolver` so the results can be inspected after it has finished.
+    """
+
+    def __init__(self):
+        self.messages: List[PipeMessage] = []
+
+    def send(self, message: PipeMessage):
+        self.messages.append(dict(message))
+
+    def poll(self, _timeout: float = 0) -> bool:
+        return False
+
+    def find(self, event: str) -> Optional[PipeMessage]:
+        for message in self.messages:
+            if message["event"] == event:
+                return message
+
+
+@dataclass
+class InputPair:
+    """
+    Puzzle input and the known correct output for it, e.g. `input_example.txt`
+    and `output_example.txt`
+    """
+
+    # Suffix shared by the file names (e.g. "example"), `None` for the default
+    # input.txt and output.txt pair
+    label: Optional[str]
+    # Path to the input file, `None` if the default input is hard-coded
+    input_file: Optional[str]
+    # Path to the known correct output (or where to save it)
+    output_file: Optional[str]
+
+    @property
+    def expected_file(self) -> Optional[str]:
+        if self.output_file and os.path.isfile(self.output_file):
+            if os.path.getsize(self.output_file) > 0:
+                return self.output_file
+
+
+DEFAULT_PAIR = InputPair(None, None, None)
+
+
+class SharedBuilds:
+    """
+    Makes sure each solution is built once, no matter how many inputs it is run
+    against. Solvers for the same file wait for the first one to finish its build.
+    Builds are keyed by the modification times of the solution's sources, so a
+    long-lived instance only rebuilds solutions that have changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._builds = {}
+
+    def build(self, filename: str, build: Callable[[], None], variant: Tuple = ()):
+        """
+        :param variant: options that produce a separate build of the file, e.g. the
+        build profile
+        :raises BuildSkipped: if an earlier build of the file failed
+        """
+        key = (filename, variant, self.sources_stamp(filename))
+        with self._lock:
+            if key not in self._builds:
+                self._builds[key] = [threading.Lock(), None]
+            lock, succeeded = self._builds[key]
+        with lock:
+            succeeded = self._builds[key][1]
+            if succeeded is None:
+                self._builds[key][1] = False
+                build()
+                self._builds[key][1] = True
+            elif not succeeded:
+                raise BuildSkipped()
+
+    def built(self, filename: str, variant: Tuple = ()) -> bool:
+        """
+        :return: True if the current sources of the file have been built
+        """
+        key = (filename, variant, self.sources_stamp(filename))
+        with self._lock:
+            return key in self._builds and self._builds[key][1] is True
+
+    @staticmethod
+    def sources_stamp(filename: str) -> Tuple[Tuple[str, int], ...]:
+        """
+        :return: names and modification times of all files in the solution's
+        directory with the same extension, e.g. helper modules
+        """
+        base_dir = os.path.dirname(filename)
+        ext = os.path.splitext(filename)[1]
+        stamp = []
+        for name in sorted(os.listdir(base_dir)):
+            if os.path.splitext(name)[1] == ext:
+                stamp.append((name, os.stat(os.path.join(base_dir, name)).st_mtime_ns))
+        return tuple(stamp)
+
+
+class BuildSkipped(Exception):
+    pass
+
+
+class BatchBuild:
+    """
+    Builds what several solutions in the same language have in common in one go
+    (see `LanguageSettings.batch_compile`) rather than starting the compiler once
+    per solution. Solvers wait for the batch before their own build, which skips
+    whatever the batch built. When the batch fails, its errors are attributed back
+    to the files that caused them, or if the language cannot tell, every solution
+    is built on its own so each build reports its own errors.
+    """
+
+    def __init__(self, language: str, filenames: List[str]):
+        self.language = language
+        self.filenames = filenames
+        self._done = threading.Event()
+        self._built = False
+        self._failures: Dict[str, str] = {}
+
+    def __call__(self, should_terminate: Callable[[], bool]):
+        _, LanguageSettings, _ = LanguageRegistry.get(self.language)
+        batch = [LanguageSettings(filename) for filename in self.filenames]
+        try:
+            for cmd in LanguageSettings.batch_compile(batch):
+                shell_out(cmd, should_terminate)
+            self._built = True
+        except ShellException as e:
+            # There is no output when the compiler could not be started at all
+            output = (e.stdout or "") + (e.stderr or "")
+            failures = LanguageSettings.batch_failures(batch, output)
+            # Otherwise the solutions are built on their own, and each of their
+            # builds reports the error
+            if failures is not None:
+                self._failures = failures
+                self._built = True
+        finally:
+            self._done.set()
+
+    def wait(self):
+        self._done.wait()
+
+    def built(self, filename: str) -> bool:
+        """
+        :return: True if the batch built the file's share of its build
+        """
+        return self._built and filename not in self._failures
+
+    def failure(self, filename: str) -> Optional[str]:
+        """
+        :return: the errors of the failed batch that were caused by the file
+        """
+        return self._failures.get(filename)
+
+
+@dataclass
+class SolverOptions:
+    # Save the output to output.txt when there is no known correct output
+    save: bool = False
+    # Profile memory allocations of each part, for languages that support it
+    mem_profile: bool = False
+    # Build and time each solution with every build profile of its language
+    profiles: bool = False
+    # Time each solution with every runtime profile of its language
+    runtime_profiles: bool = False
+    # Also build each solution with profile-guided optimization, for languages
+    # that support it, to compare against the regular build
+    pgo: bool = False
+    # Solve and time in a single run of executors that support it, see
+    # `LanguageSolver._solve_and_time`
+    solve_and_time: bool = False
+    # How long executors should time each part, `None` to leave it to them
+    timing_budget: Optional[TimingBudget] = None
+    # Start solutions from a snapshot of their runtime, for languages that
+    # support it, see `LanguageSettings.snapshot`
+    snapshots: bool = False
+
+
 class LanguageSolver:
     def __init__(
         self,
@@ -34,59 +246,201 @@ class LanguageSolver:
         year: int,
         day: int,
         filename: str,
+        options: SolverOptions = None,
+        pair: InputPair = DEFAULT_PAIR,
+        profile: str = None,
+        pgo: bool = False,
+        runtime_profile: str = None,
+        calibration: CalibrationCache = None,
     ):
+        """
+        :param calibration: startup baselines to report the startup time of the
+        solution's runtime from, if it was calibrated
+        """
         self.parent_pid = parent_pid
         self.conn = conn
         self.language = language
         self.year = year
         self.day = day
         self.filename = filename
+        self.options = options or SolverOptions()
+        self.pair = pair
+        self.profile = profile
+        self.pgo = pgo
+        self.runtime_profile = runtime_profile
+        self.calibration = calibration
+        # Whether the output was correct and the timing information, if timed
+        self.passed = False
+        self.timing_info = None
+        # Time (in seconds) this job spent building, `None` if there was nothing
+        # to build, and whether it reused the build of another job instead
+        self.build_duration = None
+        self.build_shared = False
+        # Wall time (in seconds) of the timing run and the resources it used
+        self.timing_duration = None
+        self.timing_usage = None
 
-    def __call__(self, expected: str, outfile: str):
-        _, LanguageSettings, timing = LanguageRegistry.get(self.language)
-        settings = LanguageSettings(self.filename)
-        self._build(settings.compile())
-        actual = self._solve(settings.solve())
-        if not expected:
-            self._handle_output(actual, outfile)
-        elif actual != expected:
-            self._handle_invalid_output(expected, actual)
-        else:
-            self._dispatch(SolverEvent.SOLVE_SUCCEEDED)
-            if timing:
-                self._handle_timing(settings.time())
+    @property
+    def variant(self) -> Optional[str]:
+        """
+        :return: name of the file without its extension if it is a variant of the
+        day's main solution, `None` for the main solution
+        """
+        return solution_variant(self.filename)
+
+    @property
+    def build_variant(self) -> Tuple:
+        """
+        :return: the options that produce a separate build of the solution
+        """
+        return (self.profile, self.pgo, self.options.snapshots)
+
+    def __call__(self, expected_file: str, outfile: str):
+        if self.prepare(expected_file, outfile):
+            self.measure()
+
+    def prepare(
+        self,
+        expected_file: str,
+        outfile: str,
+        builds: SharedBuilds = None,
+        batch: BatchBuild = None,
+    ) -> bool:
+        """
+        Build the solution and validate its output. This stage can safely run
+        concurrently with the preparation of other solutions.
+
+        :param expected_file: path to the known correct output, if there is one
+        :param builds: shared builds, when the solution is run against several inputs
+        :param batch: batch build the solution is part of
+        :return: True if the solution is correct and is ready to be measured
+        """
+        _, LanguageSettings, self._timing = LanguageRegistry.get(self.language)
+        self._settings = LanguageSettings(
+            self.filename,
+            self.pair.input_file,
+            self.profile,
+            self.pgo,
+            self.runtime_profile,
+            timing_budget=self.options.timing_budget,
+            snapshot=self.options.snapshots and LanguageSettings.SUPPORTS_SNAPSHOT,
+        )
+        failure = None
+        if batch:
+            batch.wait()
+            self._settings.batched = batch.built(self.filename)
+            failure = batch.failure(self.filename)
+
+        built = []
+
+        def build():
+            built.append(True)
+            if failure:
+                self._batch_failed(failure)
             else:
-                self._dispatch(SolverEvent.TIMING_SKIPPED)
+                self._build()
+
+        if builds:
+            builds.build(self.filename, build, self.build_variant)
+            self.build_shared = not built
+        else:
+            build()
+        self._expected_file = None
+        if self.options.solve_and_time and self._timing and expected_file:
+            # Checked along with the timing run in the exclusive stage
+            self._expected_file = expected_file
+            return True
+        solve_cmd = self._settings.solve() + self._settings.input_args
+        with self._solve(solve_cmd) as actual:
+            if not expected_file:
+                self._handle_output(actual, outfile)
+                return False
+            diff = compare_output(actual, expected_file)
+        if diff:
+            self._handle_invalid_output(diff)
+            return False
+        self.passed = True
+        self._dispatch(SolverEvent.SOLVE_SUCCEEDED)
+        return True
+
+    def measure(self):
+        """
+        Time a solution that has been prepared. Nothing else should be running
+        while this stage runs so the measurements are not skewed.
+        """
+        if self._expected_file:
+            if not self._solve_and_time(self._expected_file):
+                return
+        elif self._timing:
+            self._handle_timing(self._settings.time() + self._settings.input_args)
+        else:
+            self._dispatch(SolverEvent.TIMING_SKIPPED)
+        if self.options.mem_profile:
+            self._handle_mem_profile()
 
     def _dispatch(self, event: str, args: PipeMessage = {}):
         args["language"] = self.language
         args["year"] = self.year
         args["day"] = self.day
+        if self.variant:
+            args["variant"] = self.variant
+        if self.pair.label:
+            args["input"] = self.pair.label
+        if self.profile:
+            args["profile"] = self.profile
+        if self.pgo:
+            args["pgo"] = True
+        if self.runtime_profile:
+            args["runtime_profile"] = self.runtime_profile
         _dispatch(self.conn, event, args)
 
-    def _shell_out(self, cmd: str):
-        def should_terminate():
-            if not is_process_running(self.parent_pid):
-                return True
-            if not self.conn.poll(0):
-                return False
-            message = self.conn.recv()
-            return message["event"] == SolverEvent.TERMINATE
+    def _should_terminate(self) -> bool:
+        if not is_process_running(self.parent_pid):
+            return True
+        if not self.conn.poll(0):
+            return False
+        message = self.conn.recv()
+        return message["event"] == SolverEvent.TERMINATE
 
+    def _shell_out(self, cmd: str, usage: ProcessUsage = None) -> str:
         unwrapped = cmd() if callable(cmd) else cmd
-        return shell_out(unwrapped, should_terminate)
+        return shell_out(unwrapped, self._should_terminate, usage)
 
-    def _build(self, compiler_gen: Generator[str, None, None]):
+    def _capture_output(self, cmd: str, usage: ProcessUsage = None) -> CapturedOutput:
+        unwrapped = cmd() if callable(cmd) else cmd
+        return capture_output(unwrapped, self._should_terminate, usage)
+
+    def _build(self):
+        """
+        Build the solution in a scratch directory of its own and promote the
+        artifacts once all build commands succeeded
+        """
+        compiler_gen = self._settings.compile()
         if not compiler_gen:
             return
-        started = False
-        try:
-            for compiler_cmd in compiler_gen:
-                if not started:
+        started = None
+
+        def run(commands: Iterator[str]):
+            nonlocal started
+            for cmd in commands:
+                if started is None:
                     self._dispatch(SolverEvent.BUILD_STARTED)
-                    started = True
-                self._shell_out(compiler_cmd)
-            if started:
+                    started = time.perf_counter()
+                self._shell_out(cmd)
+
+        try:
+            settings = self._settings
+            scratch = ScratchBuild(settings._artifact_dir, settings._bin_name)
+            with self._build_lock(), scratch as scratch_dir:
+                settings.scratch_dir = scratch_dir
+                try:
+                    run(compiler_gen)
+                finally:
+                    settings.scratch_dir = None
+                scratch.promote()
+            run(settings.post_build())
+            if started is not None:
+                self.build_duration = time.perf_counter() - started
                 self._dispatch(SolverEvent.BUILD_FINISHED)
         except ShellException as e:
             # Include stdout since Node.js writes error messages to stdout
@@ -98,10 +452,27 @@ class LanguageSolver:
             self._dispatch(SolverEvent.BUILD_FAILED, {"error": e})
             raise e
 
-    def _solve(self, cmd: str):
+    def _build_lock(self):
+        """
+        :return: the language's lock if the build writes to files shared with the
+        builds of other solutions, see `LanguageSettings.BUILD_LOCK`
+        """
+        if self._settings.BUILD_LOCK is None or self._settings.batched:
+            return nullcontext()
+        return self._settings.BUILD_LOCK
+
+    def _batch_failed(self, output: str):
+        """
+        Report the errors the solution caused in its batch build as its own
+        """
+        self._dispatch(SolverEvent.BUILD_STARTED)
+        self._dispatch(SolverEvent.BUILD_FAILED, {"stdout": output, "stderr": ""})
+        raise ShellException(1, output, "")
+
+    def _solve(self, cmd: str, usage: ProcessUsage = None) -> CapturedOutput:
         self._dispatch(SolverEvent.SOLVE_STARTED)
         try:
-            actual = self._shell_out(cmd)
+            actual = self._capture_output(cmd, usage)
             self._dispatch(SolverEvent.SOLVE_FINISHED)
             return actual
         except ShellException as e:
@@ -111,105 +482,304 @@ class LanguageSolver:
             self._dispatch(SolverEvent.SOLVE_FAILED, {"error": e})
             raise e
 
-    def _handle_output(self, actual: str, outfile: str):
-        self._dispatch(SolverEvent.SOLVE_ATTEMPTED, {"actual": actual})
+    def _handle_output(self, actual: CapturedOutput, outfile: str):
+        head, omitted = actual.head()
+        self._dispatch(
+            SolverEvent.SOLVE_ATTEMPTED, {"actual": head, "omitted": omitted}
+        )
         if outfile:
-            open(outfile, "w").write(actual)
+            actual.save(outfile)
             self._dispatch(SolverEvent.OUTPUT_SAVED, {"file": outfile})
 
     def _handle_timing(self, cmd: str):
         self._dispatch(SolverEvent.TIMING_STARTED)
         try:
+            usage = ProcessUsage()
             start_time = datetime.now()
-            timing_info = json.loads(self._shell_out(cmd))
+            timing_info = parse_timing_info(self._shell_out(cmd, usage))
             duration = datetime.now() - start_time
-            self._dispatch(
-                SolverEvent.TIMING_FINISHED, {"info": timing_info, "duration": duration}
-            )
+            self._timing_finished(timing_info, duration, usage)
         except ShellException as e:
             self._dispatch(SolverEvent.TIMING_FAILED, {"error": e.stderr})
             raise e
-        except JSONDecodeError as e:
-            url = "https://github.com/tcollier/aoc/blob/main/lib/python/lib/lang/README.md#timing"
-            self._dispatch(
-                SolverEvent.TIMING_FAILED,
-                {"stderr": f"Timing output was not valid JSON, see {url}"},
-            )
+        except TimingProtocolError as e:
+            url = "https://github.com/tcollier/aoc/blob/main/aoc_solver/lang/README.md#timing"
+            self._dispatch(SolverEvent.TIMING_FAILED, {"stderr": f"{e}, see {url}"})
         except Exception as e:
             self._dispatch(SolverEvent.TIMING_FAILED, {"error": e})
             raise e
 
-    def _handle_invalid_output(self, expected: str, actual: str):
-        self._dispatch(
-            SolverEvent.SOLVE_INCORRECT, {"expected": expected, "actual": actual}
-        )
+    def _timing_finished(
+        self, timing_info: TimingInfo, duration: timedelta, usage: ProcessUsage
+    ):
+        self.timing_info = timing_info
+        self.timing_duration = duration.total_seconds()
+        self.timing_usage = usage
+        args = {"info": timing_info, "duration": duration}
+        baseline = self.calibration and self.calibration.get(self.language)
+        if baseline:
+            args["startup"] = baseline.startup
+        self._dispatch(SolverEvent.TIMING_FINISHED, args)
+        if self.options.timing_budget:
+            violations = self.options.timing_budget.violations(timing_info)
+            if violations:
+                self._dispatch(
+                    SolverEvent.TIMING_BUDGET_IGNORED, {"violations": violations}
+                )
+
+    def _solve_and_time(self, expected_file: str) -> bool:
+        """
+        Check and time the solution with a single run, which saves starting the
+        runtime and running the solution a second time. Executors invoked with
+        `--solve-and-time` print the answers followed by the timing JSON on the
+        last line. Executors that don't support it just print the answers, and are
+        then timed with a separate run.
+
+        :return: True if the solution is correct
+        """
+        cmd = self._settings.solve_and_time() + self._settings.input_args
+        usage = ProcessUsage()
+        start_time = datetime.now()
+        with self._solve(cmd, usage) as actual:
+            duration = datetime.now() - start_time
+            answers, last_line = split_last_line(actual)
+            with answers:
+                timing_info = self._combined_timing(last_line)
+                diff = compare_output(answers if timing_info else actual, expected_file)
+        if diff:
+            self._handle_invalid_output(diff)
+            return False
+        self.passed = True
+        self._dispatch(SolverEvent.SOLVE_SUCCEEDED)
+        if timing_info:
+            self._dispatch(SolverEvent.TIMING_STARTED)
+            self._timing_finished(timing_info, duration, usage)
+        else:
+            self._handle_timing(self._settings.time() + self._settings.input_args)
+        return True
+
+    @staticmethod
+    def _combined_timing(line: str) -> Optional[TimingInfo]:
+        """
+        :return: the timing information on the last line of the output of a run
+        with `--solve-and-time`, `None` if the executor only printed the answers
+        """
+        if not line.startswith("{"):
+            return None
+        try:
+            return parse_timing_info(line)
+        except TimingProtocolError:
+            return None
+
+    def _handle_mem_profile(self):
+        with tempfile.TemporaryDirectory(prefix="aoc-memory-") as tmp_dir:
+            report_file = os.path.join(tmp_dir, "report.json")
+            cmd = self._settings.mem_profile(report_file)
+            if not cmd:
+                return
+            try:
+                self._shell_out(cmd + self._settings.input_args)
+                profile = json.load(open(report_file, "r"))
+                self._dispatch(SolverEvent.MEMORY_PROFILED, {"profile": profile})
+            except ShellException as e:
+                self._dispatch(SolverEvent.MEMORY_PROFILE_FAILED, {"stderr": e.stderr})
+            except (OSError, ValueError) as e:
+                self._dispatch(SolverEvent.MEMORY_PROFILE_FAILED, {"error": e})
+
+    def _handle_invalid_output(self, diff: OutputDiff):
+        self._dispatch(SolverEvent.SOLVE_INCORRECT, {"diff": diff})
+
+
+def solution_variant(filename: str) -> Optional[str]:
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return name if VARIANT_PATTERN.match(name) else None
 
 
 class SolverEngine:
     def __init__(
         self,
-        conn: PipeConnection,
         solutions_path: str,
         year: int,
         day: int,
-        save: bool = False,
+        options: SolverOptions = None,
+        builds: SharedBuilds = None,
+        files: Set[str] = None,
+        calibration: CalibrationCache = None,
     ):
-        if not os.path.isdir(os.path.join(solutions_path, str(year))):
-            raise ValueError(f"No solutions found for {year}")
+        """
+        :param builds: builds shared with other engines, e.g. by the daemon to skip
+        rebuilding solutions that have not changed since they were last built
+        :param calibration: startup baselines shared with other engines, loaded
+        by the engine if not given
+        :param files: names of the files in the day's directory, e.g. from the
+        `SolutionManifest`, the directory is listed if not given
+        """
         padded_day = str(day).zfill(2)
         self.base_dir = os.path.abspath(
             os.path.join(solutions_path, str(year), padded_day)
         )
-        if not os.path.isdir(self.base_dir):
-            raise ValueError(f"No solutions found for day {day} in {year}")
-        self.conn = conn
+        if files is None:
+            if not os.path.isdir(os.path.join(solutions_path, str(year))):
+                raise ValueError(f"No solutions found for {year}")
+            if not os.path.isdir(self.base_dir):
+                raise ValueError(f"No solutions found for day {day} in {year}")
+            files = set(os.listdir(self.base_dir))
         self.year = year
         self.day = day
-        self.save = save
-        self.outfile = os.path.join(self.base_dir, "output.txt")
-        self.expected = None
-        if os.path.isfile(self.outfile):
-            self.expected = "".join(open(self.outfile, "r").readlines())
+        self.options = options or SolverOptions()
+        self.files = files
+        self.config = self._load_config()
+        self.builds = builds
+        self._builds = None
+        self.calibration = calibration
+        self._calibration = None
 
     @classmethod
-    def has_solution(cls, year: int, day: int) -> bool:
-        return os.path.isfile(os.path.join(str(year), day.zfill(2), "output.txt"))
+    def has_solution(cls, year: int, day: int, solutions_path: str = ".") -> bool:
+        return os.path.isfile(
+            os.path.join(solutions_path, str(year), str(day).zfill(2), "output.txt")
+        )
+
+    def pairs(self) -> List[InputPair]:
+        """
+        Discover `input*.txt`/`output*.txt` pairs, the default pair (input.txt and
+        output.txt) is always included even when its files do not exist yet
+        """
+        suffixes = {""}
+        for filename in self.files:
+            match = INPUT_OUTPUT_PATTERN.match(filename)
+            if match:
+                suffixes.add(match.group(2))
+        pairs = []
+        for suffix in sorted(suffixes):
+            label = suffix[1:] or None
+            input_name = f"input{suffix}.txt"
+            input_file = self._path(input_name) if input_name in self.files else None
+            if label and input_file is None:
+                # Examples with a known output but no input cannot be run
+                continue
+            output_file = self._path(f"output{suffix}.txt")
+            pairs.append(InputPair(label, input_file, output_file))
+        return pairs
 
-    def __call__(self, parent_pid: int, languages: List[str]):
+    def solvers(
+        self,
+        parent_pid: int,
+        languages: List[str],
+        connect: Callable[[], PipeConnection],
+    ) -> Iterator[LanguageSolver]:
         """
         :param parent_pid: Process ID of the parent that spawned the solver. Keep
         tabs on it so we can exit if it mysteriously vanishes, e.g. with a SIGKILL
+        :param connect: factory for the connection each solver dispatches events to
+        :yield solver: a `LanguageSolver` for each solution found for the day and
+        each input it should be run against
         """
-        found = False
+        self._builds = self.builds or SharedBuilds()
+        self._calibration = self.calibration or CalibrationCache()
+        pairs = self.pairs()
         for language, filename in self._find_files(languages):
-            found = True
-            try:
-                solver = LanguageSolver(
-                    parent_pid, self.conn, language, self.year, self.day, filename
-                )
-                solver(self.expected, self.outfile if self.save else None)
-            except ShellException:
-                continue
-            except KeyboardInterrupt as e:
-                raise e
-            except TerminationException:
-                # We may have terminated because the pipe was closed, so do not attempt
-                # to send any messages
-                break
-            except:
-                continue
-        if not found and languages:
-            for language in languages:
-                self._dispatch(SolverEvent.MISSING_SRC, {"language": language})
+            for profile in self.profiles(language):
+                for pgo in self.pgo_builds(language):
+                    for runtime_profile in self.runtime_profiles(language):
+                        for pair in pairs:
+                            yield LanguageSolver(
+                                parent_pid,
+                                connect(),
+                                language,
+                                self.year,
+                                self.day,
+                                filename,
+                                self.options,
+                                pair,
+                                profile,
+                                pgo,
+                                runtime_profile,
+                                self._calibration,
+                            )
 
-    def _dispatch(self, event: str, args: PipeMessage = {}):
-        args["year"] = self.year
-        args["day"] = self.day
-        _dispatch(self.conn, event, args)
+    def profiles(self, language: str) -> List[Optional[str]]:
+        """
+        :return: the build profiles to run the language's solution with, all of
+        them when comparing profiles, otherwise the one pinned in the config file
+        (`None` for the default profile)
+        """
+        _, settings, _ = LanguageRegistry.get(language)
+        if self.options.profiles and settings.BUILD_PROFILES:
+            return list(settings.BUILD_PROFILES)
+        return [self.pinned_profile(language)]
+
+    def pgo_builds(self, language: str) -> List[bool]:
+        """
+        :return: whether to build the language's solution with profile-guided
+        optimization, the regular build always comes first to compare against
+        """
+        _, settings, _ = LanguageRegistry.get(language)
+        if self.options.pgo and settings.SUPPORTS_PGO:
+            return [False, True]
+        return [False]
+
+    def runtime_profiles(self, language: str) -> List[Optional[str]]:
+        """
+        :return: the runtime profiles to run the language's solution with, all of
+        them when comparing runtime profiles, otherwise the one pinned in the config
+        file (`None` for the default profile). They all share the same build
+        """
+        _, settings, _ = LanguageRegistry.get(language)
+        if self.options.runtime_profiles and settings.RUNTIME_PROFILES:
+            return list(settings.RUNTIME_PROFILES)
+        return [self.pinned_runtime_profile(language)]
+
+    def pinned_profile(self, language: str) -> Optional[str]:
+        return self.config.get("profiles", {}).get(language)
+
+    def pinned_runtime_profile(self, language: str) -> Optional[str]:
+        return self.config.get("runtime_profiles", {}).get(language)
+
+    def prepare(self, solver: LanguageSolver, batch: BatchBuild = None) -> bool:
+        pair = solver.pair
+        return solver.prepare(
+            pair.expected_file,
+            pair.output_file if self.options.save else None,
+            self._builds,
+            batch,
+        )
+
+    def needs_build(self, solver: LanguageSolver) -> bool:
+        """
+        :return: True unless the solver's build is shared with an earlier job that
+        built the current sources, e.g. in a long-lived daemon
+        """
+        return not self._builds.built(solver.filename, solver.build_variant)
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.base_dir, filename)
+
+    def _load_config(self) -> dict:
+        if CONFIG_FILE not in self.files:
+            return {}
+        try:
+            with open(self._path(CONFIG_FILE), "r") as f:
+                config = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Invalid {self._path(CONFIG_FILE)}: {e}")
+        if not isinstance(config, dict):
+            raise ValueError(f"Invalid {self._path(CONFIG_FILE)}: expected an object")
+        return config
 
     def _find_files(self, languages: List[str]):
+        """
+        :yield language, filename: the main solution of each language followed by
+        its variants, in order of their names
+        """
         for language in languages:
             ext, _, _ = LanguageRegistry.get(language)
-            filename = os.path.join(self.base_dir, f"main.{ext}")
-            if os.path.isfile(filename):
-                yield language, filename
+            for name in [f"main.{ext}", f"Main.{ext}"]:
+                if name in self.files:
+                    # JVM solutions are named after their class, e.g. Main.java
+                    yield language, self._path(name)
+                    break
+            for name in sorted(self.files):
+                stem, name_ext = os.path.splitext(name)
+                if name_ext == f".{ext}" and VARIANT_PATTERN.match(stem):
+                    yield language, self._path(name)
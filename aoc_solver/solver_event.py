@@ -14,4 +14,13 @@ class SolverEvent:
     TIMING_SKIPPED = "timing-skipped"
     TIMING_FINISHED = "timing-finished"
     TIMING_FAILED = "timing-failed"
+    TIMING_BUDGET_IGNORED = "timing-budget-ignored"
+    MEMORY_PROFILED = "memory-profiled"
+    MEMORY_PROFILE_FAILED = "memory-profile-failed"
+    SOLUTION_SUMMARY = "solution-summary"
+    PROFILES_RANKED = "profiles-ranked"
+    RUNTIME_PROFILES_RANKED = "runtime-profiles-ranked"
+    VARIANTS_RANKED = "variants-ranked"
+    PGO_COMPARED = "pgo-compared"
+    YEAR_REPORT = "year-report"
     TERMINATE = "terminate"
@@ -0,0 +1,655 @@
+import os
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aoc_solver.journal import Journal
+from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.metrics import RunMetrics
+from aoc_solver.shell import ShellException, TerminationException
+from aoc_solver.solver_engine import (
+    BatchBuild,
+    LanguageSolver,
+    SolverEngine,
+    solution_variant,
+)
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.timing import PARTS
+from aoc_solver.trace import Tracer
+from aoc_solver.types import PipeConnection, PipeMessage
+
+
+class ExclusiveGate:
+    """
+    Readers-writer style lock for the stages of the pipeline. Any number of
+    shared stages (builds and correctness solves) may run at once, while the
+    exclusive stage (timing) waits for in-flight shared work to finish and
+    blocks new shared work from starting until it is done.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._condition:
+            while self._exclusive or self._waiting:
+                self._condition.wait()
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._shared -= 1
+                self._condition.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._condition:
+            self._waiting += 1
+            while self._exclusive or self._shared:
+                self._condition.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+
+class _SharedConnection:
+    """
+    Thread-safe wrapper around the pipe connection to the display process that
+    also tracks whether a TERMINATE event has been received.
+    """
+
+    def __init__(self, conn: PipeConnection):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._terminated = False
+
+    def send(self, message: PipeMessage):
+        with self._lock:
+            self._conn.send(message)
+
+    def terminate(self):
+        self._terminated = True
+
+    def terminated(self) -> bool:
+        with self._lock:
+            try:
+                if not self._terminated and self._conn.poll(0):
+                    message = self._conn.recv()
+                    self._terminated = message["event"] == SolverEvent.TERMINATE
+            except (EOFError, OSError):
+                self._terminated = True
+            return self._terminated
+
+
+class _JobConnection:
+    """
+    Connection handed to each `LanguageSolver`. Unless it starts out live, events
+    are held back until the job reaches the front of the pipeline so the output
+    for each solution is displayed in order and never interleaved with output from
+    other jobs.
+    """
+
+    def __init__(self, shared: _SharedConnection, live: bool = False):
+        self._shared = shared
+        self._buffer = []
+        self._live = live
+        self._lock = threading.Lock()
+        # Every event sent by the job, to journal it once the job is complete
+        self.sent: List[PipeMessage] = []
+
+    def send(self, message: PipeMessage):
+        with self._lock:
+            self.sent.append(dict(message))
+            if self._live:
+                self._shared.send(message)
+            else:
+                self._buffer.append(dict(message))
+
+    def poll(self, _timeout: float = 0) -> bool:
+        return self._shared.terminated()
+
+    def recv(self) -> PipeMessage:
+        return {"event": SolverEvent.TERMINATE}
+
+    def go_live(self):
+        """
+        Flush all held back events and send all future events straight through
+        """
+        with self._lock:
+            try:
+                for message in self._buffer:
+                    self._shared.send(message)
+            except OSError:
+                raise TerminationException(
+                    "Terminating because pipe was unexpectedly closed"
+                )
+            self._buffer = []
+            self._live = True
+
+
+class SolverPipeline:
+    """
+    Runs the solutions for all engines in stages. Builds and correctness solves
+    run ahead of time on a pool of workers, while timing runs one solution at a
+    time through an exclusive stage so measurements never overlap with other work.
+    Events are displayed in the same order as a serial run would produce them.
+    Languages that can share work between builds start with a batch build of all
+    their solutions, see `BatchBuild`.
+    """
+
+    def __init__(
+        self,
+        conn: PipeConnection,
+        engines: List[SolverEngine],
+        languages: List[str],
+        workers: int = None,
+        live: bool = False,
+        journal: Journal = None,
+        metrics: RunMetrics = None,
+    ):
+        """
+        :param live: send the events of every job as they happen instead of in the
+        order of a serial run, for displays that show concurrent jobs
+        :param journal: journal to record completed jobs in, jobs it already has
+        are replayed rather than run
+        :param metrics: metrics to add every job to, written once all jobs ran
+        """
+        self.conn = conn
+        self.engines = engines
+        self.languages = languages
+        self.workers = workers or os.cpu_count() or 1
+        self.live = live
+        self.journal = journal
+        self.metrics = metrics
+
+    def __call__(self, parent_pid: int):
+        """
+        :param parent_pid: Process ID of the parent that spawned the solver. Keep
+        tabs on it so we can exit if it mysteriously vanishes, e.g. with a SIGKILL
+        """
+        shared = _SharedConnection(self.conn)
+        gate = ExclusiveGate()
+        pool = ThreadPoolExecutor(self.workers, thread_name_prefix="AoC-prepare")
+        steps = []
+        try:
+            steps, replays = self._plan(parent_pid, shared)
+            pending = [
+                i
+                for i, (_, solver, _) in enumerate(steps)
+                if solver and solver not in replays
+            ]
+            batches = self._batch_builds(
+                pool, gate, shared, [steps[i] for i in pending]
+            )
+            for i in pending:
+                engine, solver, _ = steps[i]
+                batch = batches.get(solver.filename)
+                future = pool.submit(self._prepare, gate, engine, solver, batch)
+                steps[i] = (engine, solver, future)
+            for i, (engine, solver, future) in enumerate(steps):
+                if solver is None:
+                    self._missing_sources(shared, engine)
+                    continue
+                replayed = solver in replays
+                if replayed:
+                    self._replay(shared, solver, replays[solver])
+                elif not self._run(gate, solver, future):
+                    break
+                self._record(shared, solver, replayed)
+                self._report_groups(shared, steps, i)
+            else:
+                self._report_run(shared, steps)
+        finally:
+            shared.terminate()
+            for _, _, future in steps:
+                if future:
+                    future.cancel()
+            pool.shutdown()
+            if self.journal:
+                self.journal.close()
+            Tracer.flush()
+
+    def _plan(self, parent_pid: int, shared: _SharedConnection):
+        """
+        :return: a step of (engine, solver, future) for every job in the order they
+        are displayed in, with no solver for days that have no sources, and the
+        journal records of the jobs that are replayed rather than run
+        """
+        steps = []
+        replays = {}
+        for engine in self.engines:
+            solvers = list(
+                engine.solvers(
+                    parent_pid,
+                    self.languages,
+                    lambda: _JobConnection(shared, self.live),
+                )
+            )
+            if not solvers:
+                steps.append((engine, None, None))
+            for solver in solvers:
+                record = self.journal and self.journal.completed(solver)
+                if record:
+                    replays[solver] = record
+                steps.append((engine, solver, None))
+        return steps, replays
+
+    def _record(
+        self, shared: _SharedConnection, solver: LanguageSolver, replayed: bool
+    ):
+        """
+        Record a completed job in the journal and metrics
+        """
+        if self.journal and not replayed and not shared.terminated():
+            self.journal.record(solver, solver.conn.sent)
+        if self.metrics:
+            self.metrics.add(solver, replayed)
+
+    def _report_groups(self, shared: _SharedConnection, steps, index: int):
+        """
+        Send the summaries of every group of jobs that the job at `index` is the
+        last of, from the narrowest group to the widest
+        """
+        engine = steps[index][0]
+        reporters = [
+            (self._inputs_key, self._summarize),
+            (self._runtime_key, self._rank_runtime_profiles),
+            (self._build_key, self._compare_pgo),
+            (self._solution_key, self._rank_profiles),
+            (self._language_key, self._rank_variants),
+        ]
+        for key, report in reporters:
+            group = self._group(steps, index, key)
+            if group:
+                report(shared, engine, group)
+
+    def _report_run(self, shared: _SharedConnection, steps):
+        """
+        Send the summaries of the whole run once every job completed
+        """
+        self._report_years(shared, steps)
+        if self.metrics:
+            self.metrics.write()
+
+    @staticmethod
+    def _batch_builds(
+        pool: ThreadPoolExecutor,
+        gate: ExclusiveGate,
+        shared: _SharedConnection,
+        steps,
+    ) -> Dict[str, BatchBuild]:
+        """
+        Start a batch build for every language that supports them and has more than
+        one solution to build, ahead of the jobs that wait for it
+
+        :return: the batch build each solution file is part of
+        """
+        filenames = {}
+        for engine, solver, _ in steps:
+            if engine.needs_build(solver):
+                files = filenames.setdefault(solver.language, [])
+                if solver.filename not in files:
+                    files.append(solver.filename)
+        batches = {}
+        for language, files in filenames.items():
+            _, settings, _ = LanguageRegistry.get(language)
+            if not settings.SUPPORTS_BATCH or len(files) < 2:
+                continue
+            batch = BatchBuild(language, files)
+            pool.submit(SolverPipeline._batch_build, gate, shared, batch)
+            for filename in files:
+                batches[filename] = batch
+        return batches
+
+    @staticmethod
+    def _batch_build(
+        gate: ExclusiveGate, shared: _SharedConnection, batch: BatchBuild
+    ):
+        with gate.shared():
+            with Tracer.span("batch build", "stage", language=batch.language):
+                batch(shared.terminated)
+
+    @staticmethod
+    def _prepare(
+        gate: ExclusiveGate,
+        engine: SolverEngine,
+        solver: LanguageSolver,
+        batch: BatchBuild = None,
+    ):
+        if batch:
+            # Outside the gate, since the batch build needs to pass it
+            batch.wait()
+        with gate.shared():
+            with Tracer.span("prepare", "stage", language=solver.language):
+                return engine.prepare(solver, batch)
+
+    @staticmethod
+    def _run(gate: ExclusiveGate, solver: LanguageSolver, future: Future) -> bool:
+        """
+        Wait for the solution to be prepared and measure it
+
+        :return: False if the pipeline is terminating
+        """
+        try:
+            solver.conn.go_live()
+            with Tracer.span("wait", "stage", language=solver.language):
+                ready = future.result()
+            if ready:
+                with gate.exclusive():
+                    with Tracer.span("measure", "stage", language=solver.language):
+                        solver.measure()
+        except ShellException:
+            pass
+        except KeyboardInterrupt as e:
+            raise e
+        except TerminationException:
+            # We may have terminated because the pipe was closed, so do not attempt
+            # to send any messages
+            return False
+        except:
+            pass
+        return True
+
+    @staticmethod
+    def _replay(shared: _SharedConnection, solver: LanguageSolver, record: dict):
+        """
+        Display the events of a job completed by an earlier run and restore its
+        outcome for the summaries
+        """
+        for message in record["events"]:
+            shared.send(message)
+        solver.passed = record["passed"]
+        solver.timing_info = record["timing_info"]
+
+    @staticmethod
+    def _language_key(solver: LanguageSolver) -> Tuple:
+        return (solver.year, solver.day, solver.language)
+
+    @staticmethod
+    def _solution_key(solver: LanguageSolver) -> Tuple:
+        return (solver.year, solver.day, solver.filename)
+
+    @staticmethod
+    def _build_key(solver: LanguageSolver) -> Tuple:
+        return (solver.year, solver.day, solver.filename, solver.profile)
+
+    @staticmethod
+    def _runtime_key(solver: LanguageSolver) -> Tuple:
+        return (solver.year, solver.day, solver.filename, solver.profile, solver.pgo)
+
+    @staticmethod
+    def _inputs_key(solver: LanguageSolver) -> Tuple:
+        return SolverPipeline._runtime_key(solver) + (solver.runtime_profile,)
+
+    @staticmethod
+    def _group(steps, index: int, key: Callable[[LanguageSolver], Tuple]):
+        """
+        :return: all consecutive solvers with the same key as the one at `index` if
+        it is the last of them, otherwise empty
+        """
+        expected = key(steps[index][1])
+
+        def same_key(step):
+            return step[1] and key(step[1]) == expected
+
+        if index + 1 < len(steps) and same_key(steps[index + 1]):
+            return []
+        group = []
+        while index >= 0 and same_key(steps[index]):
+            group.insert(0, steps[index][1])
+            index -= 1
+        return group
+
+    @staticmethod
+    def _totals(solvers: List[LanguageSolver]) -> Optional[Dict[str, float]]:
+        """
+        :return: the average time of each part summed over all solvers, `None`
+        unless all of them were timed
+        """
+        if not all(solver.timing_info for solver in solvers):
+            return None
+        return {
+            part: sum(solver.timing_info[part].average for solver in solvers)
+            for part in PARTS
+        }
+
+    def _summarize(
+        self,
+        shared: _SharedConnection,
+        _engine: SolverEngine,
+        solvers: List[LanguageSolver],
+    ):
+        """
+        Report how many inputs a build passed and its time summed over them
+        """
+        if len(solvers) < 2:
+            return
+        message = {
+            "event": SolverEvent.SOLUTION_SUMMARY,
+            "year": solvers[0].year,
+            "day": solvers[0].day,
+            "language": solvers[0].language,
+            "passed": sum(1 for solver in solvers if solver.passed),
+            "total": len(solvers),
+        }
+        if solvers[0].variant:
+            message["variant"] = solvers[0].variant
+        if solvers[0].profile:
+            message["profile"] = solvers[0].profile
+        if solvers[0].pgo:
+            message["pgo"] = True
+        if solvers[0].runtime_profile:
+            message["runtime_profile"] = solvers[0].runtime_profile
+        totals = self._totals(solvers)
+        if totals:
+            message["totals"] = totals
+        shared.send(message)
+
+    def _compare_pgo(
+        self,
+        shared: _SharedConnection,
+        _engine: SolverEngine,
+        solvers: List[LanguageSolver],
+    ):
+        """
+        Report how much faster each part got with profile-guided optimization,
+        summed over all inputs
+        """
+        if not any(solver.pgo for solver in solvers):
+            return
+        message = {
+            "event": SolverEvent.PGO_COMPARED,
+            "year": solvers[0].year,
+            "day": solvers[0].day,
+            "language": solvers[0].language,
+            "before": self._totals([s for s in solvers if not s.pgo]),
+            "after": self._totals([s for s in solvers if s.pgo]),
+        }
+        if solvers[0].variant:
+            message["variant"] = solvers[0].variant
+        if solvers[0].profile:
+            message["profile"] = solvers[0].profile
+        shared.send(message)
+
+    def _rank_profiles(
+        self,
+        shared: _SharedConnection,
+        engine: SolverEngine,
+        solvers: List[LanguageSolver],
+    ):
+        """
+        Rank the build profiles a solution was timed with from fastest to slowest,
+        comparing the builds without PGO run with the first runtime profile.
+        Profiles that failed or could not be timed are ranked last
+        """
+        if len({solver.profile for solver in solvers}) < 2:
+            return
+        runtime_profile = solvers[0].runtime_profile
+        solvers = [
+            solver
+            for solver in solvers
+            if not solver.pgo and solver.runtime_profile == runtime_profile
+        ]
+        message = {
+            "event": SolverEvent.PROFILES_RANKED,
+            "year": solvers[0].year,
+            "day": solvers[0].day,
+            "language": solvers[0].language,
+            "ranking": self._profile_ranking(solvers, lambda s: s.profile),
+            "pinned": engine.pinned_profile(solvers[0].language),
+        }
+        if solvers[0].variant:
+            message["variant"] = solvers[0].variant
+        shared.send(message)
+
+    def _rank_runtime_profiles(
+        self,
+        shared: _SharedConnection,
+        engine: SolverEngine,
+        solvers: List[LanguageSolver],
+    ):
+        """
+        Rank the runtime profiles a build was timed with from fastest to slowest,
+        profiles that failed or could not be timed are ranked last
+        """
+        if len({solver.runtime_profile for solver in solvers}) < 2:
+            return
+        message = {
+            "event": SolverEvent.RUNTIME_PROFILES_RANKED,
+            "year": solvers[0].year,
+            "day": solvers[0].day,
+            "language": solvers[0].language,
+            "ranking": self._profile_ranking(solvers, lambda s: s.runtime_profile),
+            "pinned": engine.pinned_runtime_profile(solvers[0].language),
+        }
+        if solvers[0].variant:
+            message["variant"] = solvers[0].variant
+        if solvers[0].profile:
+            message["profile"] = solvers[0].profile
+        if solvers[0].pgo:
+            message["pgo"] = True
+        shared.send(message)
+
+    def _profile_ranking(
+        self,
+        solvers: List[LanguageSolver],
+        profile: Callable[[LanguageSolver], Optional[str]],
+    ) -> List[dict]:
+        by_profile = {}
+        for solver in solvers:
+            by_profile.setdefault(profile(solver), []).append(solver)
+        ranking = []
+        for name, profile_solvers in by_profile.items():
+            totals = self._totals(profile_solvers)
+            ranking.append(
+                {
+                    "profile": name,
+                    "parts": totals,
+                    "total": sum(totals.values()) if totals else None,
+                }
+            )
+        ranking.sort(key=lambda r: (r["total"] is None, r["total"] or 0))
+        return ranking
+
+    def _rank_variants(
+        self,
+        shared: _SharedConnection,
+        _engine: SolverEngine,
+        solvers: List[LanguageSolver],
+    ):
+        """
+        Rank the main solution of a language and its variants from fastest to
+        slowest, comparing the builds of the first profile without PGO, run with the
+        first runtime profile. Variants that failed against any input or could not
+        be timed are ranked last
+        """
+        if len({solver.filename for solver in solvers}) < 2:
+            return
+        by_file = {}
+        for solver in solvers:
+            if (
+                not solver.pgo
+                and solver.profile == solvers[0].profile
+                and solver.runtime_profile == solvers[0].runtime_profile
+            ):
+                by_file.setdefault(solver.filename, []).append(solver)
+        ranking = []
+        for filename, file_solvers in by_file.items():
+            passed = all(solver.passed for solver in file_solvers)
+            totals = self._totals(file_solvers) if passed else None
+            ranking.append(
+                {
+                    "variant": solution_variant(filename),
+                    "passed": passed,
+                    "parts": totals,
+                    "total": sum(totals.values()) if totals else None,
+                }
+            )
+        ranking.sort(key=lambda r: (r["total"] is None, r["total"] or 0))
+        shared.send(
+            {
+                "event": SolverEvent.VARIANTS_RANKED,
+                "year": solvers[0].year,
+                "day": solvers[0].day,
+                "language": solvers[0].language,
+                "ranking": ranking,
+            }
+        )
+
+    def _report_years(self, shared: _SharedConnection, steps):
+        """
+        Report the total time of every year that more than one day was run for,
+        counting the fastest passing solution of each day against its default input
+        """
+        years = {}
+        for engine, solver, _ in steps:
+            days = years.setdefault(engine.year, {})
+            fastest = days.setdefault(engine.day, None)
+            if not solver or solver.pair.label or not solver.passed:
+                continue
+            if not solver.timing_info:
+                continue
+            total = sum(solver.timing_info[part].average for part in PARTS)
+            if not fastest or total < fastest["total"]:
+                days[engine.day] = {
+                    "day": engine.day,
+                    "language": solver.language,
+                    "variant": solver.variant,
+                    "total": total,
+                }
+        for year, days in years.items():
+            if len(days) < 2:
+                continue
+            shared.send(
+                {
+                    "event": SolverEvent.YEAR_REPORT,
+                    "year": year,
+                    "days": [
+                        fastest or {"day": day, "language": None, "total": None}
+                        for day, fastest in days.items()
+                    ],
+                }
+            )
+
+    def _missing_sources(self, shared: _SharedConnection, engine: SolverEngine):
+        for language in self.languages:
+            shared.send(
+                {
+                    "event": SolverEvent.MISSING_SRC,
+                    "year": engine.year,
+                    "day": engine.day,
+                    "language": language,
+                }
+            )
@@ -0,0 +1,142 @@
+import shutil
+import time
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.terminal.display import Display
+from aoc_solver.terminal.elements import CURSOR_RETURN, Box, BoxDisplay, Text, TextColor
+from aoc_solver.terminal.handlers import Solution, StatusBox, StatusSettings
+from aoc_solver.types import PipeMessage, Stringable, StringableIterator
+
+# Status shown in a job's row from the event that starts each phase until the next
+PHASES = {
+    SolverEvent.BUILD_STARTED: StatusSettings.COMPILING,
+    SolverEvent.SOLVE_STARTED: StatusSettings.SOLVING,
+    SolverEvent.SOLVE_SUCCEEDED: ("WAIT", TextColor.GREY),
+    SolverEvent.TIMING_STARTED: StatusSettings.TIMING,
+}
+# Events that end a job, its row is replaced by the result
+FINISHED = {
+    SolverEvent.BUILD_FAILED,
+    SolverEvent.SOLVE_FAILED,
+    SolverEvent.SOLVE_ATTEMPTED,
+    SolverEvent.SOLVE_INCORRECT,
+    SolverEvent.TIMING_SKIPPED,
+    SolverEvent.TIMING_FINISHED,
+    SolverEvent.TIMING_FAILED,
+}
+# Moves the cursor to the start of the line n lines up and clears everything below
+ERASE_LINES = "\033[{}F\033[J"
+
+
+@dataclass
+class _Job:
+    solution: Solution
+    started: float
+    status: Tuple[str, str]
+
+
+class Dashboard(Display):
+    """
+    Display for runs where several jobs are in flight at once. Each running job has
+    a status row with its phase and elapsed time at the bottom of the screen, while
+    completed results scroll above the rows. Events only update state, the screen
+    is redrawn at most `refresh_rate` times a second however many events arrive.
+
+    Meant for pipelines that send the events of each job as they happen rather
+    than in the order of a serial run.
+    """
+
+    def __init__(self, refresh_rate: int = 10):
+        super().__init__()
+        self._frame_interval = 1 / refresh_rate
+        self._jobs = {}
+        self._pending: List[Stringable] = []
+        self._drawn_rows = 0
+        self._drawn_at = 0.0
+        self._redraw = False
+
+    def handle(self, message: PipeMessage) -> StringableIterator:
+        event = message["event"]
+        if event in PHASES:
+            key = self._job_key(message)
+            if key not in self._jobs:
+                solution = Solution.from_args(message)
+                self._jobs[key] = _Job(solution, time.monotonic(), PHASES[event])
+            self._jobs[key].status = PHASES[event]
+        elif event not in (SolverEvent.BUILD_FINISHED, SolverEvent.SOLVE_FINISHED):
+            if event in FINISHED:
+                self._jobs.pop(self._job_key(message), None)
+            self._pending += self._results(message)
+        if event == SolverEvent.TERMINATE:
+            self._jobs.clear()
+            self._redraw = True
+        return iter(())
+
+    def tick(self) -> StringableIterator:
+        now = time.monotonic()
+        if not self._redraw and now - self._drawn_at < self._frame_interval:
+            return
+        if not (self._pending or self._jobs or self._drawn_rows):
+            return
+        self._redraw = False
+        self._drawn_at = now
+        if self._drawn_rows:
+            yield Text(ERASE_LINES.format(self._drawn_rows))
+        yield from self._pending
+        self._pending = []
+        rows = self._rows(now)
+        yield from rows
+        self._drawn_rows = len(rows)
+
+    def set_busy(self, _busy) -> StringableIterator:
+        # Every running job has its own row instead of a single spinner
+        return iter(())
+
+    def _results(self, message: PipeMessage) -> List[Stringable]:
+        if message["event"] == SolverEvent.TIMING_SKIPPED:
+            # Normally ends the inline PASS line of the solve, which is never drawn
+            return [
+                StatusBox.build(
+                    StatusSettings.SUCCEEDED, message, display=BoxDisplay.BLOCK
+                )
+            ]
+        return [
+            output
+            for output in super().handle(message)
+            if output is not CURSOR_RETURN
+        ]
+
+    def _rows(self, now: float) -> List[Stringable]:
+        jobs = sorted(self._jobs.values(), key=lambda job: job.started)
+        max_rows = max(shutil.get_terminal_size().lines - 1, 1)
+        hidden = 0
+        if len(jobs) > max_rows:
+            hidden = len(jobs) - max_rows + 1
+            jobs = jobs[: max_rows - 1]
+        rows = []
+        for job in jobs:
+            status, color = job.status
+            elapsed = Text(f"{now - job.started:.1f}s", TextColor.GREY)
+            rows.append(
+                StatusBox(status, color, job.solution, BoxDisplay.BLOCK, elapsed)
+            )
+        if hidden:
+            more = Text(f"... {hidden} more running jobs", TextColor.GREY)
+            rows.append(Box(more, display=BoxDisplay.BLOCK))
+        return rows
+
+    @staticmethod
+    def _job_key(message: PipeMessage) -> Tuple:
+        return (
+            message.get("year"),
+            message.get("day"),
+            message.get("language"),
+            message.get("variant"),
+            message.get("profile"),
+            message.get("pgo", False),
+            message.get("runtime_profile"),
+            message.get("input"),
+        )
@@ -1,7 +1,12 @@
+import json
+import os
+
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
-from aoc_solver.lang.registry import LanguageRegistry
+from aoc_solver.lang.registry import DEFAULT_PROFILE, LanguageRegistry
+from aoc_solver.output import MAX_LINE_WIDTH, OutputDiff
+from aoc_solver.solver_engine import CONFIG_FILE
 from aoc_solver.solver_event import SolverEvent
 from aoc_solver.terminal.elements import (
     CURSOR_RETURN,
@@ -15,9 +20,19 @@ from aoc_solver.terminal.elements import (
     TextColor,
 )
 from aoc_solver.terminal.registry import register_handler
+from aoc_solver.timing import PARTS, PERCENTILES, TimingInfo
 from aoc_solver.types import PipeMessage, Stringable, StringableIterator
 
 MAX_LANGUAGE_WIDTH = max([len(l) for l in LanguageRegistry.all()])
+# Time (in microseconds) all days of a year should be solved in
+YEAR_BUDGET = 1000000
+# Width of the bar of a day that takes the whole budget
+BUDGET_BAR_WIDTH = 40
+BAR_CHARS = ["", "▏", "▎", "▍", "▌", "▋", "▊", "▉"]
+# Share of the year's total runtime that the slowest days are highlighted for
+DOMINANT_SHARE = 0.8
+# Shown in a diff for a line that one of the outputs does not have
+MISSING_LINE = "(no line)"
 
 
 @dataclass
@@ -25,10 +40,29 @@ class Solution:
     year: int
     day: int
     language: str
+    # Label of the input the solution ran against, `None` for the default input
+    input: str = None
+    # Build profile the solution was compiled with, `None` for the default profile
+    profile: str = None
+    # Whether the solution was built with profile-guided optimization
+    pgo: bool = False
+    # Name of the variant (e.g. "main_bitset"), `None` for the main solution
+    variant: str = None
+    # Runtime profile the solution ran with, `None` for the default profile
+    runtime_profile: str = None
 
     @classmethod
     def from_args(_cls, args):
-        return Solution(args["year"], args["day"], args["language"])
+        return Solution(
+            args["year"],
+            args["day"],
+            args["language"],
+            args.get("input"),
+            args.get("profile"),
+            args.get("pgo", False),
+            args.get("variant"),
+            args.get("runtime_profile"),
+        )
 
 
 @dataclass
@@ -48,6 +82,16 @@ class StatusBox(Element):
         formatted_day = f"{self.solution.year}/{str(self.solution.day).rjust(2, '0')}"
         formatted_language = Box(Text(self.solution.language), width=MAX_LANGUAGE_WIDTH)
         day_language = f"{formatted_day} {formatted_language}"
+        pgo = "pgo" if self.solution.pgo else None
+        labels = [
+            self.solution.variant,
+            self.solution.profile,
+            pgo,
+            self.solution.runtime_profile,
+        ]
+        for label in labels + [self.solution.input]:
+            if label:
+                day_language += f" {label}"
         status = Text(f"{self.status.ljust(4, ' ')} [{day_language}]", self.color)
         if self.details:
             status = Text(" ".join([str(status), str(self.details)]))
@@ -59,8 +103,13 @@ class StatusSettings:
     SOLVING = ("EXEC", TextColor.CYAN)
     TIMING = ("TIME", TextColor.MAGENTA)
     ATTEMPTED = ("TRY", TextColor.YELLOW)
+    WARNING = ("WARN", TextColor.YELLOW)
     SUCCEEDED = ("PASS", TextColor.GREEN)
     FAILED = ("FAIL", TextColor.RED)
+    ALL_SUCCEEDED = ("ALL", TextColor.GREEN)
+    SOME_FAILED = ("ALL", TextColor.RED)
+    RANKED = ("RANK", TextColor.CYAN)
+    PGO = ("PGO", TextColor.CYAN)
 
 
 @dataclass
@@ -75,7 +124,7 @@ class TimingDuration(Element):
 
     duration: float
 
-    def __repr__(self):
+    def _formatted(self):
         if self.duration < 1:
             value = self.duration * 1000
             unit = "ns"
@@ -93,29 +142,36 @@ class TimingDuration(Element):
             unit = "s"
             color = TextColor.RED
         formatted_value = "{:.2f}".format(value)
+        return formatted_value, unit, color
+
+    @property
+    def text(self) -> Text:
+        formatted_value, unit, color = self._formatted()
+        return Text(f"{formatted_value} {unit}", color)
+
+    def __repr__(self):
+        _, unit, _ = self._formatted()
         box_width = len(f"NNN.NN {unit}")
-        return str(
-            Box(Text(f"{formatted_value} {unit}", color), box_width, BoxAlign.RIGHT)
-        )
+        return str(Box(self.text, box_width, BoxAlign.RIGHT))
 
 
 @dataclass
 class TimingDetails(Element):
-    # Dictionary that contains "part1" and "part2" keys, both of which point to objects
-    # that have "iterations" (number of times the solver function was inovked) and
-    # "duration" (total time in microseconds all iterations took)
-    timing_info: dict
+    # Dictionary that contains "part1" and "part2" keys, both of which point to
+    # `PartTiming` objects parsed from the executor's timing output
+    timing_info: TimingInfo
     duration: float
+    # Startup baseline (in microseconds) of the language's toolchain, if it has
+    # been calibrated, to split the overhead into runtime startup and the
+    # solution's own setup (e.g. parsing input)
+    startup: Optional[float] = None
 
     def _avg_time(self, part: str) -> float:
-        return self.timing_info[part]["duration"] / self.timing_info[part]["iterations"]
+        return self.timing_info[part].average
 
     @property
     def _timing_duration(self):
-        return (
-            self.timing_info["part1"]["duration"]
-            + self.timing_info["part2"]["duration"]
-        )
+        return self.timing_info["part1"].duration + self.timing_info["part2"].duration
 
     def __repr__(self):
         duration_us = self.duration.seconds * 1000000 + self.duration.microseconds
@@ -124,26 +180,129 @@ class TimingDetails(Element):
         part2_avg_time = self._avg_time("part2")
         part2_spacer = " " if part1_avg_time >= 1000000 else ""
         overhead_spacer = " " if part2_avg_time >= 1000000 else ""
-        end_spacer = " " if overhead >= 1000000 else ""
-        contents = ", ".join(
-            [
-                f"part1: {TimingDuration(part1_avg_time)}",
-                f"{part2_spacer}part2: {TimingDuration(part2_avg_time)}",
-                f"{overhead_spacer}overhead: {TimingDuration(overhead)}{end_spacer}",
+        parts = [
+            f"part1: {TimingDuration(part1_avg_time)}",
+            f"{part2_spacer}part2: {TimingDuration(part2_avg_time)}",
+        ]
+        if self.startup is None:
+            end_spacer = " " if overhead >= 1000000 else ""
+            parts.append(
+                f"{overhead_spacer}overhead: {TimingDuration(overhead)}{end_spacer}"
+            )
+        else:
+            setup = max(overhead - self.startup, 0)
+            setup_spacer = " " if self.startup >= 1000000 else ""
+            end_spacer = " " if setup >= 1000000 else ""
+            parts += [
+                f"{overhead_spacer}startup: {TimingDuration(self.startup)}",
+                f"{setup_spacer}setup: {TimingDuration(setup)}{end_spacer}",
             ]
-        )
-        return f"({contents})"
+        return f"({', '.join(parts)})"
+
+
+@dataclass
+class TimingDistribution(Element):
+    """
+    Table of the cold (first call) time, percentiles and max per part for
+    executors that report per-iteration samples or a histogram
+    """
+
+    timing_info: TimingInfo
+
+    @property
+    def has_distribution(self) -> bool:
+        return any(info.has_distribution for info in self.timing_info.values())
+
+    def __repr__(self):
+        headers = ["", "cold", *[f"p{p}" for p in PERCENTILES], "max"]
+        table = [[Text(header) for header in headers]]
+        for part, info in self.timing_info.items():
+            values = [
+                info.cold,
+                *[info.percentile(p) for p in PERCENTILES],
+                info.slowest,
+            ]
+            table.append(
+                [
+                    Text(part),
+                    *[
+                        TimingDuration(v).text if v is not None else Text("-")
+                        for v in values
+                    ],
+                ]
+            )
+        return str(Table(table))
+
+
+@dataclass
+class MemorySize(Element):
+    size: int
+
+    def __repr__(self):
+        value = float(self.size)
+        for unit in ["B", "KiB", "MiB"]:
+            if abs(value) < 1024:
+                break
+            value /= 1024
+        else:
+            unit = "GiB"
+        return f"{value:.1f} {unit}" if unit != "B" else f"{self.size} B"
+
+
+@dataclass
+class MemoryProfile(Element):
+    """
+    Peak traced memory and the allocation sites that grew the most for each part
+
+    :param profile: dictionary of part to a report with "peak", "retained" and
+    "sites" (list of dictionaries with "file", "line", "size" and "count")
+    """
+
+    profile: dict
+
+    def __repr__(self):
+        table = [
+            [Text(""), Text("peak"), Text("allocation site"), Text("size"), Text("#")]
+        ]
+        for part, report in sorted(self.profile.items()):
+            sites = report["sites"] or [None]
+            for i, site in enumerate(sites):
+                row = [
+                    Text(part if i == 0 else ""),
+                    Text(str(MemorySize(report["peak"])) if i == 0 else ""),
+                ]
+                if site:
+                    location = f"{os.path.basename(site['file'])}:{site['line']}"
+                    row += [
+                        Text(location, TextColor.GREY),
+                        Text(str(MemorySize(site["size"]))),
+                        Text(str(site["count"])),
+                    ]
+                else:
+                    row += [Text(""), Text(""), Text("")]
+                table.append(row)
+        return str(Table(table))
 
 
 class DiffTable(Element):
     EXPECTED_COLOR = TextColor.CYAN
     ACTUAL_COLOR = TextColor.YELLOW
 
-    def __init__(self, expected: List[str], actual: List[str]):
-        self.expected = expected
-        self.actual = actual
-        for i in range(len(self.expected) - len(self.actual)):
-            self.actual.append("")
+    def __init__(self, diff: OutputDiff):
+        self.diff = diff
+
+    @staticmethod
+    def _line(line: Optional[str], color: TextColor) -> Text:
+        # Set apart from an empty line, e.g. when the only difference is a blank
+        # line at the end
+        if line is None:
+            return Text(MISSING_LINE, TextColor.GREY)
+        return Text(line, color)
+
+    def _header(self, line_number: int) -> str:
+        if max(self.diff.expected_lines, self.diff.actual_lines) <= 2:
+            return f"Part {line_number}"
+        return f"Line {line_number}"
 
     def __repr__(self):
         table = [
@@ -151,12 +310,21 @@ class DiffTable(Element):
             [Text("Expected", self.EXPECTED_COLOR)],
             [Text("Actual", self.ACTUAL_COLOR)],
         ]
-        for i in range(len(self.expected)):
-            if self.expected[i] != self.actual[i]:
-                table[0].append(Text(f"Part {i + 1}"))
-                table[1].append(Text(self.expected[i], self.EXPECTED_COLOR))
-                table[2].append(Text(self.actual[i], self.ACTUAL_COLOR))
-        return str(Table(table, display=BoxDisplay.BLOCK))
+        for line_number, expected, actual in self.diff.rows:
+            table[0].append(Text(self._header(line_number)))
+            table[1].append(self._line(expected, self.EXPECTED_COLOR))
+            table[2].append(self._line(actual, self.ACTUAL_COLOR))
+        string = str(Table(table, display=BoxDisplay.BLOCK))
+        for line_number in self.diff.truncated:
+            string += (
+                f"... ({self._header(line_number)} differs after the first "
+                f"{MAX_LINE_WIDTH - 1} characters)\n"
+            )
+        if self.diff.truncated and not self.diff.omitted:
+            string += "\n"
+        if self.diff.omitted:
+            string += f"... ({self.diff.omitted} more lines differ)\n\n"
+        return string
 
 
 def _handle_error(args):
@@ -222,9 +390,10 @@ def _solve_failed(display, args: PipeMessage) -> StringableIterator:
 @register_handler(SolverEvent.SOLVE_ATTEMPTED)
 def _solve_attempted(_display, args: PipeMessage) -> StringableIterator:
     yield StatusBox.build(StatusSettings.ATTEMPTED, args, display=BoxDisplay.BLOCK)
-    yield Table(
-        [[Text("Output")], *[[Text(v)] for v in args["actual"].rstrip().split("\n")],]
-    )
+    rows = [[Text(v)] for v in args["actual"].rstrip().split("\n")]
+    if args.get("omitted"):
+        rows.append([Text(f"... ({args['omitted']} more lines)", TextColor.GREY)])
+    yield Table([[Text("Output")], *rows])
 
 
 @register_handler(SolverEvent.SOLVE_SUCCEEDED)
@@ -235,9 +404,7 @@ def _solve_succeeded(_display, args: PipeMessage) -> StringableIterator:
 @register_handler(SolverEvent.SOLVE_INCORRECT)
 def _solve_incorrect(_display, args: PipeMessage) -> StringableIterator:
     yield StatusBox.build(StatusSettings.FAILED, args, display=BoxDisplay.BLOCK)
-    yield DiffTable(
-        args["expected"].rstrip().split("\n"), args["actual"].rstrip().split("\n")
-    )
+    yield DiffTable(args["diff"])
 
 
 @register_handler(SolverEvent.OUTPUT_SAVED)
@@ -264,9 +431,12 @@ def _timing_finished(display, args: PipeMessage) -> StringableIterator:
     yield StatusBox.build(
         StatusSettings.SUCCEEDED,
         args,
-        details=TimingDetails(args["info"], args["duration"]),
+        details=TimingDetails(args["info"], args["duration"], args.get("startup")),
         display=BoxDisplay.BLOCK,
     )
+    distribution = TimingDistribution(args["info"])
+    if distribution.has_distribution:
+        yield distribution
 
 
 @register_handler(SolverEvent.TIMING_FAILED)
@@ -277,6 +447,203 @@ def _timing_failed(display, args: PipeMessage) -> StringableIterator:
     yield from _handle_error(args)
 
 
+@register_handler(SolverEvent.TIMING_BUDGET_IGNORED)
+def _timing_budget_ignored(_display, args: PipeMessage) -> StringableIterator:
+    details = Text("executor ignored the timing budget", TextColor.GREY)
+    yield StatusBox.build(
+        StatusSettings.WARNING, args, details=details, display=BoxDisplay.BLOCK
+    )
+    for violation in args["violations"]:
+        yield Box(Text(f"  {violation}", TextColor.GREY), display=BoxDisplay.BLOCK)
+
+
+@register_handler(SolverEvent.MEMORY_PROFILED)
+def _memory_profiled(_display, args: PipeMessage) -> StringableIterator:
+    yield MemoryProfile(args["profile"])
+
+
+@register_handler(SolverEvent.MEMORY_PROFILE_FAILED)
+def _memory_profile_failed(_display, args: PipeMessage) -> StringableIterator:
+    yield Box(ErrorText("Memory profiling failed"), display=BoxDisplay.BLOCK)
+    yield from _handle_error(args)
+
+
+@register_handler(SolverEvent.SOLUTION_SUMMARY)
+def _solution_summary(_display, args: PipeMessage) -> StringableIterator:
+    if args["passed"] == args["total"]:
+        settings = StatusSettings.ALL_SUCCEEDED
+    else:
+        settings = StatusSettings.SOME_FAILED
+    details = f"{args['passed']}/{args['total']} inputs passed"
+    if "totals" in args:
+        totals = ", ".join(
+            f"{part}: {TimingDuration(duration)}"
+            for part, duration in args["totals"].items()
+        )
+        details += f" (total {totals})"
+    yield StatusBox.build(settings, args, details=details, display=BoxDisplay.BLOCK)
+
+
+@register_handler(SolverEvent.PROFILES_RANKED)
+def _profiles_ranked(_display, args: PipeMessage) -> StringableIterator:
+    yield from _profile_ranking(args, "profile", "profiles")
+
+
+@register_handler(SolverEvent.RUNTIME_PROFILES_RANKED)
+def _runtime_profiles_ranked(_display, args: PipeMessage) -> StringableIterator:
+    yield from _profile_ranking(args, "runtime profile", "runtime_profiles")
+
+
+def _profile_ranking(
+    args: PipeMessage, kind: str, config_key: str
+) -> StringableIterator:
+    yield StatusBox.build(StatusSettings.RANKED, args, display=BoxDisplay.BLOCK)
+    table = [[Text(header) for header in ["", kind, *PARTS, "total"]]]
+    for rank, entry in enumerate(args["ranking"], 1):
+        name = entry["profile"]
+        if name == (args["pinned"] or DEFAULT_PROFILE):
+            name += " (pinned)" if args["pinned"] else " (current)"
+        if entry["total"] is None:
+            durations = [Text("-") for _ in range(len(PARTS) + 1)]
+        else:
+            durations = [
+                *[TimingDuration(entry["parts"][part]).text for part in PARTS],
+                TimingDuration(entry["total"]).text,
+            ]
+        table.append([Text(str(rank)), Text(name), *durations])
+    yield Table(table)
+    fastest = args["ranking"][0]
+    if fastest["total"] is not None and fastest["profile"] != args["pinned"]:
+        pin = json.dumps({config_key: {args["language"]: fastest["profile"]}})
+        message = f"Pin the fastest {kind} with {pin} in {CONFIG_FILE}"
+        yield Box(Text(message, TextColor.GREY), display=BoxDisplay.BLOCK)
+
+
+@register_handler(SolverEvent.VARIANTS_RANKED)
+def _variants_ranked(_display, args: PipeMessage) -> StringableIterator:
+    yield StatusBox.build(StatusSettings.RANKED, args, display=BoxDisplay.BLOCK)
+    table = [[Text(header) for header in ["", "variant", *PARTS, "total"]]]
+    main_total = None
+    for rank, entry in enumerate(args["ranking"], 1):
+        name = entry["variant"] or "main"
+        if entry["variant"] is None:
+            main_total = entry["total"]
+        if not entry["passed"]:
+            name += " (failed)"
+        if entry["total"] is None:
+            durations = [Text("-") for _ in range(len(PARTS) + 1)]
+        else:
+            durations = [
+                *[TimingDuration(entry["parts"][part]).text for part in PARTS],
+                TimingDuration(entry["total"]).text,
+            ]
+        table.append([Text(str(rank)), Text(name), *durations])
+    yield Table(table)
+    fastest = args["ranking"][0]
+    if fastest["total"] is not None and fastest["variant"] and main_total:
+        speedup = main_total / fastest["total"]
+        message = f"{fastest['variant']} is {speedup:.2f}x as fast as main"
+        yield Box(Text(message, TextColor.GREY), display=BoxDisplay.BLOCK)
+
+
+@register_handler(SolverEvent.PGO_COMPARED)
+def _pgo_compared(_display, args: PipeMessage) -> StringableIterator:
+    before, after = args["before"], args["after"]
+    if not before or not after:
+        details = Text("not compared, both builds must be timed", TextColor.GREY)
+        yield StatusBox.build(
+            StatusSettings.PGO, args, details=details, display=BoxDisplay.BLOCK
+        )
+        return
+    changes = []
+    for part in PARTS:
+        change = Text("-")
+        if before[part]:
+            percent = (after[part] - before[part]) / before[part] * 100
+            color = None
+            if percent:
+                color = TextColor.GREEN if percent < 0 else TextColor.RED
+            change = Text(f"{percent:+.1f}%", color)
+        changes.append(
+            f"{part}: {TimingDuration(before[part])} -> "
+            f"{TimingDuration(after[part])} ({change})"
+        )
+    details = ", ".join(changes)
+    yield StatusBox.build(
+        StatusSettings.PGO, args, details=details, display=BoxDisplay.BLOCK
+    )
+
+
+def _budget_bar(share: float) -> str:
+    eighths = round(min(share, 1) * BUDGET_BAR_WIDTH * 8)
+    bar = "█" * (eighths // 8) + BAR_CHARS[eighths % 8]
+    return bar + "▶" if share > 1 else bar
+
+
+def _dominant_days(days: List[PipeMessage]) -> List[int]:
+    """
+    :return: the slowest days that together take up `DOMINANT_SHARE` of the total
+    """
+    timed = sorted(
+        (d for d in days if d["total"] is not None), key=lambda d: -d["total"]
+    )
+    year_total = sum(d["total"] for d in timed)
+    dominant = []
+    running_total = 0
+    for day in timed:
+        if running_total >= year_total * DOMINANT_SHARE:
+            break
+        dominant.append(day["day"])
+        running_total += day["total"]
+    return dominant
+
+
+@register_handler(SolverEvent.YEAR_REPORT)
+def _year_report(_display, args: PipeMessage) -> StringableIterator:
+    days = args["days"]
+    year_total = sum(d["total"] for d in days if d["total"] is not None)
+    color = TextColor.GREEN if year_total <= YEAR_BUDGET else TextColor.RED
+    total, total_unit, _ = TimingDuration(year_total)._formatted()
+    budget, budget_unit, _ = TimingDuration(YEAR_BUDGET)._formatted()
+    summary = (
+        f"YEAR {args['year']}: {total} {total_unit} of the {budget} {budget_unit} "
+        f"budget ({year_total / YEAR_BUDGET * 100:.1f}%)"
+    )
+    untimed = sum(1 for d in days if d["total"] is None)
+    if untimed:
+        summary += f", {untimed} days without a passing timed solution"
+    yield Box(Text(summary, color), display=BoxDisplay.BLOCK)
+
+    dominant = _dominant_days(days)
+    table = [[Text(header) for header in ["day", "language", "time", "budget", ""]]]
+    for day in days:
+        if day["total"] is None:
+            table.append([Text(str(day["day"]))] + [Text("-") for _ in range(3)])
+            table[-1].append(Text(""))
+            continue
+        share = day["total"] / YEAR_BUDGET
+        bar_color = TextColor.RED if day["day"] in dominant else TextColor.CYAN
+        language = day["language"]
+        if day.get("variant"):
+            language += f" ({day['variant']})"
+        table.append(
+            [
+                Text(str(day["day"])),
+                Text(language),
+                TimingDuration(day["total"]).text,
+                Text(f"{share * 100:.1f}%"),
+                Text(_budget_bar(share), bar_color),
+            ]
+        )
+    yield Table(table)
+    if dominant and len(dominant) < len(days):
+        listed = ", ".join(str(day) for day in sorted(dominant))
+        subject = f"Days {listed} take" if len(dominant) > 1 else f"Day {listed} takes"
+        share = sum(d["total"] for d in days if d["day"] in dominant) / year_total
+        message = f"{subject} {share:.1%} of the total time"
+        yield Box(Text(message, TextColor.GREY), display=BoxDisplay.BLOCK)
+
+
 @register_handler(SolverEvent.TERMINATE)
 def _terminate(_display, args: PipeMessage) -> StringableIterator:
     if "error" in args:
@@ -0,0 +1,59 @@
+import pytest
+
+from aoc_solver.lang.registry import LanguageRegistry, LanguageSettings
+from aoc_solver.solver_engine import BatchBuild
+
+
+class FakeSettings(LanguageSettings):
+    COMMANDS = []
+
+    @classmethod
+    def batch_compile(cls, batch):
+        yield from cls.COMMANDS
+
+    @classmethod
+    def batch_failures(cls, batch, output):
+        failures = {
+            settings.file: f"{settings.file}: error\n"
+            for settings in batch
+            if f"{settings.file}: error" in output
+        }
+        return failures or None
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    monkeypatch.setitem(LanguageRegistry._languages, "fake", ("fk", FakeSettings, True))
+
+    def run(*commands):
+        monkeypatch.setattr(FakeSettings, "COMMANDS", list(commands))
+        batch = BatchBuild("fake", ["a.fk", "b.fk"])
+        batch(lambda: False)
+        batch.wait()
+        return batch
+
+    return run
+
+
+def test_built(batch):
+    result = batch("true")
+    assert result.built("a.fk") and result.built("b.fk")
+    assert result.failure("a.fk") is None
+
+
+def test_failures_attributed_to_files(batch):
+    result = batch("sh -c 'echo b.fk: error; exit 1'")
+    assert result.built("a.fk")
+    assert not result.built("b.fk")
+    assert result.failure("b.fk") == "b.fk: error\n"
+
+
+def test_unattributed_failure(batch):
+    result = batch("sh -c 'echo oops >&2; exit 1'")
+    assert not result.built("a.fk") and not result.built("b.fk")
+    assert result.failure("a.fk") is None
+
+
+def test_compiler_not_found(batch):
+    result = batch("no-such-compiler-aoc")
+    assert not result.built("a.fk") and not result.built("b.fk")
@@ -0,0 +1,51 @@
+import pytest
+
+from aoc_solver import calibration
+from aoc_solver.calibration import (
+    CalibrationCache,
+    CalibrationError,
+    StartupBaseline,
+    reference_solutions,
+    toolchain_fingerprint,
+)
+from aoc_solver.lang.registry import LanguageRegistry
+
+
+def baseline(toolchain):
+    return StartupBaseline("python", toolchain, 40000.0, 5, "2000-01-01T00:00:00")
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "calibration.json")
+    _, settings, _ = LanguageRegistry.get("python")
+    cache = CalibrationCache(path)
+    cache.set(baseline(toolchain_fingerprint(settings)))
+    cache.save()
+    assert CalibrationCache(path).get("python").startup == 40000.0
+    assert CalibrationCache(path).get("ruby") is None
+
+
+def test_outdated_toolchain(tmp_path):
+    path = str(tmp_path / "calibration.json")
+    cache = CalibrationCache(path)
+    cache.set(baseline("python@missing"))
+    cache.save()
+    assert CalibrationCache(path).get("python") is None
+
+
+def test_corrupt_file(tmp_path):
+    path = tmp_path / "calibration.json"
+    path.write_text("{not json")
+    assert CalibrationCache(str(path)).get("python") is None
+
+
+def test_reference_solutions(tmp_path, monkeypatch):
+    monkeypatch.setattr(calibration, "AOC_ROOT", str(tmp_path / "checkout"))
+    (tmp_path / "checkout" / "2000" / "01").mkdir(parents=True)
+    (tmp_path / "solutions" / "2000" / "01").mkdir(parents=True)
+    solutions = str(tmp_path / "solutions")
+    assert reference_solutions(solutions) == solutions
+    assert reference_solutions(str(tmp_path)) == str(tmp_path / "checkout")
+    monkeypatch.setattr(calibration, "AOC_ROOT", str(tmp_path))
+    with pytest.raises(CalibrationError, match="2000/01"):
+        reference_solutions(str(tmp_path))
@@ -0,0 +1,57 @@
+import io
+import json
+
+import pytest
+
+from aoc_solver import SOLUTIONS_ROOT
+from aoc_solver.daemon import SolverDaemon
+from aoc_solver.exe import ExitCode
+
+
+def solve(request):
+    responses = []
+    exit_code = SolverDaemon("unused.sock")._solve(request, responses.append)
+    return exit_code, responses
+
+
+def test_refuses_clients_in_another_directory(tmp_path):
+    exit_code, responses = solve(
+        {"argv": ["2000", "1"], "solutions_path": str(tmp_path), "cwd": str(tmp_path)}
+    )
+    assert exit_code == ExitCode.INVALID_ARGS
+    assert SOLUTIONS_ROOT in responses[0]["stdout"]
+
+
+def test_argument_errors():
+    exit_code, responses = solve(
+        {"argv": ["1999", "1"], "solutions_path": SOLUTIONS_ROOT, "cwd": SOLUTIONS_ROOT}
+    )
+    assert exit_code == ExitCode.INVALID_ARGS
+    assert SOLUTIONS_ROOT not in responses[0]["stdout"]
+
+
+@pytest.mark.parametrize(
+    "request_, field",
+    [
+        ({"argv": ["2000", "1"]}, "solutions_path"),
+        ({"argv": ["2000", "1"], "solutions_path": 1}, "solutions_path"),
+        ({"argv": "2000 1", "solutions_path": SOLUTIONS_ROOT}, "argv"),
+        ({"argv": [2000, 1], "solutions_path": SOLUTIONS_ROOT}, "argv"),
+        ({"solutions_path": SOLUTIONS_ROOT, "cwd": None}, "cwd"),
+    ],
+)
+def test_invalid_requests(request_, field):
+    exit_code, responses = solve(request_)
+    assert exit_code == ExitCode.INVALID_ARGS
+    assert len(responses) == 1
+    assert responses[0]["stderr"].startswith(f"Invalid request: `{field}` must be")
+
+
+def test_request_not_an_object():
+    wfile = io.BytesIO()
+    SolverDaemon("unused.sock").handle(io.BytesIO(b"[]\n"), wfile)
+    responses = [json.loads(line) for line in wfile.getvalue().splitlines()]
+    assert responses == [
+        {"stderr": "Invalid request\n"},
+        {"exit": ExitCode.INVALID_ARGS},
+    ]
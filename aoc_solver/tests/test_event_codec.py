@@ -0,0 +1,41 @@
+import json
+
+from datetime import timedelta
+
+from aoc_solver.event_codec import EventError, decode_event, encode_event
+from aoc_solver.output import OutputDiff
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.timing import PartTiming
+
+
+def round_trip(message):
+    return decode_event(json.loads(json.dumps(encode_event(message))))
+
+
+def test_plain_values():
+    message = {"event": SolverEvent.SOLVE_STARTED, "year": 2020, "pgo": True}
+    assert round_trip(message) == message
+
+
+def test_timedelta():
+    message = round_trip({"duration": timedelta(milliseconds=1500)})
+    assert message["duration"] == timedelta(seconds=1.5)
+
+
+def test_dataclasses():
+    info = {"part1": PartTiming(2, 10.0, samples=[4.0, 6.0])}
+    diff = OutputDiff([(1, "a", "b")], [], 1, 1, 1)
+    message = round_trip({"info": info, "diff": diff})
+    assert message["info"]["part1"] == info["part1"]
+    assert message["diff"].mismatched == 1
+    assert message["diff"].omitted == 0
+
+
+def test_errors_keep_their_message():
+    message = round_trip({"error": ValueError("boom")})
+    assert isinstance(message["error"], EventError)
+    assert str(message["error"]) == "boom"
+
+
+def test_unknown_objects_become_strings():
+    assert round_trip({"value": object})["value"] == str(object)
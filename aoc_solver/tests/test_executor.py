@@ -0,0 +1,83 @@
+import json
+
+from aoc_solver.executor import AocExecutor, freeze
+
+
+def timed(executor, capsys, *args):
+    executor(["main.py", "--time", *args])
+    return json.loads(capsys.readouterr().out)
+
+
+def test_freeze():
+    assert freeze([1, [2, [3]], "a"]) == (1, (2, (3,)), "a")
+    assert freeze({"a": [1]}) == {"a": [1]}
+
+
+def test_solve(capsys):
+    executor = AocExecutor(["Hello", "World!"], lambda i: i[0], lambda i: i[1])
+    executor(["main.py"])
+    assert capsys.readouterr().out == "Hello\nWorld!\n"
+
+
+def test_input_is_copied_by_default(capsys):
+    seen = []
+
+    def part(input):
+        seen.append(len(input))
+        input.pop()
+        return len(input)
+
+    executor = AocExecutor([1, 2, 3], part, part, min_iterations=5, budget_ms=0)
+    timing = timed(executor, capsys)
+    assert timing["part1"]["iterations"] == 5
+    assert set(seen) == {3}
+
+
+def test_frozen_input_is_shared(capsys):
+    seen = []
+
+    def part(input):
+        seen.append(input)
+        return input[0]
+
+    executor = AocExecutor(
+        [[1, 2], 3], part, part, frozen=True, min_iterations=3, budget_ms=0
+    )
+    timed(executor, capsys)
+    assert seen[0] == ((1, 2), 3)
+    assert all(input is seen[0] for input in seen)
+
+
+def test_runs_at_least_one_iteration(capsys):
+    executor = AocExecutor([1], len, len, min_iterations=0, budget_ms=0)
+    timing = timed(executor, capsys)
+    for part in ("part1", "part2"):
+        assert timing[part]["iterations"] == 1
+        assert timing[part]["first"] == timing[part]["samples"][0]
+
+
+def test_argv_overrides(capsys):
+    calls = []
+
+    def part(input):
+        calls.append(input)
+        return 0
+
+    executor = AocExecutor([1], part, part, budget_ms=1000)
+    timing = timed(
+        executor, capsys, "--time-budget-ms", "0", "--min-iterations", "2",
+        "--warmup", "3",
+    )
+    assert timing["part1"]["iterations"] == 2
+    assert len(calls) == 2 * (3 + 2)
+
+
+def test_solve_and_time_prints_first_results(capsys):
+    results = iter(range(100))
+    executor = AocExecutor(
+        [], lambda _: next(results), lambda _: "b", min_iterations=2, budget_ms=0
+    )
+    executor(["main.py", "--solve-and-time"])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:2] == ["0", "b"]
+    assert json.loads(lines[2])["version"] == 2
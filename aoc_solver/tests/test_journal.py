@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from aoc_solver.journal import Journal
+from aoc_solver.solver_engine import LanguageSolver
+from aoc_solver.solver_event import SolverEvent
+from aoc_solver.timing import PartTiming
+
+
+@pytest.fixture
+def solution(tmp_path):
+    path = tmp_path / "2000" / "01" / "main.py"
+    path.parent.mkdir(parents=True)
+    path.write_text("print('hi')\n")
+    return str(path)
+
+
+def solver(filename):
+    solver = LanguageSolver(0, None, "python", 2000, 1, filename)
+    solver.passed = True
+    solver.timing_info = {"part1": PartTiming(1, 5.0), "part2": PartTiming(1, 6.0)}
+    return solver
+
+
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+EVENTS = [{"event": SolverEvent.SOLVE_STARTED, "year": 2000, "day": 1}]
+
+
+def test_resume_replays_completed_jobs(tmp_path, solution):
+    journal = Journal(str(tmp_path), path=journal_path(tmp_path))
+    journal.record(solver(solution), EVENTS)
+    journal.close()
+
+    resumed = Journal(str(tmp_path), resume=True, path=journal_path(tmp_path))
+    record = resumed.completed(solver(solution))
+    assert record["passed"] is True
+    assert record["timing_info"]["part2"].duration == 6.0
+    assert record["events"] == EVENTS
+
+
+def test_without_resume_the_journal_starts_over(tmp_path, solution):
+    journal = Journal(str(tmp_path), path=journal_path(tmp_path))
+    journal.record(solver(solution), EVENTS)
+    journal.close()
+
+    journal = Journal(str(tmp_path), path=journal_path(tmp_path))
+    assert journal.completed(solver(solution)) is None
+    journal.record(solver(solution), [])
+    journal.close()
+    with open(journal_path(tmp_path)) as f:
+        assert len(f.readlines()) == 1
+
+
+def test_changed_sources_run_again(tmp_path, solution):
+    journal = Journal(str(tmp_path), path=journal_path(tmp_path))
+    journal.record(solver(solution), EVENTS)
+    journal.close()
+    stat = os.stat(solution)
+    os.utime(solution, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+    resumed = Journal(str(tmp_path), resume=True, path=journal_path(tmp_path))
+    assert resumed.completed(solver(solution)) is None
+
+
+def test_job_cut_off_mid_write(tmp_path, solution):
+    journal = Journal(str(tmp_path), path=journal_path(tmp_path))
+    journal.record(solver(solution), EVENTS)
+    journal.close()
+    with open(journal_path(tmp_path), "a") as f:
+        f.write('{"key": "[2000, 1, ')
+
+    resumed = Journal(str(tmp_path), resume=True, path=journal_path(tmp_path))
+    assert resumed.completed(solver(solution))["events"] == EVENTS
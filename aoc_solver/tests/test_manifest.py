@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from aoc_solver.manifest import SolutionManifest, is_single, parse_selector
+
+
+@pytest.mark.parametrize(
+    "selector,selected",
+    [
+        (None, None),
+        ("all", None),
+        ("2020", range(2020, 2021)),
+        ("1-10", range(1, 11)),
+        ("5-5", range(5, 6)),
+    ],
+)
+def test_parse_selector(selector, selected):
+    assert parse_selector(selector) == selected
+
+
+@pytest.mark.parametrize("selector", ["", "1-", "-3", "one", "1-2-3", "10-1"])
+def test_parse_invalid_selector(selector):
+    with pytest.raises(ValueError):
+        parse_selector(selector)
+
+
+def test_is_single():
+    assert is_single("2020")
+    assert not is_single("1-10")
+    assert not is_single("all")
+    assert not is_single(None)
+
+
+@pytest.fixture
+def solutions(tmp_path):
+    for day in ["2020/01", "2020/02", "2021/01"]:
+        os.makedirs(tmp_path / "solutions" / day)
+    (tmp_path / "solutions" / "2020" / "01" / "main.py").write_text("")
+    (tmp_path / "solutions" / "node_modules").mkdir()
+    return str(tmp_path / "solutions"), str(tmp_path / "manifest.json")
+
+
+def test_lists_years_days_and_files(solutions):
+    manifest = SolutionManifest(*solutions)
+    assert manifest.years() == [2020, 2021]
+    assert manifest.days(2020) == [1, 2]
+    assert manifest.days(2019) == []
+    assert manifest.files(2020, 1) == {"main.py"}
+    assert manifest.files(2020, 3) is None
+
+
+def test_listings_are_kept_until_directory_changes(solutions, monkeypatch):
+    solutions_path, path = solutions
+    manifest = SolutionManifest(solutions_path, path)
+    manifest.days(2020)
+    manifest.save()
+    assert os.path.isfile(path)
+
+    listed = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(
+        os, "listdir", lambda p: listed.append(p) or real_listdir(p)
+    )
+    manifest = SolutionManifest(solutions_path, path)
+    assert manifest.days(2020) == [1, 2]
+    assert listed == []
+
+    os.makedirs(os.path.join(solutions_path, "2020", "03"))
+    assert manifest.days(2020) == [1, 2, 3]
+    assert listed == [os.path.join(solutions_path, "2020")]
+
+
+def test_corrupt_manifest(solutions):
+    solutions_path, path = solutions
+    with open(path, "w") as f:
+        f.write("[1, 2")
+    assert SolutionManifest(solutions_path, path).years() == [2020, 2021]
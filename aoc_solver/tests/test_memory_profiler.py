@@ -0,0 +1,26 @@
+import tracemalloc
+
+import pytest
+
+from aoc_solver.memory_profiler import _profile_part
+
+
+def _allocate(size):
+    return lambda: len(bytearray(size))
+
+
+@pytest.mark.parametrize("reset_peak", [True, False])
+def test_part2_peak_excludes_part1(monkeypatch, reset_peak):
+    if not reset_peak:
+        monkeypatch.delattr(tracemalloc, "reset_peak", raising=False)
+    report = {}
+    part1 = _profile_part(_allocate(10_000_000), "part1", report, 5)
+    part2 = _profile_part(_allocate(1_000), "part2", report, 5)
+    tracemalloc.start()
+    try:
+        part1()
+        part2()
+    finally:
+        tracemalloc.stop()
+    assert report["part1"]["peak"] >= 10_000_000
+    assert report["part2"]["peak"] < 1_000_000
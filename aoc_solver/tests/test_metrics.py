@@ -0,0 +1,65 @@
+from aoc_solver.metrics import RunMetrics, _Family, _labels, _number
+from aoc_solver.timing import PartTiming
+
+LABELS = (("year", "2000"), ("day", "1"))
+
+
+def histogram(timing):
+    family = _Family("t", "histogram", "seconds", "Iteration times")
+    RunMetrics._add_histogram(family, LABELS, timing)
+    return {
+        (suffix, dict(labels).get("le")): value
+        for suffix, labels, value in family.samples
+    }
+
+
+def test_histogram_from_samples():
+    samples = histogram(PartTiming(4, 62.0, samples=[2.0, 50.0, 5.0, 5.0]))
+    assert samples[("_bucket", "1e-06")] == 0
+    assert samples[("_bucket", "1e-05")] == 3
+    assert samples[("_bucket", "0.0001")] == 4
+    assert samples[("_bucket", "+Inf")] == 4
+    assert samples[("_count", None)] == 4
+    assert samples[("_sum", None)] == 62e-6
+
+
+def test_histogram_from_capped_samples():
+    samples = histogram(PartTiming(1000, 8000.0, samples=[2.0, 5.0, 5.0, 20.0]))
+    assert samples[("_bucket", "1e-05")] == 750
+    assert samples[("_bucket", "0.0001")] == 1000
+    assert samples[("_count", None)] == 1000
+    assert samples[("_sum", None)] == 8000e-6
+
+
+def test_histogram_from_executor_histogram():
+    timing = PartTiming(1000, 7250.0, histogram=[(5, 400), (10, 590), (100, 10)])
+    samples = histogram(timing)
+    assert samples[("_bucket", "1e-05")] == 990
+    assert samples[("_bucket", "0.0001")] == 1000
+    assert samples[("_count", None)] == 1000
+    assert samples[("_sum", None)] == 7250e-6
+
+
+def test_no_histogram_without_iteration_times():
+    assert histogram(PartTiming(10, 100.0)) == {}
+
+
+def test_family_lines():
+    family = _Family("aoc_solver_jobs", "gauge", "", "Jobs")
+    assert family.lines() == []
+    family.add((("result", 'said "hi"\n'),), 2.0)
+    family.add((), 0.5, "_total")
+    assert family.lines() == [
+        "# TYPE aoc_solver_jobs gauge",
+        "# HELP aoc_solver_jobs Jobs",
+        'aoc_solver_jobs{result="said \\"hi\\"\\n"} 2',
+        "aoc_solver_jobs_total 0.5",
+    ]
+
+
+def test_formatting():
+    assert _labels(()) == ""
+    assert _labels(LABELS) == '{year="2000",day="1"}'
+    assert _number(3) == "3"
+    assert _number(3.0) == "3"
+    assert _number(0.25) == "0.25"
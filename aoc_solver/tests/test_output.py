@@ -0,0 +1,119 @@
+import pytest
+
+from aoc_solver import output
+from aoc_solver.output import (
+    MAX_LINE_WIDTH,
+    NEWLINE_MARK,
+    CapturedOutput,
+    compare_output,
+    split_last_line,
+)
+
+
+def captured(text, spill_threshold=output.SPILL_THRESHOLD):
+    result = CapturedOutput(spill_threshold)
+    result.write(text)
+    return result
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(output, "CHUNK_SIZE", 7)
+
+
+@pytest.fixture
+def expected_file(tmp_path):
+    def write(text):
+        path = tmp_path / "output.txt"
+        path.write_text(text)
+        return str(path)
+
+    return write
+
+
+def test_spills_to_disk():
+    result = captured("a" * 100, spill_threshold=10)
+    assert result.size == 100
+    assert result.read() == "a" * 100
+    assert result.read(5) == "aaaaa"
+
+
+def test_head():
+    result = captured("".join(f"{i}\n" for i in range(10)))
+    assert result.head(3) == ("0\n1\n2", 7)
+
+
+def test_lines_truncated_to_width():
+    long = "x" * (MAX_LINE_WIDTH + 10)
+    exact = "y" * MAX_LINE_WIDTH
+    lines = list(captured(f"{long}\n{exact}\nz").lines())
+    assert lines == ["x" * (MAX_LINE_WIDTH - 1) + "…", exact, "z"]
+
+
+def test_matching_output(expected_file):
+    text = "1234\n" * output.CHUNK_SIZE
+    assert compare_output(captured(text), expected_file(text)) is None
+
+
+def test_mismatch_in_last_chunk(expected_file):
+    text = "1234\n" * output.CHUNK_SIZE
+    diff = compare_output(captured(text + "5\n"), expected_file(text + "6\n"))
+    assert diff.rows == [(output.CHUNK_SIZE + 1, "6", "5")]
+
+
+def test_mismatched_lines(expected_file, small_chunks):
+    diff = compare_output(captured("1\n2\n3\n4\n"), expected_file("1\n5\n3\n"))
+    assert diff.rows == [(2, "5", "2"), (4, None, "4")]
+    assert diff.mismatched == 2
+    assert (diff.expected_lines, diff.actual_lines) == (3, 4)
+    assert diff.truncated == []
+
+
+def test_lines_compared_in_full(expected_file, small_chunks):
+    prefix = "a" * (MAX_LINE_WIDTH * 2)
+    diff = compare_output(
+        captured(f"same\n{prefix}b\n"), expected_file(f"same\n{prefix}c\n")
+    )
+    shown = "a" * (MAX_LINE_WIDTH - 1) + "…"
+    assert diff.rows == [(2, shown, shown)]
+    assert diff.truncated == [2]
+
+
+def test_split_last_line(small_chunks):
+    head, last = split_last_line(captured('1\n2\n{"version": 2}\n'))
+    assert head.read() == "1\n2\n"
+    assert last == '{"version": 2}'
+    head, last = split_last_line(captured("only"))
+    assert (head.read(), last) == ("", "only")
+
+
+def test_split_overlong_last_line(monkeypatch, small_chunks):
+    monkeypatch.setattr(output, "MAX_LAST_LINE", 10)
+    head, last = split_last_line(captured("1\n" + "x" * 30 + "\n"))
+    assert last == ""
+    assert head.read().startswith("1\nxxx")
+    head, last = split_last_line(captured("x" * 30 + "\nshort\n"))
+    assert last == "short"
+    assert head.read() == "x" * 30 + "\n"
+
+
+def test_missing_trailing_newline(expected_file):
+    diff = compare_output(captured("1\n2"), expected_file("1\n2\n"))
+    assert diff.rows == [(2, "2" + NEWLINE_MARK, "2")]
+    assert diff.mismatched == 1
+
+
+def test_extra_trailing_newline(expected_file):
+    diff = compare_output(captured("1\n2\n"), expected_file("1\n2"))
+    assert diff.rows == [(2, "2", "2" + NEWLINE_MARK)]
+
+
+def test_extra_blank_line(expected_file):
+    diff = compare_output(captured("1\n2\n\n"), expected_file("1\n2\n"))
+    assert diff.rows == [(3, None, "")]
+    assert (diff.expected_lines, diff.actual_lines) == (2, 3)
+
+
+def test_missing_blank_line(expected_file):
+    diff = compare_output(captured("1\n"), expected_file("1\n\n"))
+    assert diff.rows == [(2, "", None)]
@@ -0,0 +1,105 @@
+import subprocess
+
+import pytest
+
+from aoc_solver.perf_bisect import (
+    BisectError,
+    Measurement,
+    PerformanceBisector,
+    parse_threshold,
+)
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", *args], cwd=repo, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "--quiet")
+    git(tmp_path, "config", "user.name", "test")
+    git(tmp_path, "config", "user.email", "test@example.com")
+    (tmp_path / "2000" / "01").mkdir(parents=True)
+    revisions = []
+    for i in range(8):
+        (tmp_path / "2000" / "01" / "main.py").write_text(f"# {i}\n")
+        git(tmp_path, "add", ".")
+        git(tmp_path, "commit", "--quiet", "-m", str(i))
+        revisions.append(git(tmp_path, "rev-parse", "HEAD"))
+    return tmp_path, revisions
+
+
+def bisect(monkeypatch, repo, timings):
+    """
+    :param timings: part 1 timing per revision index, `None` if untimeable
+    """
+    path, revisions = repo
+
+    def time_solution(_self, revision):
+        timing = timings[revisions.index(revision)]
+        if timing is None:
+            return Measurement(revision, None, "build failed")
+        return Measurement(revision, {"part1": timing})
+
+    monkeypatch.setattr(PerformanceBisector, "_time_solution", time_solution)
+    bisector = PerformanceBisector(
+        str(path), 2000, 1, "python", 1.5, revisions[0], revisions[-1]
+    )
+    return bisector(), revisions
+
+
+def test_finds_first_slow_commit(monkeypatch, repo):
+    result, revisions = bisect(monkeypatch, repo, [10, 10, 10, 10, 20, 20, 20, 20])
+    assert result.first_slow.revision == revisions[4]
+    assert result.untestable == []
+
+
+def test_no_regression(monkeypatch, repo):
+    result, _ = bisect(monkeypatch, repo, [10, 11, 10, 12, 10, 11, 10, 12])
+    assert result.first_slow is None
+
+
+def test_reports_untimeable_commits_next_to_culprit(monkeypatch, repo):
+    timings = [10, 10, 10, None, None, 20, 20, 20]
+    result, revisions = bisect(monkeypatch, repo, timings)
+    assert result.first_slow.revision == revisions[5]
+    assert [m.revision for m in result.untestable] == revisions[3:5]
+
+
+def test_skips_untimeable_commits_away_from_culprit(monkeypatch, repo):
+    timings = [10, None, None, 10, 10, 10, 20, 20]
+    result, revisions = bisect(monkeypatch, repo, timings)
+    assert result.first_slow.revision == revisions[6]
+    assert result.untestable == []
+
+
+def test_untimeable_bad_revision(monkeypatch, repo):
+    with pytest.raises(BisectError, match="bad revision"):
+        bisect(monkeypatch, repo, [10, 20, 20, 20, 20, 20, 20, None])
+
+
+def test_untimeable_good_revision(monkeypatch, repo):
+    with pytest.raises(BisectError, match="known-good revision"):
+        bisect(monkeypatch, repo, [None, 20, 20, 20, 20, 20, 20, 20])
+
+
+def test_ratio_ignores_parts_too_fast_for_baseline():
+    baseline = Measurement("a", {"part1": 0.0, "part2": 4.0})
+    assert Measurement("b", {"part1": 3.0, "part2": 6.0}).ratio(baseline) == 1.5
+    baseline = Measurement("a", {"part1": 0.0, "part2": 0.0})
+    assert Measurement("b", {"part1": 3.0, "part2": 6.0}).ratio(baseline) == 1.0
+
+
+@pytest.mark.parametrize(
+    "threshold,ratio", [("1.2x", 1.2), ("1.5", 1.5), ("20%", 1.2)]
+)
+def test_parse_threshold(threshold, ratio):
+    assert parse_threshold(threshold) == pytest.approx(ratio)
+
+
+@pytest.mark.parametrize("threshold", ["fast", "1x", "-5%"])
+def test_parse_invalid_threshold(threshold):
+    with pytest.raises(BisectError):
+        parse_threshold(threshold)
@@ -0,0 +1,38 @@
+import os
+
+from aoc_solver import scratch
+from aoc_solver.scratch import ScratchBuild
+
+
+def test_promotes_files_to_artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(scratch, "TMPFS_DIRS", [str(tmp_path / "tmpfs")])
+    os.makedirs(tmp_path / "tmpfs")
+    artifact_dir = str(tmp_path / "artifacts")
+    build = ScratchBuild(artifact_dir, "main_c")
+    with build as path:
+        assert path.startswith(str(tmp_path / "tmpfs"))
+        with open(os.path.join(path, "main_c"), "w") as f:
+            f.write("binary")
+        os.makedirs(os.path.join(path, "objects"))
+        build.promote()
+    assert os.listdir(artifact_dir) == ["main_c"]
+    assert not os.path.exists(build.path)
+
+
+def test_path_is_deterministic(tmp_path):
+    first = ScratchBuild(str(tmp_path / "a"), "main_c").path
+    assert ScratchBuild(str(tmp_path / "a"), "main_c").path == first
+    assert ScratchBuild(str(tmp_path / "b"), "main_c").path != first
+
+
+def test_failed_build_keeps_previous_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(scratch, "TMPFS_DIRS", [str(tmp_path)])
+    artifact_dir = str(tmp_path / "artifacts")
+    os.makedirs(artifact_dir)
+    with open(os.path.join(artifact_dir, "main_c"), "w") as f:
+        f.write("good")
+    with ScratchBuild(artifact_dir, "main_c") as path:
+        with open(os.path.join(path, "main_c"), "w") as f:
+            f.write("partial")
+    with open(os.path.join(artifact_dir, "main_c")) as f:
+        assert f.read() == "good"
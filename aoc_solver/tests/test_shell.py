@@ -0,0 +1,41 @@
+import subprocess
+
+import pytest
+
+from aoc_solver.shell import ProcessUsage, ShellException, _reap, shell_out
+
+
+def reap(cmd):
+    process = subprocess.Popen(cmd)
+    usage = ProcessUsage()
+    exitcode = _reap(process, usage)
+    while exitcode is None:
+        exitcode = _reap(process, usage)
+    return exitcode, usage
+
+
+def test_exit_status():
+    assert reap(["sh", "-c", "exit 0"])[0] == 0
+    assert reap(["sh", "-c", "exit 3"])[0] == 3
+
+
+def test_killed_by_signal():
+    assert reap(["sh", "-c", "kill -9 $$"])[0] == -9
+
+
+def test_usage():
+    _, usage = reap(["sh", "-c", "exit 0"])
+    assert usage.max_rss > 0
+
+
+def test_shell_out():
+    usage = ProcessUsage()
+    assert shell_out("echo hello", lambda: False, usage) == "hello\n"
+    assert usage.max_rss > 0
+
+
+def test_shell_out_failure():
+    with pytest.raises(ShellException) as e:
+        shell_out("sh -c 'echo oops >&2; exit 2'", lambda: False, ProcessUsage())
+    assert e.value.exitcode == 2
+    assert e.value.stderr == "oops\n"
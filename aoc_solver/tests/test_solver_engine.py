@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+from aoc_solver import scratch
+from aoc_solver.lang import registry
+from aoc_solver.lang.registry import LanguageSettings
+from aoc_solver.solver_engine import EventRecorder, LanguageSolver
+from aoc_solver.solver_event import SolverEvent
+
+
+class SharedOutputSettings(LanguageSettings):
+    # Fails if another build is writing the shared output at the same time
+    SHARED_OUTPUT = None
+
+    def compile(self):
+        yield f"mkdir {self.SHARED_OUTPUT}"
+        yield "sleep 0.2"
+        yield f"rmdir {self.SHARED_OUTPUT}"
+
+
+@pytest.fixture
+def build_concurrently(tmp_path, monkeypatch):
+    monkeypatch.setattr(scratch, "TMPFS_DIRS", [str(tmp_path / "scratch")])
+    monkeypatch.setattr(registry, "BUILD_DIR", str(tmp_path / "builds"))
+    monkeypatch.setattr(SharedOutputSettings, "SHARED_OUTPUT", tmp_path / "lib")
+    os.makedirs(tmp_path / "scratch")
+
+    def run():
+        solvers = []
+        for day in (1, 2):
+            filename = str(tmp_path / f"{day:02}" / "main.fk")
+            conn = EventRecorder()
+            solver = LanguageSolver(os.getpid(), conn, "fake", 2000, day, filename)
+            solver._settings = SharedOutputSettings(filename)
+            solvers.append(solver)
+
+        def build(solver):
+            try:
+                solver._build()
+            except Exception:
+                pass
+
+        threads = [threading.Thread(target=build, args=(s,)) for s in solvers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return [solver.conn.find(SolverEvent.BUILD_FAILED) for solver in solvers]
+
+    return run
+
+
+def test_builds_sharing_outputs_run_one_at_a_time(build_concurrently, monkeypatch):
+    monkeypatch.setattr(SharedOutputSettings, "BUILD_LOCK", threading.Lock())
+    assert build_concurrently() == [None, None]
+
+
+def test_builds_without_lock_run_concurrently(build_concurrently):
+    assert any(build_concurrently())
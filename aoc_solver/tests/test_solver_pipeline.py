@@ -0,0 +1,96 @@
+import threading
+import time
+
+from types import SimpleNamespace
+
+from aoc_solver.solver_pipeline import ExclusiveGate, SolverPipeline
+
+
+def test_shared_stages_run_concurrently():
+    gate = ExclusiveGate()
+    with gate.shared():
+        entered = threading.Event()
+
+        def other():
+            with gate.shared():
+                entered.set()
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        assert entered.wait(1)
+        thread.join()
+
+
+def test_exclusive_stage_waits_for_shared_stages():
+    gate = ExclusiveGate()
+    events = []
+    release = threading.Event()
+
+    def shared():
+        with gate.shared():
+            events.append("shared")
+            release.wait(1)
+        events.append("shared done")
+
+    def exclusive():
+        with gate.exclusive():
+            events.append("exclusive")
+
+    first = threading.Thread(target=shared)
+    first.start()
+    while not events:
+        time.sleep(0.001)
+    second = threading.Thread(target=exclusive)
+    second.start()
+    time.sleep(0.05)
+    assert events == ["shared"]
+    release.set()
+    first.join()
+    second.join()
+    assert events == ["shared", "shared done", "exclusive"]
+
+
+def test_waiting_exclusive_stage_blocks_new_shared_stages():
+    gate = ExclusiveGate()
+    events = []
+    release = threading.Event()
+
+    def hold():
+        with gate.shared():
+            release.wait(1)
+
+    def run(name, stage):
+        with stage():
+            events.append(name)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.02)
+    exclusive = threading.Thread(target=run, args=("exclusive", gate.exclusive))
+    exclusive.start()
+    time.sleep(0.02)
+    shared = threading.Thread(target=run, args=("shared", gate.shared))
+    shared.start()
+    time.sleep(0.02)
+    assert events == []
+    release.set()
+    for thread in (holder, exclusive, shared):
+        thread.join()
+    assert events == ["exclusive", "shared"]
+
+
+def solver(filename, profile=None):
+    return SimpleNamespace(year=2000, day=1, filename=filename, profile=profile)
+
+
+def test_group_is_reported_by_its_last_step():
+    steps = [
+        (None, solver("main.py", "a"), None),
+        (None, solver("main.py", "b"), None),
+        (None, solver("main_fast.py"), None),
+        (None, None, None),
+    ]
+    key = SolverPipeline._solution_key
+    assert SolverPipeline._group(steps, 0, key) == []
+    assert SolverPipeline._group(steps, 1, key) == [steps[0][1], steps[1][1]]
+    assert SolverPipeline._group(steps, 2, key) == [steps[2][1]]
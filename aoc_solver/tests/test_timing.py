@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from aoc_solver.timing import (
+    MAX_PART_DURATION,
+    PartTiming,
+    TimingBudget,
+    TimingProtocolError,
+    parse_timing_info,
+)
+
+
+def parse(part1, part2=None, version=2):
+    raw = {"part1": part1, "part2": part2 or {"iterations": 1, "duration": 1}}
+    if version:
+        raw["version"] = version
+    return parse_timing_info(json.dumps(raw))
+
+
+def test_version_1():
+    info = parse({"iterations": 4, "duration": 10, "samples": "ignored"}, version=None)
+    assert info["part1"] == PartTiming(4, 10)
+    assert info["part1"].average == 2.5
+
+
+def test_samples():
+    timing = parse({"iterations": 4, "duration": 20, "samples": [8, 4, 2, 6]})["part1"]
+    assert timing.cold == 8
+    assert timing.slowest == 8
+    assert timing.percentile(50) == 4
+    assert timing.percentile(99) == 8
+
+
+def test_histogram():
+    timing = parse(
+        {
+            "iterations": 1000,
+            "duration": 7250,
+            "first": 95,
+            "histogram": [[5, 400], [10, 590], [100, 10]],
+        }
+    )["part1"]
+    assert timing.cold == 95
+    assert timing.slowest == 100
+    assert timing.percentile(50) == 10
+    assert timing.percentile(99.5) == 100
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        "not json",
+        "[]",
+        json.dumps({"version": 3, "part1": {}, "part2": {}}),
+        json.dumps({"version": 2, "part1": {"iterations": 1, "duration": 1}}),
+    ],
+)
+def test_invalid_output(output):
+    with pytest.raises(TimingProtocolError):
+        parse_timing_info(output)
+
+
+@pytest.mark.parametrize(
+    "part",
+    [
+        {"iterations": 0, "duration": 1},
+        {"iterations": 1, "duration": -1},
+        {"iterations": 1, "duration": True},
+        {"iterations": 1, "duration": 1, "samples": []},
+        {"iterations": 1, "duration": 1, "samples": [1, 2]},
+        {"iterations": 2, "duration": 1, "histogram": [[5, 1], [1, 1]]},
+        {"iterations": 3, "duration": 1, "histogram": [[1, 1], [5, 1]]},
+        {"iterations": 1, "duration": 1, "histogram": [[1, "1"]]},
+    ],
+)
+def test_invalid_part(part):
+    with pytest.raises(TimingProtocolError):
+        parse(part)
+
+
+def info(iterations, duration_ms):
+    timing = PartTiming(iterations, duration_ms * 1000)
+    return {"part1": timing, "part2": timing}
+
+
+def test_budget_args():
+    assert TimingBudget().args == ""
+    budget = TimingBudget(budget_ms=250, min_iterations=10, warmup=2)
+    assert budget.args == " --time-budget-ms 250 --min-iterations 10 --warmup 2"
+
+
+def test_budget_respected():
+    budget = TimingBudget(budget_ms=100, min_iterations=10)
+    assert budget.violations(info(1000, 100.5)) == []
+    # The minimum took longer than the budget
+    assert budget.violations(info(10, 900)) == []
+
+
+def test_too_few_iterations():
+    violations = TimingBudget(min_iterations=10).violations(info(5, 1))
+    assert violations == [
+        "part1 ran 5 of at least 10 iterations",
+        "part2 ran 5 of at least 10 iterations",
+    ]
+
+
+def test_budget_cut_short():
+    violations = TimingBudget(budget_ms=100).violations(info(1000, 20))
+    assert violations[0] == "part1 was timed for 20 ms of its 100 ms budget"
+
+
+def test_budget_overrun():
+    violations = TimingBudget(budget_ms=100, min_iterations=10).violations(
+        info(1000, 400)
+    )
+    assert violations[0] == "part1 was timed for 400 ms, past its 100 ms budget"
+
+
+def test_capped_parts_are_not_violations():
+    capped = MAX_PART_DURATION / 1000
+    budget = TimingBudget(budget_ms=60000, min_iterations=10)
+    assert budget.violations(info(3, capped)) == []
@@ -0,0 +1,217 @@
+import json
+import math
+
+from dataclasses import dataclass
+from json.decoder import JSONDecodeError
+from typing import Dict, List, Optional, Tuple
+
+# Latest version of the timing protocol, see aoc_solver/lang/README.md#timing.
+# Output without a "version" key is treated as version 1.
+PROTOCOL_VERSION = 2
+PARTS = ["part1", "part2"]
+PERCENTILES = [50, 90, 99]
+# Time (in microseconds) after which executors stop timing a part, however few
+# iterations ran, see aoc_solver/lang/README.md#number-of-iterations
+MAX_PART_DURATION = 30000000
+# How far past its budget a part may run before the budget counts as ignored,
+# since the last iteration may start just before the budget is spent
+BUDGET_OVERSHOOT = 0.5
+
+
+class TimingProtocolError(Exception):
+    pass
+
+
+@dataclass
+class PartTiming:
+    # Number of times the part-specific solution was invoked in the timing loop
+    iterations: int
+    # Total time (in microseconds) of all iterations
+    duration: float
+    # Version 2: time (in microseconds) of individual iterations in the order
+    # they ran, executors may report a subset of all iterations
+    samples: Optional[List[float]] = None
+    # Version 2: tuples of (upper bound in microseconds, count) sorted by the
+    # upper bound, as an alternative to samples for large iteration counts
+    histogram: Optional[List[Tuple[float, int]]] = None
+    # Version 2: time (in microseconds) of the first (cold) invocation
+    first: Optional[float] = None
+    # Version 2: time (in microseconds) of the slowest invocation
+    max: Optional[float] = None
+
+    @property
+    def average(self) -> float:
+        return self.duration / self.iterations
+
+    @property
+    def has_distribution(self) -> bool:
+        return bool(self.samples or self.histogram)
+
+    @property
+    def cold(self) -> Optional[float]:
+        if self.first is not None:
+            return self.first
+        if self.samples:
+            return self.samples[0]
+
+    @property
+    def slowest(self) -> Optional[float]:
+        if self.max is not None:
+            return self.max
+        if self.samples:
+            return max(self.samples)
+        if self.histogram:
+            return next(bound for bound, count in reversed(self.histogram) if count)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Nearest-rank percentile of the invocation times, when reported with a
+        histogram this is the upper bound of the bucket containing the rank
+        """
+        if self.samples:
+            ordered = sorted(self.samples)
+            rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+            return ordered[rank - 1]
+        if self.histogram:
+            rank = max(math.ceil(percent / 100 * self.iterations), 1)
+            seen = 0
+            for bound, count in self.histogram:
+                seen += count
+                if seen >= rank:
+                    return bound
+
+
+TimingInfo = Dict[str, PartTiming]
+
+
+@dataclass
+class TimingBudget:
+    """
+    How long executors should time each part, passed to them with `--time`.
+    Limits that are not set are left to the executor.
+    """
+
+    # Time (in milliseconds) to keep timing a part once `min_iterations` ran
+    budget_ms: Optional[float] = None
+    # Number of iterations to run, unless the part takes too long
+    min_iterations: Optional[int] = None
+    # Number of untimed iterations to run before timing a part
+    warmup: Optional[int] = None
+
+    @property
+    def args(self) -> str:
+        args = ""
+        if self.budget_ms is not None:
+            args += f" --time-budget-ms {self.budget_ms:g}"
+        if self.min_iterations is not None:
+            args += f" --min-iterations {self.min_iterations}"
+        if self.warmup is not None:
+            args += f" --warmup {self.warmup}"
+        return args
+
+    def violations(self, timing_info: TimingInfo) -> List[str]:
+        """
+        :return: how the reported timing shows that the executor ignored the
+        budget, warmup iterations are not reported so they cannot be checked
+        """
+        violations = []
+        for part in PARTS:
+            timing = timing_info[part]
+            capped = timing.duration >= MAX_PART_DURATION
+            if self.min_iterations is not None and not capped:
+                if timing.iterations < self.min_iterations:
+                    violations.append(
+                        f"{part} ran {timing.iterations} of at least "
+                        f"{self.min_iterations} iterations"
+                    )
+            if self.budget_ms is None:
+                continue
+            budget = self.budget_ms * 1000
+            if timing.duration < budget and not capped:
+                violations.append(
+                    f"{part} was timed for {timing.duration / 1000:.3g} ms of its "
+                    f"{self.budget_ms:g} ms budget"
+                )
+            # Without a known minimum, the executor's own may have kept it going
+            elif self.min_iterations is not None:
+                needed = timing.iterations > max(self.min_iterations, 1)
+                overshoot = timing.duration - timing.average
+                if needed and overshoot > budget * (1 + BUDGET_OVERSHOOT):
+                    violations.append(
+                        f"{part} was timed for {timing.duration / 1000:.3g} ms, past "
+                        f"its {self.budget_ms:g} ms budget"
+                    )
+        return violations
+
+
+def parse_timing_info(output: str) -> TimingInfo:
+    """
+    Parse and validate the JSON printed by an executor invoked with `--time`
+
+    :raises TimingProtocolError: if the output does not follow the protocol
+    """
+    try:
+        raw = json.loads(output)
+    except JSONDecodeError:
+        raise TimingProtocolError("Timing output was not valid JSON")
+    if not isinstance(raw, dict):
+        raise TimingProtocolError("Timing output must be a JSON object")
+    version = raw.get("version", 1)
+    if version not in range(1, PROTOCOL_VERSION + 1):
+        raise TimingProtocolError(f"Unsupported timing protocol version {version!r}")
+    return {part: _parse_part(raw, part, version) for part in PARTS}
+
+
+def _parse_part(raw: dict, part: str, version: int) -> PartTiming:
+    if not isinstance(raw.get(part), dict):
+        raise TimingProtocolError(f"Timing output is missing {part}")
+    info = raw[part]
+    iterations = info.get("iterations")
+    if not isinstance(iterations, int) or iterations < 1:
+        raise TimingProtocolError(f"{part}.iterations must be a positive integer")
+    timing = PartTiming(iterations, _number(info.get("duration"), f"{part}.duration"))
+    if version < 2:
+        return timing
+
+    if "samples" in info:
+        samples = info["samples"]
+        if not isinstance(samples, list) or not samples:
+            raise TimingProtocolError(f"{part}.samples must be a non-empty list")
+        if len(samples) > iterations:
+            raise TimingProtocolError(f"{part} has more samples than iterations")
+        timing.samples = [_number(sample, f"{part}.samples") for sample in samples]
+    if "histogram" in info:
+        timing.histogram = _parse_histogram(info["histogram"], part, iterations)
+    if "first" in info:
+        timing.first = _number(info["first"], f"{part}.first")
+    if "max" in info:
+        timing.max = _number(info["max"], f"{part}.max")
+    return timing
+
+
+def _parse_histogram(histogram, part: str, iterations: int) -> List[Tuple[float, int]]:
+    if not isinstance(histogram, list) or not histogram:
+        raise TimingProtocolError(f"{part}.histogram must be a non-empty list")
+    buckets = []
+    for bucket in histogram:
+        if (
+            not isinstance(bucket, list)
+            or len(bucket) != 2
+            or not isinstance(bucket[1], int)
+            or bucket[1] < 0
+        ):
+            raise TimingProtocolError(
+                f"{part}.histogram buckets must be [upper bound, count] pairs"
+            )
+        buckets.append((_number(bucket[0], f"{part}.histogram"), bucket[1]))
+    if any(buckets[i][0] >= buckets[i + 1][0] for i in range(len(buckets) - 1)):
+        raise TimingProtocolError(f"{part}.histogram must be in ascending order")
+    if sum(count for _, count in buckets) != iterations:
+        raise TimingProtocolError(f"{part}.histogram counts must add up to iterations")
+    return buckets
+
+
+def _number(value, name: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise TimingProtocolError(f"{name} must be a non-negative number")
+    return value
@@ -0,0 +1,151 @@
+import glob
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from multiprocessing import current_process
+from typing import Dict, List
+
+# Processes spawned by the solver inherit the environment, so this is how they
+# learn where to record their spans
+TRACE_FILE_ENV = "AOC_TRACE_FILE"
+
+
+def now_us() -> float:
+    """
+    Wall clock time in microseconds, which (unlike a monotonic clock) can be
+    compared across processes
+    """
+    return time.time() * 1000000
+
+
+class Tracer:
+    """
+    Records spans of the solver harness itself in Chrome Trace Event format. Each
+    process writes its own events to a part file when it finishes and the main
+    process merges all part files into a single trace that can be opened in
+    chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    _events: List[Dict] = []
+    _thread_names: Dict[int, str] = {}
+    _path = None
+    _checked = False
+
+    @classmethod
+    def enable(cls, path: str):
+        cls._path = os.path.abspath(path)
+        cls._checked = True
+        os.environ[TRACE_FILE_ENV] = cls._path
+        for part_file in cls._part_files():
+            os.remove(part_file)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        if not cls._checked:
+            cls._path = os.environ.get(TRACE_FILE_ENV)
+            cls._checked = True
+        return cls._path is not None
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str = "harness", **args):
+        """
+        Record the time spent in the block as a complete event. The `args`
+        dictionary is yielded so details discovered in the block can be added.
+        """
+        if not cls.enabled():
+            yield args
+            return
+        start = now_us()
+        try:
+            yield args
+        finally:
+            cls.complete(name, start, now_us() - start, category, **args)
+
+    @classmethod
+    def complete(
+        cls,
+        name: str,
+        start: float,
+        duration: float,
+        category: str = "harness",
+        **args,
+    ):
+        if not cls.enabled():
+            return
+        thread = threading.current_thread()
+        cls._thread_names[thread.ident] = thread.name
+        cls._events.append(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": duration,
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": {k: str(v) for k, v in args.items()},
+            }
+        )
+
+    @classmethod
+    def flush(cls):
+        """
+        Write the events recorded by this process to its part file
+        """
+        if not cls.enabled():
+            return
+        # Forked processes inherit the events recorded by their parent
+        pid = os.getpid()
+        events = [event for event in cls._events if event["pid"] == pid]
+        events = cls._metadata(events) + events
+        cls._events = []
+        with open(f"{cls._path}.{os.getpid()}.part", "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+
+    @classmethod
+    def merge(cls):
+        """
+        Combine the part files of all processes into the trace file
+        """
+        if not cls.enabled():
+            return
+        cls.flush()
+        events = []
+        for part_file in cls._part_files():
+            with open(part_file, "r") as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+            os.remove(part_file)
+        with open(cls._path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    @classmethod
+    def _part_files(cls) -> List[str]:
+        return glob.glob(f"{glob.escape(cls._path)}.*.part")
+
+    @classmethod
+    def _metadata(cls, events: List[Dict]) -> List[Dict]:
+        pid = os.getpid()
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": current_process().name},
+            }
+        ]
+        for tid in {event["tid"] for event in events}:
+            metadata.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": cls._thread_names.get(tid, str(tid))},
+                }
+            )
+        return metadata
@@ -19,5 +19,10 @@ setuptools.setup(
     ],
     packages=setuptools.find_packages(),
     python_requires=">=3.7",
-    entry_points={"console_scripts": ["aoc-solver=aoc_solver.exe:main"]},
+    entry_points={
+        "console_scripts": [
+            "aoc-solver=aoc_solver.exe:main",
+            "aoc-client=aoc_solver.client:main",
+        ]
+    },
 )